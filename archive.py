@@ -0,0 +1,206 @@
+# archive.py
+import asyncio
+import gzip
+import json
+import os
+import struct
+import threading
+import zlib
+from datetime import datetime
+from typing import Iterable
+
+from db import Order
+from statuses import status_label
+from config import ARCHIVE_DIR
+
+SEGMENT_PREFIX = "orders-"
+
+
+def segment_name(completed_at: datetime | None) -> str:
+    month = (completed_at or datetime.utcnow()).strftime("%Y-%m")
+    return f"{SEGMENT_PREFIX}{month}"
+
+
+def order_snapshot(order: Order) -> dict:
+    """
+    Запись архива: заявка вместе со снимком пользователя на момент архивации.
+    """
+    user = order.user
+    return {
+        "id": order.id,
+        "status": status_label(order.status),
+        "preferred_time": order.preferred_time,
+        "created_at": order.created_at.isoformat() if order.created_at else None,
+        "completed_at": order.completed_at.isoformat() if order.completed_at else None,
+        "archived_at": datetime.utcnow().isoformat(timespec="seconds"),
+        "user": {
+            "id": user.id,
+            "telegram_id": user.telegram_id,
+            "username": user.username,
+            "name": user.name,
+            "phone": user.phone,
+            "address": user.address,
+            "organization": user.organization,
+        } if user else None,
+    }
+
+
+# Индекс сегмента {segment}.index: записи фиксированной длины (id заявки, смещение
+# gzip-member), отсортированные по id, — поиск заявки двоичный, без чтения файла целиком
+_INDEX_RECORD = struct.Struct("<qq")
+# Индекс прежнего формата: текстовые строки "id\tсмещение" в порядке записи
+_LEGACY_INDEX_SUFFIX = ".idx"
+_INDEX_SUFFIX = ".index"
+# Архивация и поиск выполняются в потоках (asyncio.to_thread)
+_index_lock = threading.Lock()
+
+
+def _read_index(path: str) -> list[tuple[int, int]]:
+    if not os.path.exists(path):
+        return []
+    with open(path, "rb") as f:
+        return list(_INDEX_RECORD.iter_unpack(f.read()))
+
+
+def _add_to_index(path: str, entries: list[tuple[int, int]]) -> None:
+    """
+    Добавляет записи в индекс, сохраняя порядок по id. Обычно новые id больше
+    всех прежних и записи просто дописываются; иначе индекс переписывается
+    целиком через временный файл.
+    """
+    entries = sorted(entries)
+    last_id = None
+    if os.path.exists(path) and os.path.getsize(path) >= _INDEX_RECORD.size:
+        with open(path, "rb") as f:
+            f.seek(-_INDEX_RECORD.size, os.SEEK_END)
+            last_id = _INDEX_RECORD.unpack(f.read(_INDEX_RECORD.size))[0]
+
+    if last_id is None or entries[0][0] > last_id:
+        mode, records = "ab", entries
+    else:
+        mode, records = "wb", sorted(_read_index(path) + entries)
+    target = path if mode == "ab" else f"{path}.tmp"
+    with open(target, mode) as f:
+        f.write(b"".join(_INDEX_RECORD.pack(*record) for record in records))
+        f.flush()
+        os.fsync(f.fileno())
+    if target != path:
+        os.replace(target, path)
+
+
+def _convert_legacy_index(directory: str, segment: str) -> None:
+    """
+    Переносит записи текстового индекса прежнего формата в сортированный.
+    Вызывается и из поиска, поэтому изменения индексов идут под _index_lock.
+    """
+    legacy_path = os.path.join(directory, f"{segment}{_LEGACY_INDEX_SUFFIX}")
+    with _index_lock:
+        if not os.path.exists(legacy_path):
+            return
+        with open(legacy_path, encoding="utf-8") as f:
+            entries = [tuple(int(part) for part in line.split("\t")) for line in f if line.strip()]
+        if entries:
+            _add_to_index(os.path.join(directory, f"{segment}{_INDEX_SUFFIX}"), entries)
+        os.remove(legacy_path)
+
+
+def _lookup_offset(path: str, order_id: int) -> int | None:
+    """
+    Двоичный поиск id в индексе сегмента: O(log n) чтений по одной записи.
+    """
+    with open(path, "rb") as f:
+        lo, hi = 0, os.fstat(f.fileno()).st_size // _INDEX_RECORD.size
+        while lo < hi:
+            mid = (lo + hi) // 2
+            f.seek(mid * _INDEX_RECORD.size)
+            record_id, offset = _INDEX_RECORD.unpack(f.read(_INDEX_RECORD.size))
+            if record_id < order_id:
+                lo = mid + 1
+            elif record_id > order_id:
+                hi = mid
+            else:
+                return offset
+    return None
+
+
+def _append_segment(directory: str, segment: str, records: list[dict]) -> None:
+    data_path = os.path.join(directory, f"{segment}.jsonl.gz")
+
+    payload = "".join(json.dumps(r, ensure_ascii=False) + "\n" for r in records).encode("utf-8")
+    # Каждая порция дописывается отдельным gzip-member: файл остаётся валидным gzip,
+    # а в индексе достаточно хранить смещение начала member
+    with open(data_path, "ab") as f:
+        offset = f.tell()
+        f.write(gzip.compress(payload))
+        f.flush()
+        os.fsync(f.fileno())
+
+    _convert_legacy_index(directory, segment)
+    with _index_lock:
+        _add_to_index(
+            os.path.join(directory, f"{segment}{_INDEX_SUFFIX}"), [(r["id"], offset) for r in records]
+        )
+
+
+def write_orders(orders: Iterable[Order], directory: str = ARCHIVE_DIR) -> int:
+    """
+    Дописывает заявки в сегменты архива по месяцу завершения. Возвращает число записей.
+    """
+    segments: dict[str, list[dict]] = {}
+    for order in orders:
+        segments.setdefault(segment_name(order.completed_at), []).append(order_snapshot(order))
+
+    os.makedirs(directory, exist_ok=True)
+    for segment, records in segments.items():
+        _append_segment(directory, segment, records)
+    return sum(len(records) for records in segments.values())
+
+
+def _read_member(path: str, offset: int) -> bytes:
+    decompressor = zlib.decompressobj(wbits=31)
+    chunks = []
+    with open(path, "rb") as f:
+        f.seek(offset)
+        while not decompressor.eof:
+            block = f.read(64 * 1024)
+            if not block:
+                break
+            chunks.append(decompressor.decompress(block))
+    return b"".join(chunks)
+
+
+def find_order(order_id: int, directory: str = ARCHIVE_DIR) -> dict | None:
+    """
+    Ищет заявку в архиве двоичным поиском по индексам сегментов (от новых
+    к старым) и распаковывает только один gzip-member с нужной записью.
+    """
+    if not os.path.isdir(directory):
+        return None
+
+    for name in os.listdir(directory):
+        if name.endswith(_LEGACY_INDEX_SUFFIX):
+            _convert_legacy_index(directory, name[:-len(_LEGACY_INDEX_SUFFIX)])
+
+    segments = sorted(
+        (name[:-len(_INDEX_SUFFIX)] for name in os.listdir(directory) if name.endswith(_INDEX_SUFFIX)),
+        reverse=True
+    )
+    for segment in segments:
+        offset = _lookup_offset(os.path.join(directory, f"{segment}{_INDEX_SUFFIX}"), order_id)
+        if offset is None:
+            continue
+
+        data_path = os.path.join(directory, f"{segment}.jsonl.gz")
+        for line in _read_member(data_path, offset).splitlines():
+            record = json.loads(line)
+            if record["id"] == order_id:
+                return record
+    return None
+
+
+async def archive_orders(orders: list[Order], directory: str = ARCHIVE_DIR) -> int:
+    return await asyncio.to_thread(write_orders, orders, directory)
+
+
+async def lookup_order(order_id: int, directory: str = ARCHIVE_DIR) -> dict | None:
+    return await asyncio.to_thread(find_order, order_id, directory)
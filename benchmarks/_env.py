@@ -0,0 +1,35 @@
+# _env.py
+"""
+Общая подготовка окружения бенчмарков. Вызывается до импорта модулей бота:
+config.py читает переменные окружения при импорте.
+"""
+import os
+import tempfile
+
+# Фейковый Bot API отвечает мгновенно, а синтетические пользователи пишут без пауз:
+# антиспам и лимиты исходящих сообщений остаются в цепочке и входят в замер, но не
+# отсекают трафик. Явно заданные переменные окружения не перезаписываются.
+UNTHROTTLED = {
+    "ANTISPAM_MAX_MESSAGES": "1000000",
+    "ANTISPAM_CALLBACK_MAX": "1000000",
+    "OUTBOUND_RATE": "1000000",
+    "OUTBOUND_CHAT_RATE": "1000000",
+}
+
+
+def setup(db_name: str | None = None, unthrottled: bool = False) -> tempfile.TemporaryDirectory | None:
+    """
+    Задаёт тестовые BOT_TOKEN и ADMIN_IDS, если они не заданы.
+    С db_name база — временная SQLite {db_name}.db; возвращается её каталог,
+    он удаляется, когда на него не остаётся ссылок. unthrottled — см. UNTHROTTLED.
+    """
+    os.environ.setdefault("BOT_TOKEN", "123456:benchmark")
+    os.environ.setdefault("ADMIN_IDS", "1")
+    if unthrottled:
+        for name, value in UNTHROTTLED.items():
+            os.environ.setdefault(name, value)
+    if db_name is None:
+        return None
+    tmp = tempfile.TemporaryDirectory()
+    os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{tmp.name}/{db_name}.db"
+    return tmp
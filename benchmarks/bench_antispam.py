@@ -0,0 +1,68 @@
+# bench_antispam.py
+"""
+Микробенчмарк накладных расходов AntiSpamMiddleware на одно обновление.
+
+    python -m benchmarks.bench_antispam [--users 100000] [--updates 200000]
+"""
+import argparse
+import asyncio
+import random
+import time
+from types import SimpleNamespace
+
+from benchmarks import _env
+
+_env.setup()
+
+from middlewares.anti_spam import AntiSpamMiddleware  # noqa: E402
+from ratelimit import SlidingWindowLimiter, TokenBucketLimiter  # noqa: E402
+
+
+async def noop_handler(event, data):
+    return None
+
+
+class _Passthrough:
+    async def __call__(self, handler, event, data):
+        return await handler(event, data)
+
+
+async def run(middleware: AntiSpamMiddleware, user_ids: list[int]) -> float:
+    event = object()
+    data = [{"event_from_user": SimpleNamespace(id=user_id)} for user_id in user_ids]
+    start = time.perf_counter()
+    for item in data:
+        await middleware(noop_handler, event, item)
+    return time.perf_counter() - start
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--users", type=int, default=100_000)
+    parser.add_argument("--updates", type=int, default=200_000)
+    parser.add_argument("--max-keys", type=int, default=50_000)
+    args = parser.parse_args()
+
+    rnd = random.Random(42)
+    user_ids = [rnd.randrange(args.users) for _ in range(args.updates)]
+
+    baseline = await run(_Passthrough(), user_ids)
+    print(f"{'passthrough':<16} {baseline / args.updates * 1e6:7.2f} µs/update")
+
+    limiters = {
+        "sliding_window": SlidingWindowLimiter(limit=3, window=5, max_keys=args.max_keys),
+        "token_bucket": TokenBucketLimiter(rate=3 / 5, capacity=3, max_keys=args.max_keys),
+    }
+    for name, limiter in limiters.items():
+        middleware = AntiSpamMiddleware(time_window=5, max_messages=3, limiter=limiter)
+        elapsed = await run(middleware, user_ids)
+        print(
+            f"{name:<16} {elapsed / args.updates * 1e6:7.2f} µs/update, "
+            f"overhead {(elapsed - baseline) / args.updates * 1e6:6.2f} µs, "
+            f"keys in store: {len(limiter._store)}"
+        )
+
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,143 @@
+# bench_dispatcher.py
+"""
+Офлайн-бенчмарк всего бота: настоящий диспетчер из main.create_dispatcher,
+сессия Bot API без сети (benchmarks.fake_bot) и временная SQLite.
+
+    python -m benchmarks.bench_dispatcher [--users 200] [--concurrency 50] [--api-latency 0.0]
+
+Каждый синтетический пользователь проходит регистрацию, оформляет заявку,
+отменяет её и оформляет снова; параллельно администратор листает список
+активных заявок и открывает карточки. Выводит updates/s, p50/p95/p99
+времени обработки обновления и число SQL-запросов и вызовов Bot API на обновление.
+"""
+import argparse
+import asyncio
+import time
+from collections import defaultdict
+
+from benchmarks import _env
+
+_tmp = _env.setup("dispatcher", unthrottled=True)
+
+from aiogram import Bot, Dispatcher  # noqa: E402
+from aiogram.types import Update  # noqa: E402
+
+from benchmarks.fake_bot import FakeTelegramSession, QueryCounter, UpdateFactory, format_ms  # noqa: E402
+from sqlalchemy import func, select  # noqa: E402
+
+from db import engine, init_db, read_engine, Order, User  # noqa: E402
+from main import create_dispatcher  # noqa: E402
+from notifications import admin_notifier  # noqa: E402
+
+ADMIN_ID = 1
+FIRST_USER_ID = 10_000
+
+
+def registration_flow(updates: UpdateFactory, user_id: int) -> list[Update]:
+    return [
+        updates.message(user_id, "/start"),
+        updates.callback(user_id, "start_work"),
+        updates.message(user_id, "Иван Тестов"),
+        updates.message(user_id, f"+7999{user_id:07d}"),
+        updates.message(user_id, "ул. Тестовая, д. 1"),
+        updates.message(user_id, "Нет"),
+    ]
+
+
+def order_flow(updates: UpdateFactory, user_id: int) -> list[Update]:
+    return [
+        updates.message(user_id, "🛒 Оформить заказ"),
+        updates.callback(user_id, "confirm_order"),
+    ]
+
+
+def cancel_flow(updates: UpdateFactory, user_id: int) -> list[Update]:
+    return [updates.message(user_id, "❌ Отменить заказ")]
+
+
+def admin_list_flow(updates: UpdateFactory, user_id: int, order_id: int) -> list[Update]:
+    return [
+        updates.message(user_id, "/admin"),
+        updates.callback(user_id, "admin_orders_active"),
+        updates.callback(user_id, "next_page"),
+        updates.callback(user_id, f"order_detail_{order_id}"),
+    ]
+
+
+class Recorder:
+    def __init__(self, dp: Dispatcher, bot: Bot):
+        self.dp = dp
+        self.bot = bot
+        self.latencies: dict[str, list[float]] = defaultdict(list)
+
+    async def run(self, flow: str, updates: list[Update]) -> None:
+        for update in updates:
+            started = time.perf_counter()
+            await self.dp.feed_update(self.bot, update)
+            self.latencies[flow].append(time.perf_counter() - started)
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--admin-rounds", type=int, default=50)
+    parser.add_argument("--api-latency", type=float, default=0.0, help="задержка ответа Bot API, сек")
+    args = parser.parse_args()
+
+    await init_db()
+    dp, bot = create_dispatcher()
+    session = FakeTelegramSession(latency=args.api_latency)
+    session.middleware = bot.session.middleware
+    bot.session = session
+    queries = QueryCounter(engine, read_engine)
+    updates = UpdateFactory()
+    recorder = Recorder(dp, bot)
+
+    semaphore = asyncio.Semaphore(args.concurrency)
+
+    async def customer(user_id: int) -> None:
+        async with semaphore:
+            await recorder.run("registration", registration_flow(updates, user_id))
+            await recorder.run("order", order_flow(updates, user_id))
+            await recorder.run("cancel", cancel_flow(updates, user_id))
+            await recorder.run("order", order_flow(updates, user_id))
+
+    async def admin() -> None:
+        for round_ in range(args.admin_rounds):
+            await recorder.run("admin list", admin_list_flow(updates, ADMIN_ID, round_ + 1))
+            await asyncio.sleep(0)
+
+    started = time.perf_counter()
+    await asyncio.gather(
+        *(customer(FIRST_USER_ID + i) for i in range(args.users)),
+        admin(),
+    )
+    elapsed = time.perf_counter() - started
+    await admin_notifier.close()
+
+    total = sum(len(values) for values in recorder.latencies.values())
+    print(f"{total} updates in {elapsed:.2f}s: {total / elapsed:,.0f} updates/s")
+    print(f"{'all':<13} {format_ms([v for values in recorder.latencies.values() for v in values])}")
+    for flow, values in recorder.latencies.items():
+        print(f"{flow:<13} {format_ms(values)}  ({len(values)} updates)")
+    print(
+        f"DB queries per update: {queries.count / total:.2f}, "
+        f"Bot API calls per update: {sum(session.calls.values()) / total:.2f} "
+        f"({', '.join(f'{name}={count}' for name, count in session.calls.most_common())})"
+    )
+
+    # Проверка, что сценарии действительно прошли: у каждого пользователя одна активная заявка
+    async with engine.connect() as conn:
+        users, orders = (await conn.execute(
+            select(func.count(User.id), select(func.count(Order.id)).scalar_subquery())
+        )).one()
+    status = "OK" if users == orders == args.users else "MISMATCH"
+    print(f"{status}: {users} users, {orders} orders in DB (expected {args.users} each)")
+
+    await dp.storage.close()
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,82 @@
+# bench_export.py
+"""
+Бенчмарк потоковой выгрузки заявок (CSV в zip, по частям) на синтетической базе.
+
+    python -m benchmarks.bench_export [--orders 1000000] [--chunk-size 2000] [--part-rows 500000]
+
+Показывает время выгрузки, скорость, размеры частей (каждая должна пройти
+в лимит Bot API 50 МБ) и пик памяти Python во время выгрузки по tracemalloc —
+он не должен расти вместе с размером таблицы. Пик меряется отдельным
+прогоном: под tracemalloc выгрузка идёт в разы медленнее.
+"""
+import argparse
+import asyncio
+import os
+import time
+import tracemalloc
+
+from benchmarks import _env
+
+_tmp = _env.setup("export")
+
+from sqlalchemy import insert  # noqa: E402
+
+from db import engine, init_db, Order, User  # noqa: E402
+from export import BOT_API_UPLOAD_LIMIT, EXPORT_PART_ROWS, write_orders_zip  # noqa: E402
+from statuses import OrderStatus  # noqa: E402
+
+SEED_BATCH = 50_000
+
+
+async def seed(orders: int, users: int) -> None:
+    await init_db()
+    async with engine.begin() as conn:
+        await conn.execute(insert(User), [
+            {"telegram_id": i, "name": f"Клиент {i}", "phone": "+79990000000",
+             "address": f"ул. Тестовая, д. {i}", "organization": "ООО Ромашка"}
+            for i in range(1, users + 1)
+        ])
+    for start in range(0, orders, SEED_BATCH):
+        async with engine.begin() as conn:
+            await conn.execute(insert(Order), [
+                {"user_id": i % users + 1, "status": OrderStatus.DONE if i % 3 else OrderStatus.IN_PROGRESS,
+                 "preferred_time": "Сегодня"}
+                for i in range(start, min(start + SEED_BATCH, orders))
+            ])
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--orders", type=int, default=1_000_000)
+    parser.add_argument("--users", type=int, default=50_000)
+    parser.add_argument("--chunk-size", type=int, default=2000)
+    parser.add_argument("--part-rows", type=int, default=EXPORT_PART_ROWS)
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    await seed(args.orders, args.users)
+    print(f"seeded {args.orders} orders in {time.perf_counter() - started:.1f}s")
+
+    started = time.perf_counter()
+    paths, rows = await write_orders_zip(
+        _tmp.name, "orders", "all", part_rows=args.part_rows, chunk_size=args.chunk_size
+    )
+    elapsed = time.perf_counter() - started
+    sizes = [os.path.getsize(path) for path in paths]
+    print(f"exported {rows} rows in {elapsed:.1f}s ({rows / elapsed:,.0f} rows/s), {len(paths)} part(s):")
+    for path, size in zip(paths, sizes):
+        verdict = "OK" if size <= BOT_API_UPLOAD_LIMIT else "over the 50 MB Bot API limit"
+        print(f"  {os.path.basename(path)}: {size / 1024 / 1024:.1f} MiB  {verdict}")
+    for path in paths:
+        os.remove(path)
+
+    tracemalloc.start()
+    await write_orders_zip(_tmp.name, "orders", "all", part_rows=args.part_rows, chunk_size=args.chunk_size)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"peak Python memory during export (tracemalloc): {peak / 1024 / 1024:.1f} MiB")
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
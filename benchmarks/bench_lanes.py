@@ -0,0 +1,112 @@
+# bench_lanes.py
+"""
+Очереди обновлений по пользователям (lanes.UserLanes) на настоящем диспетчере.
+
+    python -m benchmarks.bench_lanes [--users 100] [--burst 5] [--api-latency 0.05]
+
+1. Двойное нажатие «Подтвердить»: два одинаковых callback одного пользователя
+   обрабатываются одновременно — сколько заявок создано на пользователя.
+2. Параллельность: users пользователей присылают по burst сообщений разом;
+   время всей пачки должно быть порядка burst * api-latency, а не users * burst.
+Оба замера — без изоляции событий (как было) и с UserLanes.
+"""
+import argparse
+import asyncio
+import time
+
+from benchmarks import _env
+
+_tmp = _env.setup("lanes", unthrottled=True)
+
+from aiogram import Bot, Dispatcher  # noqa: E402
+from aiogram.fsm.storage.memory import DisabledEventIsolation  # noqa: E402
+from sqlalchemy import func, select  # noqa: E402
+
+from benchmarks.fake_bot import FakeTelegramSession, UpdateFactory  # noqa: E402
+from db import engine, init_db, Order, User  # noqa: E402
+from main import create_dispatcher  # noqa: E402
+from metrics import UPDATE_LANE_DEPTH, UPDATE_LANE_WAIT, UPDATE_LANES  # noqa: E402
+from notifications import admin_notifier  # noqa: E402
+
+
+def registration(updates: UpdateFactory, user_id: int) -> list:
+    return [
+        updates.message(user_id, "/start"),
+        updates.callback(user_id, "start_work"),
+        updates.message(user_id, "Иван Тестов"),
+        updates.message(user_id, "+79990000000"),
+        updates.message(user_id, "ул. Тестовая, д. 1"),
+        updates.message(user_id, "Нет"),
+    ]
+
+
+async def run(
+    dp: Dispatcher, bot: Bot, label: str, users: int, burst: int, api_latency: float, first_user: int
+) -> None:
+    session = bot.session
+    session.latency = 0
+    updates = UpdateFactory()
+    user_ids = range(first_user, first_user + users)
+
+    async def feed_all(batch: list) -> None:
+        await asyncio.gather(*(dp.feed_update(bot, update) for update in batch))
+
+    for user_id in user_ids:
+        for update in registration(updates, user_id):
+            await dp.feed_update(bot, update)
+
+    # 1. Двойное нажатие: оба callback приходят, пока первый ещё обрабатывается
+    session.latency = api_latency
+    for user_id in user_ids:
+        await dp.feed_update(bot, updates.message(user_id, "🛒 Оформить заказ"))
+    await feed_all([
+        updates.callback(user_id, "confirm_order") for user_id in user_ids for _ in range(2)
+    ])
+    async with engine.connect() as conn:
+        orders = await conn.scalar(
+            select(func.count(Order.id)).join(User).where(User.telegram_id.in_(list(user_ids)))
+        )
+
+    # 2. Пачки сообщений от всех пользователей сразу
+    batch = [updates.message(user_id, "✏️ Изменить данные") for user_id in user_ids for _ in range(burst)]
+    started = time.perf_counter()
+    await feed_all(batch)
+    elapsed = time.perf_counter() - started
+
+    print(
+        f"{label:<13} orders per user after double tap: {orders / users:.2f}   "
+        f"{len(batch)} updates in {elapsed:.2f}s ({burst} per user x {api_latency * 1000:.0f} ms API)   "
+        f"open lanes: {UPDATE_LANES.value():.0f}"
+    )
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--users", type=int, default=100)
+    parser.add_argument("--burst", type=int, default=5)
+    parser.add_argument("--api-latency", type=float, default=0.05, help="задержка ответа Bot API, сек")
+    args = parser.parse_args()
+
+    await init_db()
+    dp, bot = create_dispatcher()
+    session = FakeTelegramSession()
+    session.middleware = bot.session.middleware
+    bot.session = session
+
+    # create_dispatcher подключает UserLanes; для сравнения временно отключаем
+    lanes = dp.fsm.events_isolation
+    dp.fsm.events_isolation = DisabledEventIsolation()
+    await run(dp, bot, "no isolation", args.users, args.burst, args.api_latency, first_user=10_000)
+    dp.fsm.events_isolation = lanes
+    await run(dp, bot, "UserLanes", args.users, args.burst, args.api_latency, first_user=20_000)
+    print(
+        f"lane metrics: mean wait {UPDATE_LANE_WAIT.sum() / max(UPDATE_LANE_WAIT.count(), 1) * 1000:.1f} ms, "
+        f"mean depth on arrival {UPDATE_LANE_DEPTH.sum() / max(UPDATE_LANE_DEPTH.count(), 1):.2f}"
+    )
+    await admin_notifier.close()
+    await dp.storage.close()
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
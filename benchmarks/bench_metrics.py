@@ -0,0 +1,71 @@
+# bench_metrics.py
+"""
+Накладные расходы сбора метрик на одно обновление.
+
+    python -m benchmarks.bench_metrics [--iterations 200000]
+
+Сравнивает вызов обработчика напрямую и через HandlerMetricsMiddleware,
+а также стоимость пары событий SQLAlchemy и middleware Bot API.
+"""
+import argparse
+import asyncio
+import time
+
+from benchmarks import _env
+
+_env.setup()
+
+from aiogram.dispatcher.event.handler import HandlerObject  # noqa: E402
+from aiogram.methods import SendMessage  # noqa: E402
+
+from metrics import BotApiMetricsMiddleware, DB_QUERY_LATENCY, _sql_operation, render  # noqa: E402
+from middlewares.metrics import HandlerMetricsMiddleware  # noqa: E402
+
+
+async def cmd_start(event, data):
+    return None
+
+
+async def per_call_us(coro_factory, iterations: int) -> float:
+    started = time.perf_counter()
+    for _ in range(iterations):
+        await coro_factory()
+    return (time.perf_counter() - started) / iterations * 1e6
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--iterations", type=int, default=200_000)
+    args = parser.parse_args()
+    n = args.iterations
+
+    middleware = HandlerMetricsMiddleware()
+    data = {"handler": HandlerObject(cmd_start)}
+    baseline = await per_call_us(lambda: cmd_start(None, data), n)
+    wrapped = await per_call_us(lambda: middleware(cmd_start, None, data), n)
+    print(f"handler: direct {baseline:.2f} us, with metrics {wrapped:.2f} us, overhead {wrapped - baseline:.2f} us")
+
+    statement = "SELECT users.active_orders FROM users WHERE users.telegram_id = ? LIMIT ? OFFSET ?"
+    started = time.perf_counter()
+    for _ in range(n):
+        t = time.perf_counter()
+        DB_QUERY_LATENCY.observe(time.perf_counter() - t, ("main", _sql_operation(statement)))
+    print(f"sql query hooks: {(time.perf_counter() - started) / n * 1e6:.2f} us per query")
+
+    api_middleware = BotApiMetricsMiddleware()
+    method = SendMessage(chat_id=1, text="x")
+
+    async def make_request(bot, m):
+        return None
+
+    direct = await per_call_us(lambda: make_request(None, method), n)
+    wrapped = await per_call_us(lambda: api_middleware(make_request, None, method), n)
+    print(f"bot api middleware overhead: {wrapped - direct:.2f} us per request")
+
+    started = time.perf_counter()
+    text = render()
+    print(f"render /metrics: {(time.perf_counter() - started) * 1000:.2f} ms, {len(text)} bytes")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,84 @@
+# bench_outbound.py
+"""
+Всплеск исходящих сообщений против лимитов Telegram (outbound.OutboundLimiter).
+
+    python -m benchmarks.bench_outbound [--interactive 60] [--notifications 60] [--rate 30]
+
+Фейковый Bot API (benchmarks.fake_bot) отвечает 429 RetryAfter сверх rate
+сообщений в секунду и сверх 1 сообщения в секунду на чат (с запасом 3).
+Разом отправляются уведомления (в фоне, низкий приоритет), ответы пользователям
+и пачка из 6 сообщений в один чат. Сравнивается прямая отправка (как было)
+и отправка через OutboundLimiter: сколько сообщений потеряно, сколько 429
+вернул API и сколько ждали ответы и уведомления.
+"""
+import argparse
+import asyncio
+import time
+
+from benchmarks import _env
+
+_env.setup()
+
+from aiogram import Bot  # noqa: E402
+
+from benchmarks.fake_bot import FakeTelegramSession, format_ms  # noqa: E402
+from metrics import OUTBOUND_RETRIES  # noqa: E402
+from outbound import OutboundLimiter, as_notification  # noqa: E402
+
+BURST_CHAT_ID = 99_999
+
+
+async def run(limited: bool, args: argparse.Namespace) -> None:
+    session = FakeTelegramSession(
+        flood_rate=args.rate, flood_burst=int(args.rate), chat_flood_rate=1, chat_flood_burst=3
+    )
+    if limited:
+        session.middleware(OutboundLimiter(rate=args.rate, burst=int(args.rate), chat_rate=1, chat_burst=3))
+    bot = Bot(token="123456:benchmark", session=session)
+    results: dict[str, list] = {"interactive": [], "notification": [], "same chat": []}
+
+    async def send(kind: str, chat_id: int) -> None:
+        started = time.perf_counter()
+        try:
+            await bot.send_message(chat_id, text="…")
+            results[kind].append(time.perf_counter() - started)
+        except Exception:
+            results[kind].append(None)
+
+    retries_before = sum(OUTBOUND_RETRIES._values.values())
+    started = time.perf_counter()
+    # Уведомления ставятся в очередь первыми — ответы всё равно должны их обогнать
+    notifications = [
+        asyncio.create_task(as_notification(send("notification", 20_000 + i)))
+        for i in range(args.notifications)
+    ]
+    await asyncio.sleep(0)
+    await asyncio.gather(
+        *notifications,
+        *(send("interactive", 10_000 + i) for i in range(args.interactive)),
+        *(send("same chat", BURST_CHAT_ID) for _ in range(6)),
+    )
+    elapsed = time.perf_counter() - started
+
+    label = "OutboundLimiter" if limited else "direct"
+    retries = sum(OUTBOUND_RETRIES._values.values()) - retries_before
+    print(f"{label}: {elapsed:.2f}s, 429 from API: {session.flood_errors}, retries: {retries:.0f}")
+    for kind, values in results.items():
+        delivered = [value for value in values if value is not None]
+        timing = format_ms(delivered) if delivered else ""
+        print(f"  {kind:<13} delivered {len(delivered):>3}/{len(values):<3} {timing}")
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--interactive", type=int, default=60)
+    parser.add_argument("--notifications", type=int, default=60)
+    parser.add_argument("--rate", type=float, default=30, help="общий лимит фейкового API, сообщений в секунду")
+    args = parser.parse_args()
+
+    await run(False, args)
+    await run(True, args)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
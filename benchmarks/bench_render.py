@@ -0,0 +1,111 @@
+# bench_render.py
+"""
+Стоимость сборки клавиатур и форматирования времени на одно обновление.
+
+    python -m benchmarks.bench_render [--iterations 20000]
+
+Сравнивает сборку через ReplyKeyboardBuilder/InlineKeyboardBuilder
+(как было в handlers/) с готовыми клавиатурами из render.py: время на
+вызов и объём памяти, выделяемой за вызов (по tracemalloc).
+"""
+import argparse
+import time
+import tracemalloc
+from datetime import datetime
+from zoneinfo import ZoneInfo
+
+from benchmarks import _env
+
+_env.setup()
+
+from aiogram.types import InlineKeyboardButton  # noqa: E402
+from aiogram.utils.keyboard import InlineKeyboardBuilder, ReplyKeyboardBuilder  # noqa: E402
+
+from render import (  # noqa: E402
+    ADMIN_MAIN, BTN_CANCEL_ORDER, BTN_DIRECT_MESSAGE, BTN_EDIT_DATA, BTN_NEW_ORDER,
+    format_ts, main_menu_markup, order_detail_markup
+)
+from statuses import OrderStatus, STATUS_LABELS  # noqa: E402
+
+
+def builder_main_menu():
+    kb = ReplyKeyboardBuilder()
+    kb.button(text=BTN_NEW_ORDER)
+    kb.button(text=BTN_DIRECT_MESSAGE)
+    kb.button(text=BTN_EDIT_DATA)
+    kb.button(text=BTN_CANCEL_ORDER)
+    kb.adjust(1)
+    return kb.as_markup(resize_keyboard=True)
+
+
+def builder_admin_main():
+    kb = InlineKeyboardBuilder()
+    kb.button(text="Добавить заявку", callback_data="admin_add_order")
+    kb.button(text="Активные заявки", callback_data="admin_orders_active")
+    kb.button(text="Исполненные заявки", callback_data="admin_orders_done")
+    kb.button(text="Помощь", callback_data="admin_help")
+    kb.adjust(1)
+    return kb.as_markup()
+
+
+def builder_order_detail(order_id: int, status: int):
+    kb = InlineKeyboardBuilder()
+    for code in OrderStatus:
+        if code != status:
+            kb.button(text=STATUS_LABELS[code], callback_data=f"set_status_{order_id}_{code}")
+    kb.row(InlineKeyboardButton(text="🗑 Удалить", callback_data=f"confirm_delete_{order_id}"))
+    kb.row(InlineKeyboardButton(text="↩ К списку", callback_data="admin_orders_active"))
+    kb.adjust(2)
+    return kb.as_markup()
+
+
+def legacy_format_ts(value: datetime) -> str:
+    # Раньше ZoneInfo и tzinfo создавались при каждом вызове
+    return value.replace(tzinfo=ZoneInfo("UTC")).astimezone(ZoneInfo("Europe/Moscow")).strftime("%d.%m.%Y %H:%M")
+
+
+def measure(func, iterations: int) -> tuple[float, float]:
+    """
+    Возвращает (мкс на вызов, байт выделено на вызов).
+    """
+    for _ in range(100):
+        func()
+    started = time.perf_counter()
+    for _ in range(iterations):
+        func()
+    elapsed = (time.perf_counter() - started) / iterations * 1e6
+
+    sample = max(iterations // 10, 100)
+    keep = []
+    tracemalloc.start()
+    before, _ = tracemalloc.get_traced_memory()
+    for _ in range(sample):
+        # Результаты держим, чтобы память не переиспользовалась между вызовами
+        keep.append(func())
+    after, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, (after - before) / sample
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--iterations", type=int, default=20000)
+    args = parser.parse_args()
+
+    now = datetime.utcnow()
+    cases = [
+        ("main menu", builder_main_menu, lambda: main_menu_markup(True, True)),
+        ("admin menu", builder_admin_main, lambda: ADMIN_MAIN),
+        ("order detail", lambda: builder_order_detail(1234, OrderStatus.IN_PROGRESS),
+         lambda: order_detail_markup(1234, OrderStatus.IN_PROGRESS)),
+        ("timestamp", lambda: legacy_format_ts(now), lambda: format_ts(now)),
+    ]
+    print(f"{'case':<13} {'builder, us':>11} {'cached, us':>10} {'builder, B':>10} {'cached, B':>9}")
+    for name, before, after in cases:
+        old_us, old_bytes = measure(before, args.iterations)
+        new_us, new_bytes = measure(after, args.iterations)
+        print(f"{name:<13} {old_us:>11.2f} {new_us:>10.2f} {old_bytes:>10.0f} {new_bytes:>9.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+# bench_routing.py
+"""
+Стоимость маршрутизации одного сообщения в зависимости от числа кнопок.
+
+    python -m benchmarks.bench_routing [--iterations 2000]
+
+Сравнивает три способа на диспетчере с N обработчиками кнопок:
+lambda-фильтры с поиском подстроки (как было в handlers/order.py),
+F.text == ... и ButtonIndex. Замеряются нажатие последней кнопки
+(худший случай для перебора) и текст, не совпадающий ни с одной кнопкой.
+"""
+import argparse
+import asyncio
+import time
+
+from benchmarks import _env
+
+_env.setup()
+
+from aiogram import Bot, Dispatcher, F, Router  # noqa: E402
+
+from benchmarks.fake_bot import FakeTelegramSession, UpdateFactory  # noqa: E402
+from buttons import ButtonIndex  # noqa: E402
+
+
+async def noop(message) -> None:
+    return None
+
+
+def build_router(kind: str, texts: list[str]) -> Router:
+    router = Router()
+    if kind == "index":
+        index = ButtonIndex()
+        index.attach(router)
+        for text in texts:
+            index(text)(noop)
+    for text in texts:
+        if kind == "substring":
+            router.message.register(noop, lambda message, t=text: message.text and t in message.text)
+        elif kind == "exact":
+            router.message.register(noop, F.text == text)
+    # Как fallback_router: ловит всё остальное
+    router.message.register(noop)
+    return router
+
+
+async def per_update_us(dp: Dispatcher, bot: Bot, update_factory, iterations: int) -> float:
+    updates = [update_factory() for _ in range(iterations)]
+    started = time.perf_counter()
+    for update in updates:
+        await dp.feed_update(bot, update)
+    return (time.perf_counter() - started) / iterations * 1e6
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--iterations", type=int, default=2000)
+    args = parser.parse_args()
+
+    bot = Bot(token="123456:benchmark", session=FakeTelegramSession())
+    updates = UpdateFactory()
+    print(f"{'buttons':>7} {'method':<10} {'last button, us':>16} {'no match, us':>13}")
+    for count in (4, 16, 64, 256):
+        texts = [f"🔘 {i} кнопка" for i in range(count)]
+        for kind in ("substring", "exact", "index"):
+            dp = Dispatcher()
+            dp.include_router(build_router(kind, texts))
+            hit = await per_update_us(dp, bot, lambda: updates.message(42, texts[-1]), args.iterations)
+            miss = await per_update_us(dp, bot, lambda: updates.message(42, "просто текст"), args.iterations)
+            print(f"{count:>7} {kind:<10} {hit:>16.1f} {miss:>13.1f}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,86 @@
+# bench_search.py
+"""
+Задержка полнотекстового поиска /find на синтетической базе.
+
+    python -m benchmarks.bench_search [--users 100000] [--queries 200]
+
+Индекс users_fts создаётся миграцией в init_db и наполняется триггерами
+при вставке пользователей, как в боевой базе.
+"""
+import argparse
+import asyncio
+import random
+import statistics
+import time
+
+from benchmarks import _env
+
+_tmp = _env.setup("search")
+
+from sqlalchemy import insert  # noqa: E402
+
+from db import engine, init_db, Order, User  # noqa: E402
+from search import search_orders  # noqa: E402
+from statuses import OrderStatus  # noqa: E402
+
+FIRST_NAMES = ["Иван", "Пётр", "Анна", "Мария", "Сергей", "Ольга", "Дмитрий", "Елена"]
+LAST_NAMES = ["Иванов", "Петров", "Сидоров", "Кузнецов", "Смирнов", "Попов", "Волков"]
+STREETS = ["Ленина", "Мира", "Садовая", "Лесная", "Школьная", "Победы"]
+SEED_BATCH = 20_000
+
+
+async def seed(users: int) -> None:
+    await init_db()
+    rnd = random.Random(1)
+    for start in range(1, users + 1, SEED_BATCH):
+        stop = min(start + SEED_BATCH, users + 1)
+        async with engine.begin() as conn:
+            await conn.execute(insert(User), [
+                {"telegram_id": i,
+                 "name": f"{rnd.choice(FIRST_NAMES)} {rnd.choice(LAST_NAMES)}",
+                 "phone": f"+7999{i:07d}",
+                 "address": f"ул. {rnd.choice(STREETS)}, д. {i % 200}",
+                 "organization": f"ООО Компания {i % 5000}"}
+                for i in range(start, stop)
+            ])
+            await conn.execute(insert(Order), [
+                {"user_id": i, "status": OrderStatus.IN_PROGRESS, "preferred_time": "Сегодня"}
+                for i in range(start, stop)
+            ])
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--users", type=int, default=100_000)
+    parser.add_argument("--queries", type=int, default=200)
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    await seed(args.users)
+    print(f"seeded {args.users} users in {time.perf_counter() - started:.1f}s")
+
+    rnd = random.Random(2)
+    queries = [
+        lambda: rnd.choice(LAST_NAMES),
+        lambda: f"{rnd.choice(FIRST_NAMES)} {rnd.choice(LAST_NAMES)}",
+        lambda: f"7999{rnd.randrange(args.users):07d}",
+        lambda: f"Компания {rnd.randrange(5000)}",
+        lambda: f"Садов {rnd.randrange(200)}",
+    ]
+    timings = []
+    for _ in range(args.queries):
+        query = rnd.choice(queries)()
+        started = time.perf_counter()
+        await search_orders(query)
+        timings.append((time.perf_counter() - started) * 1000)
+
+    timings.sort()
+    print(
+        f"{args.queries} queries: median {statistics.median(timings):.2f} ms, "
+        f"p95 {timings[int(len(timings) * 0.95) - 1]:.2f} ms, max {timings[-1]:.2f} ms"
+    )
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
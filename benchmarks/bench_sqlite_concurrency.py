@@ -0,0 +1,103 @@
+# bench_sqlite_concurrency.py
+"""
+Сравнение пропускной способности SQLite с профилем "default" и "production"
+(WAL + pragma + отдельный пул чтения) при одновременных вставках заявок
+и чтении списка заявок в админке.
+
+    python -m benchmarks.bench_sqlite_concurrency [--seconds 5] [--writers 4] [--readers 8]
+"""
+import argparse
+import asyncio
+import tempfile
+import time
+
+from benchmarks import _env
+
+_env.setup()
+
+from sqlalchemy import func, insert, select  # noqa: E402
+from sqlalchemy.ext.asyncio import AsyncEngine  # noqa: E402
+
+from db import Base, Order, User, create_engine  # noqa: E402
+from statuses import OrderStatus  # noqa: E402
+
+
+async def seed(engine: AsyncEngine, users: int, orders_per_user: int) -> None:
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        await conn.execute(insert(User), [
+            {"telegram_id": i, "name": f"User {i}", "phone": "+79990000000", "address": "Адрес 1"}
+            for i in range(1, users + 1)
+        ])
+        await conn.execute(insert(Order), [
+            {"user_id": i, "status": OrderStatus.DONE if n % 2 else OrderStatus.IN_PROGRESS}
+            for i in range(1, users + 1) for n in range(orders_per_user)
+        ])
+
+
+async def writer(engine: AsyncEngine, deadline: float, stats: dict) -> None:
+    user_id = 1
+    while time.perf_counter() < deadline:
+        try:
+            async with engine.begin() as conn:
+                await conn.execute(insert(Order).values(user_id=user_id, status=OrderStatus.NEW_FROM_USER))
+            stats["writes"] += 1
+        except Exception:
+            stats["errors"] += 1
+        user_id += 1
+
+
+async def reader(engine: AsyncEngine, deadline: float, stats: dict) -> None:
+    while time.perf_counter() < deadline:
+        try:
+            async with engine.connect() as conn:
+                await conn.execute(
+                    select(Order.id, Order.status, Order.created_at)
+                    .where(Order.status < OrderStatus.DONE)
+                    .order_by(Order.id.desc())
+                    .limit(11)
+                )
+                await conn.execute(select(func.count(Order.id)).where(Order.status < OrderStatus.DONE))
+            stats["reads"] += 1
+        except Exception:
+            stats["errors"] += 1
+
+
+async def run_profile(profile: str, args) -> dict:
+    with tempfile.TemporaryDirectory() as tmp:
+        url = f"sqlite+aiosqlite:///{tmp}/bench.db"
+        write_engine = create_engine(url, profile=profile)
+        read_engine = create_engine(url, profile=profile, read_only=True) if profile == "production" else write_engine
+        await seed(write_engine, args.users, args.orders_per_user)
+
+        stats = {"writes": 0, "reads": 0, "errors": 0}
+        deadline = time.perf_counter() + args.seconds
+        await asyncio.gather(
+            *(writer(write_engine, deadline, stats) for _ in range(args.writers)),
+            *(reader(read_engine, deadline, stats) for _ in range(args.readers)),
+        )
+        await write_engine.dispose()
+        if read_engine is not write_engine:
+            await read_engine.dispose()
+        return stats
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--seconds", type=float, default=5)
+    parser.add_argument("--writers", type=int, default=4)
+    parser.add_argument("--readers", type=int, default=8)
+    parser.add_argument("--users", type=int, default=5_000)
+    parser.add_argument("--orders-per-user", type=int, default=10)
+    args = parser.parse_args()
+
+    for profile in ("default", "production"):
+        stats = await run_profile(profile, args)
+        print(
+            f"{profile:<11} writes/s: {stats['writes'] / args.seconds:8.1f}  "
+            f"reads/s: {stats['reads'] / args.seconds:8.1f}  errors: {stats['errors']}"
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,171 @@
+# fake_bot.py
+"""
+Офлайн-заглушки Telegram для бенчмарков и тестов: сессия Bot API без сети,
+фабрика синтетических обновлений и общие функции отчёта.
+"""
+import asyncio
+import itertools
+import time
+from collections import Counter
+from typing import Union, get_args, get_origin
+
+from aiogram import Bot
+from aiogram.client.session.base import BaseSession
+from aiogram.exceptions import TelegramRetryAfter
+from aiogram.methods import TelegramMethod
+from aiogram.types import Message, Update, User
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from ratelimit import TokenBucketLimiter
+
+
+def _returns(method: TelegramMethod, type_) -> bool:
+    returning = method.__returning__
+    return returning is type_ or (get_origin(returning) is Union and type_ in get_args(returning))
+
+
+class FakeTelegramSession(BaseSession):
+    """
+    Сессия Bot API, отвечающая на все методы в процессе, с задержкой latency секунд.
+    Считает вызовы по методам (calls) и хранит последние запросы (sent).
+    С flood_rate (и/или chat_flood_rate) ведёт себя как лимиты Telegram: запросы
+    с chat_id сверх flood_rate в секунду (chat_flood_rate на чат) получают
+    429 TelegramRetryAfter; такие ответы считаются в flood_errors.
+    """
+
+    def __init__(
+        self,
+        latency: float = 0.0,
+        keep_sent: int = 0,
+        flood_rate: float = 0.0,
+        flood_burst: int = 30,
+        chat_flood_rate: float = 0.0,
+        chat_flood_burst: int = 3,
+        **kwargs,
+    ):
+        super().__init__(**kwargs)
+        self.latency = latency
+        self.keep_sent = keep_sent
+        self.calls: Counter[str] = Counter()
+        self.sent: list[TelegramMethod] = []
+        self._message_ids = itertools.count(1)
+        self.flood = TokenBucketLimiter(flood_rate, flood_burst) if flood_rate else None
+        self.chat_flood = TokenBucketLimiter(chat_flood_rate, chat_flood_burst) if chat_flood_rate else None
+        self.flood_errors = 0
+
+    def check_flood(self, method: TelegramMethod) -> None:
+        chat_id = getattr(method, "chat_id", None)
+        if chat_id is None:
+            return
+        retry_after = max(
+            self.flood.wait_time("global") if self.flood else 0.0,
+            self.chat_flood.wait_time(chat_id) if self.chat_flood else 0.0,
+        )
+        if retry_after:
+            self.flood_errors += 1
+            raise TelegramRetryAfter(
+                method=method, message=f"Too Many Requests: retry after {retry_after:.2f}", retry_after=retry_after
+            )
+
+    async def make_request(self, bot: Bot, method: TelegramMethod, timeout: int | None = None):
+        self.calls[method.__api_method__] += 1
+        self.check_flood(method)
+        if self.keep_sent:
+            self.sent.append(method)
+            del self.sent[:-self.keep_sent]
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        return self.fake_result(bot, method)
+
+    def fake_result(self, bot: Bot, method: TelegramMethod):
+        if _returns(method, Message) and not _returns(method, bool):
+            chat_id = getattr(method, "chat_id", None) or 0
+            return Message(
+                message_id=next(self._message_ids),
+                date=int(time.time()),
+                chat={"id": chat_id, "type": "private"},
+                text=getattr(method, "text", None),
+            ).as_(bot)
+        if _returns(method, User):
+            return User(id=bot.id, is_bot=True, first_name="Benchmark")
+        return True
+
+    async def close(self) -> None:
+        pass
+
+    async def stream_content(self, url, headers=None, timeout=30, chunk_size=65536, raise_for_status=True):
+        yield b""
+
+
+class UpdateFactory:
+    """
+    Синтетические обновления от приватных чатов: сообщения и нажатия inline-кнопок.
+    """
+
+    def __init__(self):
+        self._update_ids = itertools.count(1)
+        self._message_ids = itertools.count(1)
+
+    @staticmethod
+    def _user(user_id: int) -> dict:
+        return {"id": user_id, "is_bot": False, "first_name": f"User{user_id}", "username": f"user{user_id}"}
+
+    def message(self, user_id: int, text: str | None) -> Update:
+        message = {
+            "message_id": next(self._message_ids),
+            "date": int(time.time()),
+            "chat": {"id": user_id, "type": "private"},
+            "from": self._user(user_id),
+        }
+        # Без текста — как стикер или фото: такие сообщения тоже приходят боту
+        if text is not None:
+            message["text"] = text
+        return Update(update_id=next(self._update_ids), message=message)
+
+    def callback(self, user_id: int, data: str) -> Update:
+        return Update(update_id=next(self._update_ids), callback_query={
+            "id": str(next(self._update_ids)),
+            "chat_instance": str(user_id),
+            "from": self._user(user_id),
+            "data": data,
+            "message": {
+                "message_id": next(self._message_ids),
+                "date": int(time.time()),
+                "chat": {"id": user_id, "type": "private"},
+                "text": "…",
+            },
+        })
+
+
+class QueryCounter:
+    """
+    Число SQL-запросов, выполненных через движки (по событию before_cursor_execute),
+    и число соединений, взятых из пула (по событию checkout).
+    """
+
+    def __init__(self, *engines: AsyncEngine):
+        self.count = 0
+        self.connections = 0
+        for engine in dict.fromkeys(engines):
+            event.listen(engine.sync_engine, "before_cursor_execute", self._on_execute)
+            event.listen(engine.sync_engine, "checkout", self._on_checkout)
+
+    def _on_execute(self, *args) -> None:
+        self.count += 1
+
+    def _on_checkout(self, *args) -> None:
+        self.connections += 1
+
+
+def percentile(values: list[float], q: float) -> float:
+    return values[min(len(values) - 1, int(len(values) * q))]
+
+
+def format_ms(values: list[float]) -> str:
+    values = sorted(values)
+    return (
+        f"p50 {percentile(values, 0.50) * 1000:7.2f} ms  "
+        f"p95 {percentile(values, 0.95) * 1000:7.2f} ms  "
+        f"p99 {percentile(values, 0.99) * 1000:7.2f} ms"
+    )
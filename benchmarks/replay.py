@@ -0,0 +1,164 @@
+# replay.py
+"""
+Воспроизведение записанного трафика (recorder.py, RECORD_UPDATES_PATH)
+на настоящем диспетчере с фейковым Bot API и временной SQLite.
+
+    python -m benchmarks.replay updates.jsonl [--speed 1 | --speed 10 | --speed max]
+                                              [--api-latency 0.05] [--limit 10000]
+
+При --speed N интервалы между обновлениями сокращаются в N раз, при max
+обновления подаются сразу. Порядок обновлений одного пользователя всегда
+сохраняется, разные пользователи обрабатываются параллельно, как в проде.
+
+Пользователи, которые в записи не проходят регистрацию, заранее заводятся
+в базе. Записанные администраторы получают id 1..MAX_ADMINS из ADMIN_IDS.
+Антиспам и лимиты исходящих сообщений по умолчанию не ограничивают (ускоренный
+трафик иначе отсекается); чтобы проверить их, задайте ANTISPAM_MAX_MESSAGES,
+ANTISPAM_CALLBACK_MAX и OUTBOUND_RATE / OUTBOUND_CHAT_RATE явно.
+"""
+import argparse
+import asyncio
+import json
+import os
+from collections import defaultdict
+
+from benchmarks import _env
+
+MAX_ADMINS = 20
+
+_tmp = _env.setup("replay", unthrottled=True)
+os.environ["ADMIN_IDS"] = ",".join(str(i) for i in range(1, MAX_ADMINS + 1))
+# Повторно записывать воспроизводимый трафик не нужно
+os.environ["RECORD_UPDATES_PATH"] = ""
+
+from sqlalchemy import insert  # noqa: E402
+
+from benchmarks.fake_bot import FakeTelegramSession, QueryCounter, UpdateFactory, format_ms  # noqa: E402
+from db import engine, init_db, read_engine, User  # noqa: E402
+from main import create_dispatcher  # noqa: E402
+from notifications import admin_notifier, status_notifier  # noqa: E402
+
+
+def load_records(path: str, limit: int | None = None) -> list[dict]:
+    records = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                records.append(json.loads(line))
+            except json.JSONDecodeError:
+                # Последняя строка могла остаться недописанной
+                continue
+            if limit and len(records) >= limit:
+                break
+    records.sort(key=lambda r: r["t"])
+    return records
+
+
+def assign_user_ids(records: list[dict]) -> None:
+    """
+    Заменяет псевдонимы администраторов на id из ADMIN_IDS (по порядку появления).
+    """
+    admins: dict[int, int] = {}
+    for record in records:
+        if record.get("a"):
+            if record["u"] not in admins:
+                admins[record["u"]] = len(admins) % MAX_ADMINS + 1
+            record["u"] = admins[record["u"]]
+
+
+async def seed_users(records: list[dict]) -> int:
+    registering = {r["u"] for r in records if r["k"] == "c" and r["x"] == "start_work"}
+    existing = {r["u"] for r in records if not r.get("a")} - registering
+    if existing:
+        async with engine.begin() as conn:
+            await conn.execute(insert(User), [
+                {"telegram_id": user_id, "name": "Аааа Аааааа", "phone": "+55555555555",
+                 "address": "аа. Аааааа, а. 5", "organization": "Ааа"}
+                for user_id in existing
+            ])
+    return len(existing)
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("path", help="файл записи (JSON Lines)")
+    parser.add_argument("--speed", default="1", help="множитель скорости или max")
+    parser.add_argument("--api-latency", type=float, default=0.0, help="задержка ответа Bot API, сек")
+    parser.add_argument("--limit", type=int, default=None, help="воспроизвести первые N обновлений")
+    args = parser.parse_args()
+    speed = None if args.speed == "max" else float(args.speed)
+
+    records = load_records(args.path, args.limit)
+    if not records:
+        print("no records")
+        return
+    assign_user_ids(records)
+
+    await init_db()
+    seeded = await seed_users(records)
+    dp, bot = create_dispatcher()
+    session = FakeTelegramSession(latency=args.api_latency)
+    session.middleware = bot.session.middleware
+    bot.session = session
+    queries = QueryCounter(engine, read_engine)
+    updates = UpdateFactory()
+
+    latencies: dict[str, list[float]] = defaultdict(list)
+    lags: list[float] = []
+    last_task: dict[int, asyncio.Task] = {}
+    loop = asyncio.get_running_loop()
+
+    async def feed(record: dict, scheduled: float, previous: asyncio.Task | None) -> None:
+        if previous is not None:
+            await asyncio.gather(previous, return_exceptions=True)
+        if record["k"] == "m":
+            update = updates.message(record["u"], record["x"])
+        else:
+            update = updates.callback(record["u"], record["x"])
+        started = loop.time()
+        lags.append(started - scheduled)
+        await dp.feed_update(bot, update)
+        latencies["message" if record["k"] == "m" else "callback"].append(loop.time() - started)
+
+    first_ts = records[0]["t"]
+    span = records[-1]["t"] - first_ts
+    print(
+        f"replaying {len(records)} updates from {len({r['u'] for r in records})} users, "
+        f"recorded span {span:.1f}s, speed {args.speed}, {seeded} users pre-registered"
+    )
+
+    started = loop.time()
+    for record in records:
+        scheduled = started
+        if speed:
+            scheduled = started + (record["t"] - first_ts) / speed
+            delay = scheduled - loop.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+        user_id = record["u"]
+        last_task[user_id] = asyncio.create_task(feed(record, scheduled, last_task.get(user_id)))
+    await asyncio.gather(*last_task.values(), return_exceptions=True)
+    elapsed = loop.time() - started
+    await admin_notifier.close()
+    await status_notifier.close()
+
+    total = sum(len(values) for values in latencies.values())
+    print(f"{total} updates in {elapsed:.2f}s: {total / elapsed:,.0f} updates/s")
+    print(f"{'all':<9} {format_ms([v for values in latencies.values() for v in values])}")
+    for kind, values in latencies.items():
+        print(f"{kind:<9} {format_ms(values)}  ({len(values)} updates)")
+    print(f"{'lag':<9} {format_ms(lags)}  (start of processing vs recorded time)")
+    print(
+        f"DB queries per update: {queries.count / total:.2f}, "
+        f"Bot API calls per update: {sum(session.calls.values()) / total:.2f}"
+    )
+
+    await dp.storage.close()
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
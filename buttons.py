@@ -0,0 +1,55 @@
+# buttons.py
+from typing import Any, Callable
+
+from aiogram import Router
+from aiogram.dispatcher.event.handler import HandlerObject
+from aiogram.fsm.state import State
+from aiogram.types import Message
+
+
+class ButtonIndex:
+    """
+    Таблица точных текстов кнопок reply-клавиатуры -> обработчик.
+    Регистрируется на роутере одним обработчиком перед остальными, поэтому
+    нажатие кнопки находится одним поиском в словаре, а не перебором фильтров.
+    Кнопка может быть привязана к состоянию FSM: сначала ищется пара
+    (состояние, текст), затем кнопка без состояния. Сообщения без текста
+    (фото, стикеры) в таблицу не попадают и идут дальше по цепочке.
+    """
+
+    def __init__(self):
+        self._handlers: dict[tuple[str | None, str], HandlerObject] = {}
+
+    def __call__(self, text: str, state: State | None = None) -> Callable:
+        def decorator(callback: Callable) -> Callable:
+            key = (state.state if state is not None else None, text)
+            if key in self._handlers:
+                raise ValueError(f"Кнопка {text!r} уже зарегистрирована")
+            self._handlers[key] = HandlerObject(callback)
+            return callback
+        return decorator
+
+    def __len__(self) -> int:
+        return len(self._handlers)
+
+    def lookup(self, message: Message, raw_state: str | None = None) -> dict[str, Any] | bool:
+        text = message.text
+        if text is None:
+            return False
+        handler = self._handlers.get((raw_state, text))
+        if handler is None and raw_state is not None:
+            handler = self._handlers.get((None, text))
+        if handler is None:
+            return False
+        # Найденный обработчик передаётся в dispatch (и в middleware) через data
+        return {"button_handler": handler}
+
+    @staticmethod
+    async def dispatch(message: Message, button_handler: HandlerObject, **data: Any) -> Any:
+        return await button_handler.call(message, **data)
+
+    def attach(self, router: Router) -> None:
+        """
+        Регистрирует таблицу на роутере; вызывать до остальных обработчиков сообщений.
+        """
+        router.message.register(self.dispatch, self.lookup)
@@ -0,0 +1,140 @@
+# cache.py
+import asyncio
+from collections import OrderedDict
+from time import monotonic
+from typing import Any, Awaitable, Callable, Hashable
+
+from sqlalchemy import select
+from sqlalchemy.orm import selectinload
+
+from db import async_sessionmaker, async_read_sessionmaker, Order, User
+from config import CACHE_TTL, CACHE_MAXSIZE
+from metrics import CACHE_EVICTIONS, CACHE_REQUESTS, CACHE_SIZE
+
+
+class AsyncTTLCache:
+    """
+    LRU-кеш с TTL для асинхронных загрузчиков.
+    Одновременные промахи по одному ключу объединяются в одну загрузку.
+    Кешируется и отсутствие значения (None), чтобы не ходить в БД повторно.
+    Если общую загрузку отменили, ожидающие её вызовы загружают значение сами.
+    Попадания, промахи, вытеснения и размер видны в /metrics с меткой cache=name.
+    """
+
+    def __init__(self, name: str, maxsize: int = CACHE_MAXSIZE, ttl: float = CACHE_TTL):
+        self.name = name
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+        self._loading: dict[Hashable, asyncio.Future] = {}
+        self._hit = (name, "hit")
+        self._miss = (name, "miss")
+        self._labels = (name,)
+
+    async def get_or_load(self, key: Hashable, loader: Callable[[], Awaitable[Any]]) -> Any:
+        entry = self._data.get(key)
+        if entry is not None:
+            if monotonic() < entry[0]:
+                self._data.move_to_end(key)
+                CACHE_REQUESTS.inc(self._hit)
+                return entry[1]
+            del self._data[key]
+            self._update_size()
+
+        CACHE_REQUESTS.inc(self._miss)
+        pending = self._loading.get(key)
+        if pending is not None:
+            try:
+                return await asyncio.shield(pending)
+            except asyncio.CancelledError:
+                # Отменили чужую загрузку, а не этот вызов: загружаем сами
+                if not pending.cancelled() or asyncio.current_task().cancelling():
+                    raise
+            return await self.get_or_load(key, loader)
+
+        future = asyncio.get_running_loop().create_future()
+        self._loading[key] = future
+        try:
+            value = await loader()
+        except Exception as e:
+            future.set_exception(e)
+            # Исключение уже передано ожидающим; помечаем его полученным
+            future.exception()
+            raise
+        else:
+            # Если ключ инвалидировали во время загрузки, значение могло устареть
+            if self._loading.get(key) is future:
+                self._set(key, value)
+            future.set_result(value)
+            return value
+        finally:
+            # Загрузку отменили (CancelledError): ожидающие не должны зависнуть
+            if not future.done():
+                future.cancel()
+            if self._loading.get(key) is future:
+                del self._loading[key]
+
+    def _set(self, key: Hashable, value: Any) -> None:
+        self._data[key] = (monotonic() + self.ttl, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+            CACHE_EVICTIONS.inc(self._labels)
+        self._update_size()
+
+    def _update_size(self) -> None:
+        CACHE_SIZE.set(len(self._data), self._labels)
+
+    def invalidate(self, key: Hashable) -> None:
+        self._data.pop(key, None)
+        self._loading.pop(key, None)
+        self._update_size()
+
+    def clear(self) -> None:
+        self._data.clear()
+        self._loading.clear()
+        self._update_size()
+
+
+user_cache = AsyncTTLCache("users")
+order_cache = AsyncTTLCache("orders")
+
+
+async def get_user(telegram_id: int) -> User | None:
+    """
+    Пользователь по telegram_id (отсоединённый от сессии объект).
+    """
+    async def load() -> User | None:
+        async with async_sessionmaker() as session:
+            result = await session.execute(
+                select(User).where(User.telegram_id == telegram_id).limit(1)
+            )
+            return result.scalar_one_or_none()
+
+    return await user_cache.get_or_load(telegram_id, load)
+
+
+async def get_order(order_id: int) -> Order | None:
+    """
+    Заявка по id вместе с пользователем (отсоединённый от сессии объект).
+    """
+    async def load() -> Order | None:
+        async with async_read_sessionmaker() as session:
+            return await session.get(Order, order_id, options=[selectinload(Order.user)])
+
+    return await order_cache.get_or_load(order_id, load)
+
+
+def invalidate_user(telegram_id: int | None, with_orders: bool = False) -> None:
+    """
+    Сбрасывает пользователя из кеша. with_orders=True нужен при изменении
+    анкеты: в кешированных заявках лежит снимок данных пользователя.
+    """
+    if telegram_id is not None:
+        user_cache.invalidate(telegram_id)
+    if with_orders:
+        order_cache.clear()
+
+
+def invalidate_order(order_id: int) -> None:
+    order_cache.invalidate(order_id)
@@ -15,4 +15,129 @@ CLEANUP_HOUR = int(os.getenv("CLEANUP_HOUR", "0"))
 
 CLEANUP_MINUTE = int(os.getenv("CLEANUP_MINUTE", "0"))
 
-CLEANUP_TIMEZONE = os.getenv("CLEANUP_TIMEZONE", "Europe/Moscow")
\ No newline at end of file
+CLEANUP_TIMEZONE = os.getenv("CLEANUP_TIMEZONE", "Europe/Moscow")
+
+# Хранилище FSM: "memory" (по умолчанию) или "redis"
+FSM_STORAGE = os.getenv("FSM_STORAGE", "memory").lower()
+
+REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+
+FSM_KEY_PREFIX = os.getenv("FSM_KEY_PREFIX", "fsm")
+
+# TTL ключей состояния и данных FSM в секундах (0 — без TTL)
+FSM_STATE_TTL = int(os.getenv("FSM_STATE_TTL", "86400"))
+
+FSM_DATA_TTL = int(os.getenv("FSM_DATA_TTL", "86400"))
+
+# Кеш пользователей и заявок: время жизни записи (сек) и максимальный размер
+CACHE_TTL = int(os.getenv("CACHE_TTL", "300"))
+
+CACHE_MAXSIZE = int(os.getenv("CACHE_MAXSIZE", "10000"))
+
+# Окно (сек), в течение которого новые заявки объединяются в одно уведомление админам
+ADMIN_NOTIFY_WINDOW = float(os.getenv("ADMIN_NOTIFY_WINDOW", "3"))
+
+# Уведомления клиентам о смене статуса: окно объединения (сек, не меньше 1 —
+# лимит Telegram на сообщения в один чат). Темп отправки задают OUTBOUND_*
+STATUS_NOTIFY_WINDOW = max(float(os.getenv("STATUS_NOTIFY_WINDOW", "3")), 1.0)
+
+# Антиспам: алгоритм "sliding_window" или "token_bucket", бэкенд "memory" или "redis"
+RATE_LIMIT_ALGORITHM = os.getenv("RATE_LIMIT_ALGORITHM", "sliding_window")
+
+RATE_LIMIT_BACKEND = os.getenv("RATE_LIMIT_BACKEND", "memory")
+
+RATE_LIMIT_MAX_KEYS = int(os.getenv("RATE_LIMIT_MAX_KEYS", "100000"))
+
+# Антиспам: не больше ANTISPAM_MAX_MESSAGES сообщений за ANTISPAM_WINDOW секунд
+ANTISPAM_WINDOW = float(os.getenv("ANTISPAM_WINDOW", "5"))
+
+ANTISPAM_MAX_MESSAGES = int(os.getenv("ANTISPAM_MAX_MESSAGES", "3"))
+
+# Нажатия inline-кнопок — отдельный, более мягкий лимит: листание списков
+# и смена статусов в админке дают много нажатий подряд
+ANTISPAM_CALLBACK_WINDOW = float(os.getenv("ANTISPAM_CALLBACK_WINDOW", "5"))
+
+ANTISPAM_CALLBACK_MAX = int(os.getenv("ANTISPAM_CALLBACK_MAX", "15"))
+
+# Очередь обновлений одного пользователя (обрабатываются строго по порядку):
+# сколько обновлений может ждать, лишние отклоняются
+LANE_MAX_QUEUE = int(os.getenv("LANE_MAX_QUEUE", "20"))
+
+# Исходящие сообщения Bot API: общий лимит (в секунду, 0 — без ограничения) и запас на всплеск,
+# лимит на один чат и число повторов после ответа 429 (RetryAfter)
+OUTBOUND_RATE = float(os.getenv("OUTBOUND_RATE", "30"))
+
+OUTBOUND_BURST = int(os.getenv("OUTBOUND_BURST", "30"))
+
+OUTBOUND_CHAT_RATE = float(os.getenv("OUTBOUND_CHAT_RATE", "1"))
+
+OUTBOUND_CHAT_BURST = int(os.getenv("OUTBOUND_CHAT_BURST", "3"))
+
+OUTBOUND_MAX_RETRIES = int(os.getenv("OUTBOUND_MAX_RETRIES", "3"))
+
+# Через сколько минут бездействия сбрасывать незавершённый диалог и как часто это проверять (сек)
+INACTIVITY_TIMEOUT_MINUTES = float(os.getenv("INACTIVITY_TIMEOUT_MINUTES", "10"))
+
+INACTIVITY_SWEEP_INTERVAL = float(os.getenv("INACTIVITY_SWEEP_INTERVAL", "30"))
+
+# Режим получения обновлений: "polling" (по умолчанию) или "webhook"
+BOT_MODE = os.getenv("BOT_MODE", "polling").lower()
+
+# Публичный адрес, который регистрируется в Telegram (пусто — не вызывать setWebhook)
+WEBHOOK_URL = os.getenv("WEBHOOK_URL", "")
+
+WEBHOOK_PATH = os.getenv("WEBHOOK_PATH", "/webhook")
+
+WEBHOOK_HOST = os.getenv("WEBHOOK_HOST", "0.0.0.0")
+
+WEBHOOK_PORT = int(os.getenv("WEBHOOK_PORT", "8080"))
+
+WEBHOOK_SECRET = os.getenv("WEBHOOK_SECRET") or None
+
+# Сколько секунд ждать завершения обработки принятых обновлений при остановке
+WEBHOOK_DRAIN_TIMEOUT = float(os.getenv("WEBHOOK_DRAIN_TIMEOUT", "30"))
+
+# Профиль движка БД: "production" (WAL и pragma для SQLite) или "default" (настройки драйвера)
+DB_PROFILE = os.getenv("DB_PROFILE", "production").lower()
+
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+
+SQLITE_SYNCHRONOUS = os.getenv("SQLITE_SYNCHRONOUS", "NORMAL")
+
+SQLITE_BUSY_TIMEOUT_MS = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000"))
+
+# cache_size в KiB (отрицательное значение для PRAGMA cache_size) и mmap_size в байтах
+SQLITE_CACHE_SIZE_KB = int(os.getenv("SQLITE_CACHE_SIZE_KB", "20000"))
+
+SQLITE_MMAP_SIZE = int(os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024)))
+
+# Отдельный пул только для чтения (списки и карточки заявок в админке)
+DB_READ_ENGINE = bool(int(os.getenv("DB_READ_ENGINE", "0")))
+
+DB_READ_POOL_SIZE = int(os.getenv("DB_READ_POOL_SIZE", "5"))
+
+# Очистка исполненных заявок порциями: размер порции, пауза между порциями (сек)
+# и ограничение времени на один запуск (сек, 0 — без ограничения)
+CLEANUP_BATCH_SIZE = int(os.getenv("CLEANUP_BATCH_SIZE", "500"))
+
+CLEANUP_BATCH_PAUSE = float(os.getenv("CLEANUP_BATCH_PAUSE", "0.05"))
+
+CLEANUP_TIME_BUDGET = float(os.getenv("CLEANUP_TIME_BUDGET", "0"))
+
+# Архив исполненных заявок перед удалением (gzip JSONL по месяцам)
+ARCHIVE_ENABLED = bool(int(os.getenv("ARCHIVE_ENABLED", "1")))
+
+ARCHIVE_DIR = os.getenv("ARCHIVE_DIR", "./archive")
+
+# Метрики Prometheus: отдельный HTTP-сервер с /metrics (порт 0 — метрики выключены)
+METRICS_HOST = os.getenv("METRICS_HOST", "127.0.0.1")
+
+METRICS_PORT = int(os.getenv("METRICS_PORT", "0"))
+
+# Запись входящих обновлений (обезличенных) для воспроизведения нагрузки: путь к файлу, пусто — выключено
+RECORD_UPDATES_PATH = os.getenv("RECORD_UPDATES_PATH", "")
+
+# Соль для псевдонимов пользователей в записи; пусто — случайная на каждый запуск
+RECORD_SALT = os.getenv("RECORD_SALT", "")
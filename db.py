@@ -1,15 +1,75 @@
 # db.py
 from datetime import datetime
 
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncEngine, AsyncSession
 from sqlalchemy.orm import sessionmaker, DeclarativeBase, mapped_column, relationship
-from sqlalchemy import Integer, String, DateTime, ForeignKey
-
-from config import DATABASE_URL
-
-engine = create_async_engine(DATABASE_URL, echo=False)
+from sqlalchemy import (
+    Integer, SmallInteger, String, DateTime, ForeignKey, Index, Delete, Update,
+    delete, event, func, literal_column, select, text, update
+)
+from sqlalchemy.engine import make_url
+
+from config import (
+    DATABASE_URL, DB_PROFILE, DB_POOL_SIZE, DB_MAX_OVERFLOW, DB_READ_ENGINE, DB_READ_POOL_SIZE,
+    SQLITE_SYNCHRONOUS, SQLITE_BUSY_TIMEOUT_MS, SQLITE_CACHE_SIZE_KB, SQLITE_MMAP_SIZE
+)
+from migrations import run_migrations
+from statuses import OrderStatus
+
+
+def sqlite_pragmas(read_only: bool = False) -> list[str]:
+    pragmas = [
+        "PRAGMA journal_mode=WAL",
+        f"PRAGMA synchronous={SQLITE_SYNCHRONOUS}",
+        f"PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT_MS}",
+        f"PRAGMA cache_size=-{SQLITE_CACHE_SIZE_KB}",
+        f"PRAGMA mmap_size={SQLITE_MMAP_SIZE}",
+    ]
+    if read_only:
+        pragmas.append("PRAGMA query_only=ON")
+    return pragmas
+
+
+def create_engine(
+    url: str = DATABASE_URL,
+    profile: str = DB_PROFILE,
+    read_only: bool = False,
+    pool_size: int = DB_POOL_SIZE,
+) -> AsyncEngine:
+    """
+    Создаёт движок БД согласно профилю.
+    Профиль "production" для файловой SQLite включает WAL (читатели не блокируют
+    писателя), synchronous, busy_timeout, cache_size и mmap_size на каждом соединении.
+    """
+    parsed = make_url(url)
+    is_sqlite = parsed.get_backend_name() == "sqlite"
+    is_file_db = not is_sqlite or parsed.database not in (None, "", ":memory:")
+
+    kwargs = {"echo": False}
+    if profile == "production" and is_file_db:
+        kwargs.update(pool_size=pool_size, max_overflow=DB_MAX_OVERFLOW, pool_pre_ping=not is_sqlite)
+    new_engine = create_async_engine(url, **kwargs)
+
+    if profile == "production" and is_sqlite:
+        pragmas = sqlite_pragmas(read_only)
+
+        @event.listens_for(new_engine.sync_engine, "connect")
+        def _set_sqlite_pragmas(dbapi_connection, connection_record):
+            cursor = dbapi_connection.cursor()
+            for pragma in pragmas:
+                cursor.execute(pragma)
+            cursor.close()
+
+    return new_engine
+
+
+engine = create_engine()
 async_sessionmaker = sessionmaker(engine, expire_on_commit=False, class_=AsyncSession)
 
+# Сессии для тяжёлых читающих запросов; без DB_READ_ENGINE — тот же движок
+read_engine = create_engine(read_only=True, pool_size=DB_READ_POOL_SIZE) if DB_READ_ENGINE else engine
+async_read_sessionmaker = sessionmaker(read_engine, expire_on_commit=False, class_=AsyncSession)
+
 
 class Base(DeclarativeBase):
     pass
@@ -19,22 +79,35 @@ class User(Base):
     __tablename__ = "users"
 
     id = mapped_column(Integer, primary_key=True, autoincrement=True)
-    telegram_id = mapped_column(Integer, nullable=True, index=True)
+    telegram_id = mapped_column(Integer, nullable=True, unique=True, index=True)
     username = mapped_column(String, nullable=True)
     name = mapped_column(String, nullable=False)
     phone = mapped_column(String, nullable=False)
     address = mapped_column(String, nullable=False)
     organization = mapped_column(String, nullable=True)
+    # Денормализованный счётчик активных (не исполненных) заявок
+    active_orders = mapped_column(Integer, nullable=False, default=0, server_default="0")
 
     orders = relationship("Order", back_populates="user", lazy="raise")
 
 
 class Order(Base):
     __tablename__ = "orders"
+    # Те же индексы пересоздаёт миграция 5 для существующих баз
+    __table_args__ = (
+        Index("ix_orders_user_status", "user_id", "status"),
+        Index(
+            "ix_orders_active", "id",
+            sqlite_where=text(f"status < {int(OrderStatus.DONE)}"),
+            postgresql_where=text(f"status < {int(OrderStatus.DONE)}")
+        ),
+        Index("ix_orders_status_completed", "status", "completed_at"),
+    )
 
     id = mapped_column(Integer, primary_key=True, autoincrement=True)
     user_id = mapped_column(ForeignKey("users.id"))
-    status = mapped_column(String, default="Новая", index=True)
+    # Код из statuses.OrderStatus; подпись для показа — statuses.status_label
+    status = mapped_column(SmallInteger, nullable=False, default=OrderStatus.NEW_FROM_USER)
     created_at = mapped_column(DateTime, default=datetime.utcnow)
     preferred_time = mapped_column(String, nullable=True)
 
@@ -43,6 +116,77 @@ class Order(Base):
     user = relationship("User", back_populates="orders", lazy="raise")
 
 
+def change_active_orders(user_id: int, delta: int) -> Update:
+    """
+    UPDATE счётчика активных заявок пользователя на delta.
+    Выполняется в той же транзакции, что и изменение самой заявки.
+    Возвращает telegram_id пользователя, чтобы сбросить его из кеша,
+    и новое значение счётчика.
+    """
+    stmt = update(User).where(User.id == user_id)
+    if delta < 0:
+        stmt = stmt.where(User.active_orders >= -delta)
+    return (
+        stmt.values(active_orders=User.active_orders + delta)
+        .returning(User.telegram_id, User.active_orders)
+        .execution_options(synchronize_session=False)
+    )
+
+
+def cancel_active_order(telegram_id: int, order_id: int | None = None) -> Delete:
+    """
+    DELETE одной активной заявки пользователя telegram_id одним запросом.
+    С order_id удаляется только она: чужие, исполненные и несуществующие заявки
+    не подходят под условие. Без order_id — единственная активная заявка
+    пользователя; если активных несколько, не удаляется ничего.
+    Счётчик владельца уменьшает триггер orders_active_ad (migrations.py) в том же
+    запросе. Возвращает id и user_id удалённой заявки и remaining — сколько
+    активных заявок у владельца осталось.
+    """
+    owner = select(User.id).where(User.telegram_id == telegram_id).scalar_subquery()
+    if order_id is None:
+        # NULL, если активных заявок не ровно одна: счётчику здесь не доверяем
+        only_active = (
+            select(func.max(Order.id))
+            .where(Order.user_id == owner, Order.status < OrderStatus.DONE)
+            .having(func.count() == 1)
+            .scalar_subquery()
+        )
+        stmt = delete(Order).where(Order.id == only_active)
+    else:
+        stmt = delete(Order).where(
+            Order.id == order_id, Order.user_id == owner, Order.status < OrderStatus.DONE
+        )
+
+    # Удаляется ровно одна строка, и сама она из подсчёта исключена, поэтому
+    # результат не зависит от того, видит ли подзапрос уже выполненный DELETE.
+    # Подзапрос задан текстом: в RETURNING для SQLite SQLAlchemy снимает имена
+    # таблиц с колонок, и корреляция сравнивала бы колонку саму с собой
+    remaining = literal_column(
+        "(SELECT COUNT(*) FROM orders AS other WHERE other.user_id = orders.user_id "
+        f"AND other.status < {int(OrderStatus.DONE)} AND other.id != orders.id)"
+    ).label("remaining")
+    return stmt.returning(Order.id, Order.user_id, remaining).execution_options(synchronize_session=False)
+
+
+def delete_order(order_id: int) -> Delete:
+    """
+    DELETE заявки администратором. Счётчик владельца, если заявка была активной,
+    уменьшает триггер orders_active_ad. Возвращает status и owner_telegram_id,
+    чтобы сбросить владельца из кеша.
+    """
+    owner_telegram_id = literal_column(
+        "(SELECT telegram_id FROM users WHERE users.id = orders.user_id)"
+    ).label("owner_telegram_id")
+    return (
+        delete(Order)
+        .where(Order.id == order_id)
+        .returning(Order.status, owner_telegram_id)
+        .execution_options(synchronize_session=False)
+    )
+
+
 async def init_db() -> None:
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
+        await run_migrations(conn)
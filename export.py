@@ -0,0 +1,163 @@
+# export.py
+import asyncio
+import csv
+import io
+import os
+import zipfile
+from datetime import datetime, timedelta
+from typing import AsyncIterator, TextIO
+
+from sqlalchemy import select
+
+from db import async_read_sessionmaker, Order, User
+from statuses import OrderStatus, status_label
+
+EXPORT_CHUNK_SIZE = 2000
+# Несжатый CSV — около 15 МиБ на 100 тыс. заявок; в zip часть из 500 тыс.
+# занимает ~10 МБ, с запасом до лимита Bot API на загрузку файла (50 МБ)
+EXPORT_PART_ROWS = 500_000
+BOT_API_UPLOAD_LIMIT = 50 * 1000 * 1000
+
+EXPORT_COLUMNS = [
+    "order_id", "status", "created_at", "completed_at", "preferred_time",
+    "name", "phone", "address", "organization", "username", "telegram_id",
+]
+
+
+def export_query(status: str = "all", date_from: datetime | None = None, date_to: datetime | None = None):
+    """
+    Запрос выгрузки: только нужные колонки, без ORM-объектов.
+    status: "active", "done" или "all"; date_to включительно (по дню).
+    """
+    q = (
+        select(
+            Order.id, Order.status, Order.created_at, Order.completed_at, Order.preferred_time,
+            User.name, User.phone, User.address, User.organization, User.username, User.telegram_id,
+        )
+        .outerjoin(User, Order.user_id == User.id)
+        .order_by(Order.id)
+    )
+    if status == "active":
+        q = q.where(Order.status < OrderStatus.DONE)
+    elif status == "done":
+        q = q.where(Order.status >= OrderStatus.DONE)
+    if date_from:
+        q = q.where(Order.created_at >= date_from)
+    if date_to:
+        q = q.where(Order.created_at < date_to + timedelta(days=1))
+    return q
+
+
+async def iter_order_rows(
+    status: str = "all",
+    date_from: datetime | None = None,
+    date_to: datetime | None = None,
+    chunk_size: int = EXPORT_CHUNK_SIZE,
+) -> AsyncIterator[list[tuple]]:
+    """
+    Порции строк выгрузки: читаются с сервера по chunk_size (yield_per),
+    поэтому расход памяти не зависит от размера таблицы.
+    """
+    async with async_read_sessionmaker() as session:
+        result = await session.stream(
+            export_query(status, date_from, date_to).execution_options(yield_per=chunk_size)
+        )
+        async for partition in result.partitions():
+            # В CSV — подпись статуса, а не код
+            yield [(row[0], status_label(row[1]), *row[2:]) for row in partition]
+
+
+async def write_orders_csv(
+    file: TextIO,
+    status: str = "all",
+    date_from: datetime | None = None,
+    date_to: datetime | None = None,
+    chunk_size: int = EXPORT_CHUNK_SIZE,
+) -> int:
+    """
+    Потоково пишет заявки в один CSV. Возвращает количество выгруженных заявок.
+    """
+    writer = csv.writer(file)
+    writer.writerow(EXPORT_COLUMNS)
+
+    rows = 0
+    async for partition in iter_order_rows(status, date_from, date_to, chunk_size):
+        writer.writerows(partition)
+        rows += len(partition)
+    return rows
+
+
+class _ZipParts:
+    """
+    Синхронная запись CSV в zip-части. Форматирование и сжатие идут
+    через asyncio.to_thread, чтобы не блокировать цикл событий.
+    """
+
+    def __init__(self, directory: str, name: str, part_rows: int):
+        self.directory = directory
+        self.name = name
+        self.part_rows = part_rows
+        self.paths: list[str] = []
+        self.rows = 0
+        self._part = 0
+        self._open_part()
+
+    def _open_part(self) -> None:
+        path = os.path.join(self.directory, f"{self.name}_part{len(self.paths) + 1}.zip")
+        self.paths.append(path)
+        self._archive = zipfile.ZipFile(path, "w", compression=zipfile.ZIP_DEFLATED)
+        # utf-8-sig — чтобы Excel правильно открыл кириллицу
+        member = self._archive.open(f"{self.name}.csv", "w", force_zip64=True)
+        self._file = io.TextIOWrapper(member, encoding="utf-8-sig", newline="")
+        self._writer = csv.writer(self._file)
+        self._writer.writerow(EXPORT_COLUMNS)
+        self._part = 0
+
+    def _close_part(self) -> None:
+        self._file.close()
+        self._archive.close()
+
+    def write(self, partition: list[tuple]) -> None:
+        while partition:
+            if self._part == self.part_rows:
+                self._close_part()
+                self._open_part()
+            free = self.part_rows - self._part
+            chunk, partition = partition[:free], partition[free:]
+            self._writer.writerows(chunk)
+            self._part += len(chunk)
+            self.rows += len(chunk)
+
+    def close(self) -> list[str]:
+        self._close_part()
+        if len(self.paths) == 1:
+            # Одна часть — без суффикса
+            single = os.path.join(self.directory, f"{self.name}.zip")
+            os.replace(self.paths[0], single)
+            self.paths = [single]
+        return self.paths
+
+
+async def write_orders_zip(
+    directory: str,
+    name: str,
+    status: str = "all",
+    date_from: datetime | None = None,
+    date_to: datetime | None = None,
+    part_rows: int = EXPORT_PART_ROWS,
+    chunk_size: int = EXPORT_CHUNK_SIZE,
+) -> tuple[list[str], int]:
+    """
+    Потоково пишет заявки в zip-архивы в directory: name.zip, а если заявок
+    больше part_rows — name_part1.zip, name_part2.zip и т.д. В каждом архиве
+    один CSV с заголовком, так что части открываются независимо.
+    Строки читаются в цикле событий, а пишутся и сжимаются в отдельном потоке.
+    Возвращает пути к архивам и общее количество выгруженных заявок.
+    """
+    parts = await asyncio.to_thread(_ZipParts, directory, name, part_rows)
+    try:
+        async for partition in iter_order_rows(status, date_from, date_to, chunk_size):
+            await asyncio.to_thread(parts.write, partition)
+    finally:
+        paths = await asyncio.to_thread(parts.close)
+    return paths, parts.rows
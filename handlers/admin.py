@@ -1,55 +1,45 @@
+import os
 import re
+import asyncio
 import logging
+import tempfile
 
+from dataclasses import dataclass, field
 from datetime import datetime, timedelta
-from zoneinfo import ZoneInfo
+from time import monotonic
 
 from aiogram import types, F, Router
-from aiogram.filters import Command
+from aiogram.filters import Command, CommandObject
 from aiogram.fsm.context import FSMContext
+from aiogram.exceptions import TelegramAPIError
+from aiogram.types import FSInputFile
 from aiogram.utils.keyboard import InlineKeyboardBuilder
 
-from sqlalchemy import select, delete
+from sqlalchemy import select, delete, func
 from sqlalchemy.orm import selectinload
 
-from db import async_sessionmaker, Order, User
-from config import ADMIN_IDS
+from db import async_sessionmaker, async_read_sessionmaker, Order, User, change_active_orders, delete_order
+from cache import get_order, invalidate_user, invalidate_order
+from archive import archive_orders, lookup_order
+from export import BOT_API_UPLOAD_LIMIT, write_orders_zip
+from search import search_orders, SEARCH_PAGE_SIZE
+from notifications import status_notifier
+from statuses import OrderStatus, STATUS_ICONS, is_active, status_label
+from config import (
+    ADMIN_IDS, ARCHIVE_ENABLED, CLEANUP_BATCH_SIZE, CLEANUP_BATCH_PAUSE, CLEANUP_TIME_BUDGET
+)
 from states import AdminStates
+from middlewares.db_session import UnitOfWork
+from render import (
+    MOSCOW_TZ, ADMIN_BACK_TO_ACTIVE, ADMIN_BACK_TO_MAIN, ADMIN_MAIN, BACK_TO_MENU_BUTTON,
+    confirm_delete_markup, format_ts, order_detail_markup
+)
 
-MOSCOW_TZ = ZoneInfo("Europe/Moscow")
 router = Router()
 
-POSSIBLE_STATUSES = [
-    "Новая (От пользователя)",
-    "Новая (От Админа)",
-    "В работе",
-    "Исполнено",
-]
-
-
-def admin_main_keyboard() -> types.InlineKeyboardMarkup:
-    kb = InlineKeyboardBuilder()
-    kb.button(text="Добавить заявку", callback_data="admin_add_order")
-    kb.button(text="Активные заявки", callback_data="admin_orders_active")
-    kb.button(text="Исполненные заявки", callback_data="admin_orders_done")
-    kb.button(text="Помощь", callback_data="admin_help")
-    kb.adjust(1)
-    return kb.as_markup()
-
-
-def admin_back_to_main() -> types.InlineKeyboardMarkup:
-    kb = InlineKeyboardBuilder()
-    kb.button(text="↩ Назад в меню", callback_data="admin_back")
-    kb.adjust(1)
-    return kb.as_markup()
-
-
-def admin_orders_button() -> types.InlineKeyboardMarkup:
-    # Используется в handlers/order.py для ссылки на активные заявки
-    kb = InlineKeyboardBuilder()
-    kb.button(text="Список заявок", callback_data="admin_orders_active")
-    kb.adjust(1)
-    return kb.as_markup()
+ORDERS_PER_PAGE = 10
+ORDERS_COUNT_TTL = 30  # секунд
+_orders_count_cache: dict[bool, tuple[float, int]] = {}
 
 
 def is_admin(user_id: int) -> bool:
@@ -67,7 +57,7 @@ async def cmd_admin(message: types.Message):
     await message.answer(
         "🔐 *Админ-панель*",
         parse_mode="Markdown",
-        reply_markup=admin_main_keyboard()
+        reply_markup=ADMIN_MAIN
     )
 
 
@@ -105,32 +95,30 @@ async def process_user_address(message: types.Message, state: FSMContext):
 
 
 @router.message(AdminStates.waiting_order_time)
-async def process_order_time(message: types.Message, state: FSMContext):
+async def process_order_time(message: types.Message, state: FSMContext, uow: UnitOfWork):
     data = await state.get_data()
     preferred_time = message.text.strip()
 
-    async with async_sessionmaker() as session:
-        async with session.begin():
-            new_user = User(
-                name=data['name'],
-                phone=data['phone'],
-                address=data['address'],
-                telegram_id=None,
-                username=None
-            )
-            session.add(new_user)
-            await session.flush()  # чтобы получить new_user.id
-
-            new_order = Order(
-                user_id=new_user.id,
-                status="Новая (От Админа)",
-                preferred_time=preferred_time
-            )
-            session.add(new_order)
-        # транзакция автоматически зафиксирована
+    session = uow.session
+    new_user = User(
+        name=data['name'],
+        phone=data['phone'],
+        address=data['address'],
+        telegram_id=None,
+        username=None,
+        active_orders=1
+    )
+    session.add(new_user)
+    await session.flush()  # чтобы получить new_user.id
 
-        await session.refresh(new_user)
-        await session.refresh(new_order)
+    new_order = Order(
+        user_id=new_user.id,
+        status=OrderStatus.NEW_FROM_ADMIN,
+        preferred_time=preferred_time
+    )
+    session.add(new_order)
+    await session.flush()
+    uow.after_commit(invalidate_orders_count)
 
     await message.answer(
         f"✅ Заявка *#{new_order.id}* создана!\n"
@@ -138,7 +126,7 @@ async def process_order_time(message: types.Message, state: FSMContext):
         f"▪️ Телефон: {new_user.phone}\n"
         f"▪️ Время: {preferred_time}",
         parse_mode="Markdown",
-        reply_markup=admin_back_to_main()
+        reply_markup=ADMIN_BACK_TO_MAIN
     )
     await state.clear()
 
@@ -146,48 +134,88 @@ async def process_order_time(message: types.Message, state: FSMContext):
 @router.callback_query(F.data.startswith("admin_orders"))
 async def show_orders(callback: types.CallbackQuery, state: FSMContext):
     filter_done = callback.data == "admin_orders_done"
-    async with async_sessionmaker() as session:
-        q = select(Order).options(selectinload(Order.user))
-        if filter_done:
-            q = q.where(Order.status == "Исполнено")
-        else:
-            q = q.where(Order.status != "Исполнено")
-        q = q.order_by(Order.id.desc())
-        result = await session.execute(q)
-        orders = result.scalars().all()
+    # В состоянии храним только фильтр и курсоры страниц, а не сами заявки
+    await state.update_data(orders_done=filter_done, page_cursors=[None], next_cursor=None)
+    await display_orders_page(callback, state)
 
-    if not orders:
-        text = "📭 Список исполненных заявок пуст" if filter_done else "📭 Список активных заявок пуст"
-        await callback.message.edit_text(text, reply_markup=admin_back_to_main())
-        return
 
-    await state.update_data(all_orders=orders, current_page=0)
-    await display_orders_page(callback, state)
+def orders_filter(filter_done: bool):
+    if filter_done:
+        return Order.status >= OrderStatus.DONE
+    # Диапазон совпадает с условием частичного индекса ix_orders_active
+    return Order.status < OrderStatus.DONE
+
+
+async def count_orders(filter_done: bool) -> int:
+    """
+    Количество заявок для заголовка списка.
+    Кешируется на ORDERS_COUNT_TTL секунд, чтобы не считать таблицу на каждый клик.
+    """
+    now = monotonic()
+    cached = _orders_count_cache.get(filter_done)
+    if cached and now - cached[0] < ORDERS_COUNT_TTL:
+        return cached[1]
+
+    async with async_read_sessionmaker() as session:
+        result = await session.execute(
+            select(func.count(Order.id)).where(orders_filter(filter_done))
+        )
+        total = result.scalar_one()
+
+    _orders_count_cache[filter_done] = (now, total)
+    return total
+
+
+def invalidate_orders_count() -> None:
+    _orders_count_cache.clear()
 
 
 async def display_orders_page(callback: types.CallbackQuery, state: FSMContext):
     data = await state.get_data()
-    orders = data["all_orders"]
-    page = data.get("current_page", 0)
-    per_page = 10
-    chunk = orders[page*per_page:(page+1)*per_page]
+    filter_done = data.get("orders_done", False)
+    cursors = data.get("page_cursors") or [None]
+    before_id = cursors[-1]
+
+    # Keyset-пагинация: берём на одну заявку больше, чтобы узнать, есть ли следующая страница
+    async with async_read_sessionmaker() as session:
+        q = select(Order.id, Order.status, Order.created_at).where(orders_filter(filter_done))
+        if before_id is not None:
+            q = q.where(Order.id < before_id)
+        q = q.order_by(Order.id.desc()).limit(ORDERS_PER_PAGE + 1)
+        result = await session.execute(q)
+        rows = result.all()
+
+    if not rows:
+        if len(cursors) > 1:
+            # Страница опустела (например, после удаления) — возвращаемся на предыдущую
+            await state.update_data(page_cursors=cursors[:-1], next_cursor=None)
+            await display_orders_page(callback, state)
+            return
+        text = "📭 Список исполненных заявок пуст" if filter_done else "📭 Список активных заявок пуст"
+        await callback.message.edit_text(text, reply_markup=ADMIN_BACK_TO_MAIN)
+        return
 
+    has_next = len(rows) > ORDERS_PER_PAGE
+    chunk = rows[:ORDERS_PER_PAGE]
+    await state.update_data(next_cursor=chunk[-1].id if has_next else None)
+
+    page = len(cursors) - 1
     kb = InlineKeyboardBuilder()
     for o in chunk:
-        ts = o.created_at.replace(tzinfo=ZoneInfo("UTC")).astimezone(MOSCOW_TZ)
         kb.button(
-            text=f"#{o.id} {o.status} ({ts:%Y-%m-%d %H:%M})",
+            text=f"#{o.id} {status_label(o.status)} ({format_ts(o.created_at, '%Y-%m-%d %H:%M')})",
             callback_data=f"order_detail_{o.id}"
         )
     if page > 0:
         kb.button(text="⬅️ Назад", callback_data="prev_page")
-    if (page+1)*per_page < len(orders):
+    if has_next:
         kb.button(text="Вперед ➡️", callback_data="next_page")
 
-    kb.button(text="↩ Назад в меню", callback_data="admin_back")
+    kb.add(BACK_TO_MENU_BUTTON)
     kb.adjust(1)
 
-    total = (len(orders)-1)//per_page + 1
+    total_orders = await count_orders(filter_done)
+    total = max((total_orders - 1) // ORDERS_PER_PAGE + 1, page + 1)
     await callback.message.edit_text(
         f"📋 Заявки (страница {page+1}/{total}):",
         parse_mode="Markdown",
@@ -198,56 +226,33 @@ async def display_orders_page(callback: types.CallbackQuery, state: FSMContext):
 @router.callback_query(F.data == "prev_page")
 async def prev_page(callback: types.CallbackQuery, state: FSMContext):
     data = await state.get_data()
-    if data["current_page"] > 0:
-        await state.update_data(current_page=data["current_page"] - 1)
+    cursors = data.get("page_cursors") or [None]
+    if len(cursors) > 1:
+        await state.update_data(page_cursors=cursors[:-1])
         await display_orders_page(callback, state)
 
 
 @router.callback_query(F.data == "next_page")
 async def next_page(callback: types.CallbackQuery, state: FSMContext):
     data = await state.get_data()
-    await state.update_data(current_page=data.get("current_page", 0) + 1)
-    await display_orders_page(callback, state)
+    next_cursor = data.get("next_cursor")
+    if next_cursor is not None:
+        cursors = data.get("page_cursors") or [None]
+        await state.update_data(page_cursors=cursors + [next_cursor])
+        await display_orders_page(callback, state)
 
 
 @router.callback_query(F.data.startswith("order_detail_"))
 async def order_detail(callback: types.CallbackQuery):
     order_id = int(callback.data.rsplit("_", 1)[1])
-    async with async_sessionmaker() as session:
-        order = await session.get(Order, order_id, options=[selectinload(Order.user)])
+    order = await get_order(order_id)
 
     if not order:
-        await callback.message.edit_text("Заявка не найдена.", reply_markup=admin_back_to_main())
+        await callback.message.edit_text("Заявка не найдена.", reply_markup=ADMIN_BACK_TO_MAIN)
         return
 
-    # кнопки смены статуса
-    kb_status = InlineKeyboardBuilder()
-    for status in POSSIBLE_STATUSES:
-        if status != order.status:
-            kb_status.button(text=status, callback_data=f"set_status_{order.id}_{status}")
-
-    # кнопки управления
-    kb_ctrl = InlineKeyboardBuilder()
-    kb_ctrl.button(text="🗑 Удалить", callback_data=f"confirm_delete_{order.id}")
-    kb_ctrl.button(text="↩ К списку", callback_data="admin_orders_active")
-    kb_ctrl.adjust(2)
-
-    kb = InlineKeyboardBuilder()
-    kb.attach(kb_status)
-    kb.attach(kb_ctrl)
-    kb.adjust(2, repeat=True)
-
-    ts = order.created_at.replace(tzinfo=ZoneInfo("UTC")).astimezone(MOSCOW_TZ)
-    completed = (
-        order.completed_at.replace(tzinfo=ZoneInfo("UTC")).astimezone(MOSCOW_TZ).strftime('%d.%m.%Y %H:%M')
-        if order.completed_at else "Не завершена"
-    )
-    status_text = {
-        "Новая (От пользователя)": "🟡 Новая (От пользователя)",
-        "Новая (От Админа)":    "🟠 Новая (От Админа)",
-        "В работе":             "🟢 В работе",
-        "Исполнено":            "🔵 Исполнено"
-    }.get(order.status, order.status)
+    completed = format_ts(order.completed_at, default="Не завершена")
+    status_text = f"{STATUS_ICONS.get(order.status, '⚪')} {status_label(order.status)}"
 
     user = order.user or User(name="N/A", phone="N/A", address="N/A", organization="N/A")
     info = (
@@ -263,67 +268,228 @@ async def order_detail(callback: types.CallbackQuery):
         f"<b>📦 Детали:</b>\n"
         f"▪ Время: {order.preferred_time}\n"
         f"▪ Статус: {status_text}\n"
-        f"▪ Создано: {ts:%d.%m.%Y %H:%M}\n"
+        f"▪ Создано: {format_ts(order.created_at)}\n"
         f"▪ Завершено: {completed}",
         parse_mode="HTML",
-        reply_markup=kb.as_markup()
+        reply_markup=order_detail_markup(order.id, order.status)
     )
 
 
 @router.callback_query(F.data.startswith("confirm_delete_"))
 async def confirm_delete(callback: types.CallbackQuery):
     order_id = int(callback.data.rsplit("_", 1)[1])
-    kb = InlineKeyboardBuilder()
-    kb.button(text="✅ Да, удалить", callback_data=f"delete_order_{order_id}")
-    kb.button(text="❌ Отмена", callback_data=f"order_detail_{order_id}")
-    kb.adjust(2)
     await callback.message.edit_text(
         f"⚠️ Удалить заявку #{order_id}?",
-        reply_markup=kb.as_markup()
+        reply_markup=confirm_delete_markup(order_id)
     )
 
 
 @router.callback_query(F.data.startswith("delete_order_"))
-async def delete_order_handler(callback: types.CallbackQuery, state: FSMContext):
+async def delete_order_handler(callback: types.CallbackQuery, state: FSMContext, uow: UnitOfWork):
+    if not is_admin(callback.from_user.id):
+        await callback.answer("У вас нет прав администратора.")
+        return
     order_id = int(callback.data.rsplit("_", 1)[1])
-    async with async_sessionmaker() as session:
-        async with session.begin():
-            o = await session.get(Order, order_id)
-            if o:
-                await session.delete(o)
+    deleted = (await uow.session.execute(delete_order(order_id))).one_or_none()
+    owner_tg_id = deleted.owner_telegram_id if deleted and is_active(deleted.status) else None
+    uow.after_commit(invalidate_orders_count)
+    uow.after_commit(invalidate_user, owner_tg_id)
+    uow.after_commit(invalidate_order, order_id)
+    # Список ниже читается другой сессией — удаление должно быть уже зафиксировано
+    await uow.commit()
     await callback.message.edit_text(
         f"✅ Заявка #{order_id} удалена.",
-        reply_markup=admin_back_to_main()
+        reply_markup=ADMIN_BACK_TO_MAIN
     )
     await show_orders(callback, state)
 
 
 @router.callback_query(F.data.startswith("set_status_"))
-async def set_order_status(callback: types.CallbackQuery):
-    payload = callback.data[len("set_status_"):]          # e.g. "2_Исполнено"
-    order_id_str, new_status = payload.split("_", 1)
+async def set_order_status(callback: types.CallbackQuery, uow: UnitOfWork):
+    # callback_data можно подделать, а смена статуса пишет клиенту
+    if not is_admin(callback.from_user.id):
+        await callback.answer("У вас нет прав администратора.")
+        return
+    payload = callback.data[len("set_status_"):]          # e.g. "2_10"
+    order_id_str, status_str = payload.split("_", 1)
     try:
         order_id = int(order_id_str)
     except ValueError:
         await callback.answer("❌ Неверный ID заявки.")
         return
+    try:
+        new_status = OrderStatus(int(status_str))
+    except ValueError:
+        # Например, кнопка из старого сообщения со строковым статусом
+        await callback.answer("❌ Неизвестный статус, откройте заявку заново.")
+        return
 
-    async with async_sessionmaker() as session:
-        order = await session.get(Order, order_id)
-        if not order:
-            await callback.answer("❌ Заявка не найдена.")
+    session = uow.session
+    order = await session.get(Order, order_id, options=[selectinload(Order.user)])
+    if not order:
+        await callback.answer("❌ Заявка не найдена.")
+        return
+    old_status = order.status
+    owner_tg_id = order.user.telegram_id if order.user else None
+    was_active = is_active(old_status)
+    now_active = is_active(new_status)
+    order.status = new_status
+    order.completed_at = None if now_active else datetime.utcnow()
+    if was_active != now_active and order.user_id:
+        await session.execute(change_active_orders(order.user_id, 1 if now_active else -1))
+    await session.flush()
+    uow.after_commit(invalidate_orders_count)
+    if was_active != now_active:
+        uow.after_commit(invalidate_user, owner_tg_id)
+    uow.after_commit(invalidate_order, order_id)
+    uow.after_commit(status_notifier.notify_status, callback.bot, owner_tg_id, order_id, old_status, new_status)
+
+    await callback.message.edit_text(
+        f"✅ Статус #{order_id} -> {status_label(new_status)}",
+        reply_markup=ADMIN_BACK_TO_ACTIVE
+    )
+
+
+def format_archived_ts(value: str | None) -> str:
+    if not value:
+        return "—"
+    return format_ts(datetime.fromisoformat(value))
+
+
+@router.message(Command("archive"))
+async def cmd_archive(message: types.Message, command: CommandObject):
+    if not is_admin(message.from_user.id):
+        await message.answer("У вас нет прав администратора.")
+        return
+    if not command.args or not command.args.strip().lstrip("#").isdigit():
+        await message.answer("Использование: /archive НОМЕР_ЗАЯВКИ", parse_mode=None)
+        return
+
+    order_id = int(command.args.strip().lstrip("#"))
+    record = await lookup_order(order_id)
+    if record is None:
+        await message.answer(f"Заявка #{order_id} в архиве не найдена.")
+        return
+
+    user = record["user"] or {}
+    await message.answer(
+        f"<b>🗄 Заявка #{record['id']} (архив)</b>\n\n"
+        f"<b>👤 Клиент:</b>\n"
+        f"▪ Имя: {user.get('name', 'N/A')}\n"
+        f"▪ Телефон: {user.get('phone', 'N/A')}\n"
+        f"▪ Адрес: {user.get('address', 'N/A')}\n"
+        f"▪ Организация: {user.get('organization', 'N/A')}\n\n"
+        f"<b>📦 Детали:</b>\n"
+        f"▪ Время: {record['preferred_time']}\n"
+        f"▪ Статус: {record['status']}\n"
+        f"▪ Создано: {format_archived_ts(record['created_at'])}\n"
+        f"▪ Завершено: {format_archived_ts(record['completed_at'])}",
+        parse_mode="HTML"
+    )
+
+
+EXPORT_STATUSES = {"active", "done", "all"}
+EXPORT_USAGE = (
+    "Использование: /export [active|done|all] [с ГГГГ-ММ-ДД] [по ГГГГ-ММ-ДД]\n"
+    "Например: /export done 2025-01-01 2025-01-31"
+)
+
+
+@router.message(Command("export"))
+async def cmd_export(message: types.Message, command: CommandObject):
+    if not is_admin(message.from_user.id):
+        await message.answer("У вас нет прав администратора.")
+        return
+
+    args = (command.args or "").split()
+    status = "all"
+    if args and args[0] in EXPORT_STATUSES:
+        status = args.pop(0)
+    try:
+        dates = [datetime.strptime(arg, "%Y-%m-%d") for arg in args]
+    except ValueError:
+        dates = None
+    if dates is None or len(dates) > 2:
+        await message.answer(EXPORT_USAGE, parse_mode=None)
+        return
+    date_from = dates[0] if dates else None
+    date_to = dates[1] if len(dates) > 1 else None
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        name = f"orders_{status}_{datetime.now(MOSCOW_TZ):%Y%m%d_%H%M}"
+        try:
+            paths, rows = await write_orders_zip(tmp_dir, name, status, date_from, date_to)
+        except Exception:
+            logging.exception("Ошибка выгрузки заявок")
+            await message.answer("❌ Не удалось сформировать выгрузку, подробности в логе.")
             return
-        order.status = new_status
-        order.completed_at = datetime.utcnow() if new_status == "Исполнено" else None
-        await session.commit()
+
+        for number, path in enumerate(paths, 1):
+            caption = f"📤 Выгружено заявок: {rows}"
+            if len(paths) > 1:
+                caption += f" (часть {number} из {len(paths)})"
+            if os.path.getsize(path) > BOT_API_UPLOAD_LIMIT:
+                await message.answer(
+                    f"❌ Файл выгрузки {os.path.basename(path)} больше 50 МБ — Telegram его не примет. "
+                    "Сузьте период или статус."
+                )
+                return
+            try:
+                await message.answer_document(FSInputFile(path), caption=caption)
+            except TelegramAPIError as e:
+                logging.error(f"Не удалось отправить выгрузку {path}: {e}")
+                await message.answer(f"❌ Не удалось отправить файл выгрузки: {e.message}", parse_mode=None)
+                return
+
+
+FIND_USAGE = "Использование: /find ТЕКСТ — имя, телефон, адрес или организация клиента"
+
+
+async def render_find_page(query: str, page: int):
+    rows, has_next = await search_orders(query, page, SEARCH_PAGE_SIZE)
+    if not rows:
+        return f"🔍 По запросу «{query}» ничего не найдено", ADMIN_BACK_TO_MAIN
 
     kb = InlineKeyboardBuilder()
-    kb.button(text="↩ Назад к активным", callback_data="admin_orders_active")
+    for o in rows:
+        kb.button(
+            text=f"#{o.id} {o.name} ({status_label(o.status)})",
+            callback_data=f"order_detail_{o.id}"
+        )
+    if page > 0:
+        kb.button(text="⬅️ Назад", callback_data=f"find_page_{page - 1}")
+    if has_next:
+        kb.button(text="Вперед ➡️", callback_data=f"find_page_{page + 1}")
+    kb.add(BACK_TO_MENU_BUTTON)
     kb.adjust(1)
-    await callback.message.edit_text(
-        f"✅ Статус #{order_id} -> {new_status}",
-        reply_markup=kb.as_markup()
-    )
+    return f"🔍 Результаты по запросу «{query}» (страница {page + 1}):", kb.as_markup()
+
+
+@router.message(Command("find"))
+async def cmd_find(message: types.Message, command: CommandObject, state: FSMContext):
+    if not is_admin(message.from_user.id):
+        await message.answer("У вас нет прав администратора.")
+        return
+    query = (command.args or "").strip()
+    if not query:
+        await message.answer(FIND_USAGE, parse_mode=None)
+        return
+
+    await state.update_data(find_query=query)
+    text, markup = await render_find_page(query, 0)
+    await message.answer(text, parse_mode=None, reply_markup=markup)
+
+
+@router.callback_query(F.data.startswith("find_page_"))
+async def find_page(callback: types.CallbackQuery, state: FSMContext):
+    data = await state.get_data()
+    query = data.get("find_query")
+    if not query:
+        await callback.answer("Поиск устарел, повторите /find", show_alert=True)
+        return
+    page = max(int(callback.data.split("_")[-1]), 0)
+    text, markup = await render_find_page(query, page)
+    await callback.message.edit_text(text, parse_mode=None, reply_markup=markup)
 
 
 @router.callback_query(F.data == "admin_help")
@@ -333,11 +499,14 @@ async def show_admin_help(callback: types.CallbackQuery):
         "🔸 Добавить заявку\n"
         "🔸 Просмотреть активные / исполненные заявки\n"
         "🔸 Сменить статус или удалить заявку\n"
+        "🔸 /find <текст> — поиск заявок по данным клиента\n"
+        "🔸 /archive <номер> — найти заявку в архиве\n"
+        "🔸 /export [active|done|all] [с] [по] — выгрузить заявки в CSV\n"
     )
     await callback.message.edit_text(
         text,
         parse_mode="Markdown",
-        reply_markup=admin_back_to_main()
+        reply_markup=ADMIN_BACK_TO_MAIN
     )
 
 
@@ -346,20 +515,111 @@ async def back_to_admin_menu(callback: types.CallbackQuery):
     await callback.message.edit_text(
         "🔐 *Админ-панель*",
         parse_mode="Markdown",
-        reply_markup=admin_main_keyboard()
+        reply_markup=ADMIN_MAIN
     )
 
 
-async def cleanup_old_orders():
-    try:
-        cutoff = datetime.utcnow() - timedelta(hours=24)
-        async with async_sessionmaker() as session:
-            await session.execute(
+@dataclass
+class CleanupReport:
+    removed: int = 0
+    batches: int = 0
+    batch_timings: list[float] = field(default_factory=list)
+    finished: bool = True
+    dry_run: bool = False
+
+
+async def delete_expired_batch(expired, batch_size: int) -> list[int]:
+    """
+    Удаляет одну порцию устаревших заявок, при ARCHIVE_ENABLED предварительно
+    дописав их вместе со снимком пользователя в архив. Возвращает id удалённых.
+    """
+    async with async_sessionmaker() as session:
+        if not ARCHIVE_ENABLED:
+            result = await session.execute(
                 delete(Order)
-                .where(Order.status == "Исполнено")
-                .where(Order.completed_at < cutoff)
+                .where(Order.id.in_(select(Order.id).where(*expired).limit(batch_size)))
+                .returning(Order.id)
+                .execution_options(synchronize_session=False)
             )
+            removed_ids = result.scalars().all()
             await session.commit()
-        logging.info("Очистка старых исполненных заявок завершена.")
+            return removed_ids
+
+        result = await session.execute(
+            select(Order)
+            .options(selectinload(Order.user))
+            .where(*expired)
+            .order_by(Order.id)
+            .limit(batch_size)
+        )
+        orders = result.scalars().all()
+        if not orders:
+            return []
+
+        # Сначала архив, потом удаление: при сбое заявка может попасть в архив
+        # повторно, но не потеряется
+        await archive_orders(orders)
+        removed_ids = [o.id for o in orders]
+        await session.execute(
+            delete(Order)
+            .where(Order.id.in_(removed_ids))
+            .execution_options(synchronize_session=False)
+        )
+        await session.commit()
+        return removed_ids
+
+
+async def cleanup_old_orders(
+    batch_size: int = CLEANUP_BATCH_SIZE,
+    time_budget: float = CLEANUP_TIME_BUDGET,
+    dry_run: bool = False,
+) -> CleanupReport | None:
+    """
+    Удаляет (при ARCHIVE_ENABLED — архивирует) исполненные заявки старше 24 часов
+    порциями по batch_size строк.
+    Каждая порция — отдельная короткая транзакция, между порциями управление
+    возвращается в event loop, чтобы не держать блокировку записи SQLite.
+    time_budget > 0 ограничивает длительность запуска: остаток удалится в следующий раз.
+    dry_run=True только считает, сколько заявок было бы удалено.
+    """
+    try:
+        cutoff = datetime.utcnow() - timedelta(hours=24)
+        expired = (Order.status == OrderStatus.DONE, Order.completed_at < cutoff)
+        report = CleanupReport(dry_run=dry_run)
+
+        if dry_run:
+            async with async_read_sessionmaker() as session:
+                report.removed = await session.scalar(select(func.count(Order.id)).where(*expired))
+            logging.info(f"Очистка (dry run): к удалению {report.removed} заявок.")
+            return report
+
+        started = monotonic()
+        while True:
+            batch_started = monotonic()
+            removed_ids = await delete_expired_batch(expired, batch_size)
+
+            for order_id in removed_ids:
+                invalidate_order(order_id)
+            if removed_ids:
+                report.removed += len(removed_ids)
+                report.batches += 1
+                report.batch_timings.append(monotonic() - batch_started)
+
+            if len(removed_ids) < batch_size:
+                break
+            if time_budget and monotonic() - started >= time_budget:
+                report.finished = False
+                break
+            await asyncio.sleep(CLEANUP_BATCH_PAUSE)
+
+        invalidate_orders_count()
+        slowest = max(report.batch_timings, default=0)
+        logging.info(
+            f"Очистка старых исполненных заявок завершена: удалено {report.removed} "
+            f"за {report.batches} порций, самая долгая порция {slowest * 1000:.1f} мс"
+            + ("" if report.finished else ", остаток будет удалён при следующем запуске")
+            + "."
+        )
+        return report
     except Exception:
         logging.exception("Ошибка в cleanup_old_orders")
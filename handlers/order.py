@@ -1,59 +1,46 @@
 from aiogram import Router, types, F
 from aiogram.fsm.context import FSMContext
-from aiogram.utils.keyboard import InlineKeyboardBuilder, ReplyKeyboardBuilder
+from aiogram.utils.keyboard import InlineKeyboardBuilder
 
-from sqlalchemy import select, func
+from sqlalchemy import Row, select, update
 from datetime import datetime, time
-import logging
 
-from db import async_sessionmaker, Order, User
-from handlers.admin import admin_orders_button
+from db import Order, User, cancel_active_order
+from cache import get_user, invalidate_user, invalidate_order
+from handlers.admin import invalidate_orders_count
+from middlewares.db_session import UnitOfWork
 from states import OrderStates, EditDataStates, DirectMessageStates
-from config import ADMIN_IDS
-from zoneinfo import ZoneInfo
+from notifications import admin_notifier
+from buttons import ButtonIndex
+from render import (
+    MOSCOW_TZ, BTN_NEW_ORDER, BTN_DIRECT_MESSAGE, BTN_EDIT_DATA, BTN_CANCEL_ORDER, BTN_EDIT_PHONE,
+    BTN_EDIT_ADDRESS, BTN_EDIT_NAME, BTN_EDIT_ORGANIZATION, BTN_EDIT_BACK, ADMIN_ORDERS_LIST,
+    DIRECT_MESSAGE_CANCEL, EDIT_DATA_MENU, EMPTY_INLINE, ORDER_CONFIRM, main_menu_markup
+)
+from statuses import OrderStatus, status_label
 
 router = Router()
-MOSCOW_TZ = ZoneInfo("Europe/Moscow")
+# Кнопки главного меню и меню изменения данных; проверяются раньше остальных обработчиков
+buttons = ButtonIndex()
+buttons.attach(router)
+MAX_ACTIVE_ORDERS = 3
 
 
-async def main_menu_keyboard(user_id: int) -> types.ReplyKeyboardMarkup:
-    kb = ReplyKeyboardBuilder()
-
-    # Считаем активные (не исполненные) заявки
-    async with async_sessionmaker() as session:
-        active_count = await session.execute(
-            select(func.count(Order.id))
-            .join(User)
-            .where(
-                User.telegram_id == user_id,
-                Order.status != "Исполнено"
-            )
-        )
-        active_count = active_count.scalar_one()
-
-    # Показываем кнопку «Оформить заказ» только если < 3 активных
-    if active_count < 3:
-        kb.button(text="🛒 Оформить заказ")
+def main_menu_for(active_count: int) -> types.ReplyKeyboardMarkup:
+    # «Оформить заказ» — только если < 3 активных, «Отменить заказ» — если есть хоть одна
+    return main_menu_markup(active_count < MAX_ACTIVE_ORDERS, active_count > 0)
 
-    kb.button(text="✉️ Написать напрямую")
-    kb.button(text="✏️ Изменить данные")
 
-    # Кнопка «Отменить заказ», если есть хоть одна активная
-    if active_count > 0:
-        kb.button(text="❌ Отменить заказ")
-
-    kb.adjust(1)
-    return kb.as_markup(resize_keyboard=True)
+async def main_menu_keyboard(user_id: int) -> types.ReplyKeyboardMarkup:
+    # Количество активных (не исполненных) заявок хранится в строке пользователя
+    user = await get_user(user_id)
+    return main_menu_for(user.active_orders if user else 0)
 
 
-@router.message(lambda message: "Оформить заказ" in message.text)
+@buttons(BTN_NEW_ORDER)
 async def make_order(message: types.Message, state: FSMContext):
-    # Получаем данные пользователя из базы данных
-    async with async_sessionmaker() as session:
-        user_in_db = await session.execute(
-            select(User).where(User.telegram_id == message.from_user.id)
-        )
-        user = user_in_db.scalar_one_or_none()
+    # Получаем данные пользователя (из кеша или базы данных)
+    user = await get_user(message.from_user.id)
 
     # Форматируем информацию о пользователе
     user_info = "📋 <b>Ваши данные:</b>\n\n"
@@ -65,16 +52,11 @@ async def make_order(message: types.Message, state: FSMContext):
     else:
         user_info += "⚠️ Данные пользователя не найдены\n"
 
-    builder = InlineKeyboardBuilder()
-    builder.button(text="✅ Подтвердить", callback_data="confirm_order")
-    builder.button(text="❌ Отмена", callback_data="cancel_order")
-    builder.adjust(2)
-
     await message.answer(
         f"🛒 <b>Оформление заказа</b>\n\n"
         f"{user_info}\n"
         f"Проверьте данные и подтвердите заказ:",
-        reply_markup=builder.as_markup(),
+        reply_markup=ORDER_CONFIRM,
         parse_mode="HTML"
     )
     await state.set_state(OrderStates.confirm_order)
@@ -87,65 +69,80 @@ async def cancel_order_handler(callback: types.CallbackQuery, state: FSMContext)
 
 
 @router.callback_query(OrderStates.confirm_order, F.data == "confirm_order")
-async def confirm_order_handler(callback: types.CallbackQuery, state: FSMContext):
+async def confirm_order_handler(callback: types.CallbackQuery, state: FSMContext, uow: UnitOfWork):
     now = datetime.now(MOSCOW_TZ)
     cutoff_time = time(11, 30)
     current_time = now.time()
 
-    async with async_sessionmaker() as session:
-        # Проверяем, сколько у пользователя активных (не исполненных) заявок
-        res = await session.execute(
-            select(func.count(Order.id))
-            .join(User)
-            .where(
-                User.telegram_id == callback.from_user.id,
-                Order.status != "Исполнено"
-            )
-        )
-        active_count = res.scalar_one()
-
-        if active_count >= 3:
-            # Блокируем создание новой заявки
-            await callback.message.edit_text(
-                "❌ У вас уже 3 активные заявки. Подождите, пока хотя бы одна "
-                "из них будет отмечена как «Исполнено».",
-                parse_mode="HTML",
-                reply_markup=await main_menu_keyboard(callback.from_user.id)
-            )
-            await state.clear()
-            return
-
-        # Получаем или создаем пользователя
-        user_res = await session.execute(
-            select(User).where(User.telegram_id == callback.from_user.id)
+    # Получаем пользователя
+    user = await get_user(callback.from_user.id)
+    if not user:
+        await callback.message.edit_text("❌ Ошибка: пользователь не найден")
+        await state.clear()
+        return
+
+    session = uow.session
+    # Атомарно занимаем слот активной заявки: UPDATE сработает,
+    # только если у пользователя меньше 3 активных заявок.
+    # Заодно обновляем username — тем же запросом
+    active_count = await session.scalar(
+        update(User)
+        .where(User.id == user.id, User.active_orders < MAX_ACTIVE_ORDERS)
+        .values(active_orders=User.active_orders + 1, username=callback.from_user.username)
+        .returning(User.active_orders)
+        .execution_options(synchronize_session=False)
+    )
+    if active_count is None:
+        # Блокируем создание новой заявки
+        await callback.message.edit_text(
+            "❌ У вас уже 3 активные заявки. Подождите, пока хотя бы одна "
+            "из них будет отмечена как «Исполнено».",
+            parse_mode="HTML"
         )
-        user = user_res.scalar_one_or_none()
-        if not user:
-            await callback.message.edit_text("❌ Ошибка: пользователь не найден")
-            await state.clear()
-            return
-
-        # Обновляем username, если изменился
-        if callback.from_user.username != user.username:
-            user.username = callback.from_user.username
-
-        # Определяем время доставки
-        if current_time <= cutoff_time:
-            delivery_day = "Сегодня"
-            pickup_text = "Мы заберём оборудование сегодня в ближайшее время!"
-        else:
-            delivery_day = "Завтра"
-            pickup_text = "Мы заберём оборудование завтра с 8:00 до 12:00."
-
-        # Создаем новый заказ
-        new_order = Order(
-            user_id=user.id,
-            status="Новая (От пользователя)",
-            preferred_time=delivery_day
+        # Reply-клавиатуру нельзя прикрепить к редактируемому сообщению
+        await callback.message.answer(
+            "🏠 Возвращаю в главное меню.",
+            reply_markup=await main_menu_keyboard(callback.from_user.id)
         )
-        session.add(new_order)
-        await session.commit()
-        await session.refresh(new_order)
+        await state.clear()
+        return
+
+    # Определяем время доставки
+    if current_time <= cutoff_time:
+        delivery_day = "Сегодня"
+        pickup_text = "Мы заберём оборудование сегодня в ближайшее время!"
+    else:
+        delivery_day = "Завтра"
+        pickup_text = "Мы заберём оборудование завтра с 8:00 до 12:00."
+
+    # Создаем новый заказ; id известен после flush, перечитывать строку не нужно
+    new_order = Order(
+        user_id=user.id,
+        status=OrderStatus.NEW_FROM_USER,
+        preferred_time=delivery_day
+    )
+    session.add(new_order)
+    await session.flush()
+
+    uow.after_commit(invalidate_orders_count)
+    uow.after_commit(invalidate_user, callback.from_user.id)
+    # Уведомление администраторам (в фоне, с объединением всплесков заявок)
+    uow.after_commit(
+        admin_notifier.notify_new_order,
+        callback.bot,
+        new_order.id,
+        (
+            f"Новая заявка #{new_order.id}\n"
+            f"От: @{callback.from_user.username}\n"
+            f"Пользователь выбрал: {delivery_day}\n"
+            f"Оформлена в {now.strftime('%Y-%m-%d %H:%M')} по Москве\n"
+            f"Статус: {status_label(OrderStatus.NEW_FROM_USER)}\n\n"
+            f"{pickup_text}"
+        ),
+        ADMIN_ORDERS_LIST,
+    )
+    # Сообщаем об успехе только после фиксации заявки
+    await uow.commit()
 
     # Отправляем подтверждение
     await callback.message.edit_text(
@@ -156,54 +153,24 @@ async def confirm_order_handler(callback: types.CallbackQuery, state: FSMContext
     )
     await callback.message.answer(
         "🏠 Возвращаю в главное меню.",
-        reply_markup=await main_menu_keyboard(callback.from_user.id)
+        reply_markup=main_menu_for(active_count)
     )
-
-    # Уведомление администраторам
-    for admin_id_str in ADMIN_IDS:
-        try:
-            admin_id = int(admin_id_str)
-        except ValueError:
-            continue
-        try:
-            await callback.bot.send_message(
-                admin_id,
-                text=(
-                    f"Новая заявка #{new_order.id}\n"
-                    f"От: @{callback.from_user.username}\n"
-                    f"Пользователь выбрал: {delivery_day}\n"
-                    f"Оформлена в {now.strftime('%Y-%m-%d %H:%M')} по Москве\n"
-                    f"Статус: Новая (От пользователя)\n\n"
-                    f"{pickup_text}"
-                ),
-                reply_markup=admin_orders_button()
-            )
-        except Exception as e:
-            logging.error(f"Ошибка уведомления админа {admin_id}: {e}")
-
     await state.clear()
 
 
-@router.message(lambda message: "Написать напрямую" in message.text)
+@buttons(BTN_DIRECT_MESSAGE)
 async def direct_message_start(message: types.Message, state: FSMContext):
-    builder = InlineKeyboardBuilder()
-    builder.button(text="Отмена", callback_data="cancel_direct_message")
-    builder.adjust(1)
-    
     await message.answer(
         "Введите текст сообщения, и мы перешлём его администратору.\n"
         "После отправки вы получите уведомление, что админ получил сообщение.",
-        reply_markup=builder.as_markup()
+        reply_markup=DIRECT_MESSAGE_CANCEL
     )
     await state.set_state(DirectMessageStates.waiting_for_text)
 
 
 @router.callback_query(F.data == "cancel_direct_message")
 async def cancel_direct_message(callback: types.CallbackQuery, state: FSMContext):
-    builder = InlineKeyboardBuilder()
-    builder.adjust(1)
-    
-    await callback.message.edit_text("Отправка сообщения отменена.", reply_markup=builder.as_markup())
+    await callback.message.edit_text("Отправка сообщения отменена.", reply_markup=EMPTY_INLINE)
     await state.clear()
 
 
@@ -213,34 +180,23 @@ async def direct_message_finish(message: types.Message, state: FSMContext):
     user_id = message.from_user.id
     username = message.from_user.username or "NoUsername"
 
-    async with async_sessionmaker() as session:
-        result = await session.execute(select(User).where(User.telegram_id == user_id))
-        user_obj = result.scalar_one_or_none()
+    user_obj = await get_user(user_id)
 
     name = user_obj.name if user_obj else "Неизвестный"
     phone = user_obj.phone if user_obj and user_obj.phone else "Не указан"
 
-    for admin_id_str in ADMIN_IDS:
-        try:
-            admin_id = int(admin_id_str)
-        except ValueError:
-            continue
-
-        try:
-            await message.bot.send_message(
-                admin_id,
-                text=(
-                    "📩 <b>Новое сообщение от пользователя</b>\n\n"
-                    f"👤 <b>Имя:</b> {name}\n"
-                    f"🆔 <b>ID:</b> {user_id}\n"
-                    f"🔗 <b>Тег:</b> @{username}\n"
-                    f"📞 <b>Телефон:</b> {phone}\n\n"
-                    f"✉️ <b>Текст сообщения:</b>\n{user_text}"
-                ),
-                parse_mode="HTML"
-            )
-        except Exception as e:
-            print(f"[direct_message_finish] Ошибка уведомления админа {admin_id}: {e}")
+    admin_notifier.broadcast(
+        message.bot,
+        text=(
+            "📩 <b>Новое сообщение от пользователя</b>\n\n"
+            f"👤 <b>Имя:</b> {name}\n"
+            f"🆔 <b>ID:</b> {user_id}\n"
+            f"🔗 <b>Тег:</b> @{username}\n"
+            f"📞 <b>Телефон:</b> {phone}\n\n"
+            f"✉️ <b>Текст сообщения:</b>\n{user_text}"
+        ),
+        parse_mode="HTML"
+    )
 
     await message.answer(
         "✅ <b>Ваше сообщение отправлено администратору.</b>\n"
@@ -251,156 +207,149 @@ async def direct_message_finish(message: types.Message, state: FSMContext):
     await state.clear()
 
 
-@router.message(lambda message: "Изменить данные" in message.text)
+async def update_user_data(uow: UnitOfWork, telegram_id: int, **values) -> int:
+    """
+    Обновляет анкету пользователя. Возвращает число активных заявок —
+    для главного меню, без отдельного чтения.
+    """
+    active_count = await uow.session.scalar(
+        update(User)
+        .where(User.telegram_id == telegram_id)
+        .values(**values)
+        .returning(User.active_orders)
+        .execution_options(synchronize_session=False)
+    )
+    uow.after_commit(invalidate_user, telegram_id, True)
+    return active_count or 0
+
+
+@buttons(BTN_EDIT_DATA)
 async def edit_data_menu(message: types.Message, state: FSMContext):
-    kb = ReplyKeyboardBuilder()
-    kb.button(text="📞 Изменить телефон")
-    kb.button(text="🏠 Изменить адрес")
-    kb.button(text="👤 Изменить имя")
-    kb.button(text="🏢 Изменить организацию")
-    kb.button(text="↩️ Назад")
-    kb.adjust(1)
     await message.answer(
         "🔄 Выберите, что хотите изменить:",
-        reply_markup=kb.as_markup(resize_keyboard=True),
+        reply_markup=EDIT_DATA_MENU,
         parse_mode="HTML"
     )
     await state.set_state(EditDataStates.choose_field)
 
 
-@router.message(EditDataStates.choose_field, F.text == "📞 Изменить телефон")
+@buttons(BTN_EDIT_PHONE, state=EditDataStates.choose_field)
 async def edit_phone_start(message: types.Message, state: FSMContext):
     await message.answer("Введите новый номер телефона:")
     await state.set_state(EditDataStates.waiting_for_new_phone)
 
 
 @router.message(EditDataStates.waiting_for_new_phone)
-async def edit_phone_finish(message: types.Message, state: FSMContext):
+async def edit_phone_finish(message: types.Message, state: FSMContext, uow: UnitOfWork):
     new_phone = message.text
-    async with async_sessionmaker() as session:
-        user_in_db = await session.execute(
-            select(User).where(User.telegram_id == message.from_user.id)
-        )
-        user = user_in_db.scalar_one_or_none()
-        if user:
-            user.phone = new_phone
-            await session.commit()
+    active_count = await update_user_data(uow, message.from_user.id, phone=new_phone)
 
-    await message.answer(f"📞 Телефон изменён на: {new_phone}", reply_markup=await main_menu_keyboard(message.from_user.id))
+    await message.answer(f"📞 Телефон изменён на: {new_phone}", reply_markup=main_menu_for(active_count))
     await state.clear()
 
 
-@router.message(EditDataStates.choose_field, F.text == "🏠 Изменить адрес")
+@buttons(BTN_EDIT_ADDRESS, state=EditDataStates.choose_field)
 async def edit_address_start(message: types.Message, state: FSMContext):
     await message.answer("Введите новый адрес:")
     await state.set_state(EditDataStates.waiting_for_new_address)
 
 
 @router.message(EditDataStates.waiting_for_new_address)
-async def edit_address_finish(message: types.Message, state: FSMContext):
+async def edit_address_finish(message: types.Message, state: FSMContext, uow: UnitOfWork):
     new_address = message.text
-    async with async_sessionmaker() as session:
-        user_in_db = await session.execute(
-            select(User).where(User.telegram_id == message.from_user.id)
-        )
-        user = user_in_db.scalar_one_or_none()
-        if user:
-            user.address = new_address
-            await session.commit()
+    active_count = await update_user_data(uow, message.from_user.id, address=new_address)
 
-    await message.answer(f"🏠 Адрес изменён на: {new_address}", reply_markup=await main_menu_keyboard(message.from_user.id))
+    await message.answer(f"🏠 Адрес изменён на: {new_address}", reply_markup=main_menu_for(active_count))
     await state.clear()
 
 
-@router.message(EditDataStates.choose_field, F.text == "👤 Изменить имя")
+@buttons(BTN_EDIT_NAME, state=EditDataStates.choose_field)
 async def edit_name_start(message: types.Message, state: FSMContext):
     await message.answer("Введите новое имя:")
     await state.set_state(EditDataStates.waiting_for_new_name)
 
 
 @router.message(EditDataStates.waiting_for_new_name)
-async def edit_name_finish(message: types.Message, state: FSMContext):
+async def edit_name_finish(message: types.Message, state: FSMContext, uow: UnitOfWork):
     new_name = message.text
-    async with async_sessionmaker() as session:
-        user_in_db = await session.execute(
-            select(User).where(User.telegram_id == message.from_user.id)
-        )
-        user = user_in_db.scalar_one_or_none()
-        if user:
-            user.name = new_name
-            await session.commit()
+    active_count = await update_user_data(uow, message.from_user.id, name=new_name)
 
-    await message.answer(f"👤 Имя изменено на: {new_name}", reply_markup=await main_menu_keyboard(message.from_user.id))
+    await message.answer(f"👤 Имя изменено на: {new_name}", reply_markup=main_menu_for(active_count))
     await state.clear()
 
 
-@router.message(EditDataStates.choose_field, F.text == "🏢 Изменить организацию")
+@buttons(BTN_EDIT_ORGANIZATION, state=EditDataStates.choose_field)
 async def edit_organization_start(message: types.Message, state: FSMContext):
     await message.answer("Введите новую организацию:")
     await state.set_state(EditDataStates.waiting_for_new_organization)
 
 
 @router.message(EditDataStates.waiting_for_new_organization)
-async def edit_organization_finish(message: types.Message, state: FSMContext):
+async def edit_organization_finish(message: types.Message, state: FSMContext, uow: UnitOfWork):
     new_organization = message.text
-    async with async_sessionmaker() as session:
-        user_in_db = await session.execute(
-            select(User).where(User.telegram_id == message.from_user.id)
-        )
-        user = user_in_db.scalar_one_or_none()
-        if user:
-            user.organization = new_organization
-            await session.commit()
+    active_count = await update_user_data(uow, message.from_user.id, organization=new_organization)
 
-    await message.answer(f"🏢 Организация изменена на: {new_organization}", reply_markup=await main_menu_keyboard(message.from_user.id))
+    await message.answer(f"🏢 Организация изменена на: {new_organization}", reply_markup=main_menu_for(active_count))
     await state.clear()
 
 
-@router.message(EditDataStates.choose_field, F.text == "↩️ Назад")
+@buttons(BTN_EDIT_BACK, state=EditDataStates.choose_field)
 async def edit_data_back(message: types.Message, state: FSMContext):
     await message.answer("🏠 Возвращаюсь в главное меню.", reply_markup=await main_menu_keyboard(message.from_user.id))
     await state.clear()
 
 
-@router.message(lambda message: "Отменить заказ" in message.text)
-async def cancel_order_by_user(message: types.Message):
-    user_id = message.from_user.id
+def release_cancelled_order(uow: UnitOfWork, cancelled: Row, telegram_id: int) -> int:
+    """
+    Планирует сброс кешей после отмены заявки (счётчик уже уменьшил триггер).
+    Возвращает число оставшихся активных заявок.
+    """
+    uow.after_commit(invalidate_orders_count)
+    uow.after_commit(invalidate_order, cancelled.id)
+    uow.after_commit(invalidate_user, telegram_id)
+    return cancelled.remaining
 
-    async with async_sessionmaker() as session:
-        result = await session.execute(
-            select(Order)
-            .join(User)
-            .where(
-                User.telegram_id == user_id,
-                Order.status != "Исполнено"
-            )
-        )
-        orders = result.scalars().all()
 
-    if not orders:
+@buttons(BTN_CANCEL_ORDER)
+async def cancel_order_by_user(message: types.Message, uow: UnitOfWork):
+    user_id = message.from_user.id
+    session = uow.session
+
+    # Обычно активная заявка одна — удаляем её сразу, без предварительного SELECT;
+    # при нескольких DELETE ничего не находит
+    cancelled = (await session.execute(cancel_active_order(user_id))).one_or_none()
+    if cancelled:
+        active_count = release_cancelled_order(uow, cancelled, user_id)
         await message.answer(
-            "❌ У вас нет активных заказов для отмены.",
-            reply_markup=await main_menu_keyboard(user_id)
+            f"✅ Ваша заявка #{cancelled.id} отменена!",
+            reply_markup=main_menu_for(active_count)
         )
         return
 
-    if len(orders) == 1:
-        order = orders[0]
-        async with async_sessionmaker() as session:
-            async with session.begin():
-                await session.delete(order)
+    result = await session.execute(
+        select(Order.id)
+        .join(User)
+        .where(
+            User.telegram_id == user_id,
+            Order.status < OrderStatus.DONE
+        )
+        .order_by(Order.id)
+    )
+    order_ids = result.scalars().all()
+
+    if not order_ids:
         await message.answer(
-            f"✅ Ваша заявка #{order.id} отменена!",
-            reply_markup=await main_menu_keyboard(user_id)
+            "❌ У вас нет активных заказов для отмены.",
+            reply_markup=main_menu_for(0)
         )
         return
 
     # Несколько — предлагаем выбрать
     kb = InlineKeyboardBuilder()
-    for o in orders:
+    for order_id in order_ids:
         kb.button(
-            text=f"Отменить заявку #{o.id}",
-            callback_data=f"cancel_specific_{o.id}"
+            text=f"Отменить заявку #{order_id}",
+            callback_data=f"cancel_specific_{order_id}"
         )
     kb.adjust(1)
 
@@ -411,22 +360,25 @@ async def cancel_order_by_user(message: types.Message):
 
 
 @router.callback_query(F.data.startswith("cancel_specific_"))
-async def cancel_specific_handler(callback: types.CallbackQuery):
-    order_id = int(callback.data.split("_", 2)[2])
+async def cancel_specific_handler(callback: types.CallbackQuery, uow: UnitOfWork):
     user_id = callback.from_user.id
+    try:
+        order_id = int(callback.data.split("_", 2)[2])
+    except ValueError:
+        await callback.answer("❌ Неверный ID заявки.")
+        return
 
-    # Удаляем выбранную заявку
-    async with async_sessionmaker() as session:
-        async with session.begin():
-            order = await session.get(Order, order_id)
-            if order:
-                await session.delete(order)
+    # Удаляем выбранную заявку, только если она принадлежит пользователю и ещё активна
+    cancelled = (await uow.session.execute(cancel_active_order(user_id, order_id))).one_or_none()
+    if not cancelled:
+        await callback.answer("❌ Заявка не найдена или уже не может быть отменена.")
+        return
+    active_count = release_cancelled_order(uow, cancelled, user_id)
 
     # Ответом в чат даём новый ReplyKeyboardMarkup
     await callback.message.answer(
         f"✅ Заявка #{order_id} успешно отменена!",
-        reply_markup=await main_menu_keyboard(user_id)
+        reply_markup=main_menu_for(active_count)
     )
     # Не забываем подтвердить сам callback
     await callback.answer()
-
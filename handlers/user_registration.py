@@ -4,42 +4,33 @@ from aiogram import Router
 from aiogram import types, F
 from aiogram.filters import CommandStart
 from aiogram.fsm.context import FSMContext
-from aiogram.types import InlineKeyboardButton, InlineKeyboardMarkup
 
-from sqlalchemy import select
+from sqlalchemy import update
+from sqlalchemy.exc import IntegrityError
 
-from db import async_sessionmaker, User
+from db import User
+from cache import get_user, invalidate_user
 from states import RegistrationStates
-from aiogram.utils.keyboard import ReplyKeyboardBuilder
+from middlewares.db_session import UnitOfWork
+from render import START_WORK, main_menu_markup
 
 router = Router()
 
 
 def main_menu_keyboard() -> types.ReplyKeyboardMarkup:
-    kb = ReplyKeyboardBuilder()
-    kb.button(text="🛒 Оформить заказ")
-    kb.button(text="✉️ Написать напрямую")
-    kb.button(text="✏️ Изменить данные")
-    kb.adjust(1)
-    return kb.as_markup(resize_keyboard=True)
+    # Сразу после регистрации активных заявок нет
+    return main_menu_markup(can_order=True, has_active=False)
 
 
 @router.message(CommandStart())
 async def cmd_start(message: types.Message, state: FSMContext):
     await state.clear()
-    async with async_sessionmaker() as session:
-        result = await session.execute(
-            select(User).where(User.telegram_id == message.from_user.id)
-        )
-        user = result.scalar_one_or_none()
+    user = await get_user(message.from_user.id)
     if user is None:
-        keyboard = InlineKeyboardMarkup(inline_keyboard=[
-            [InlineKeyboardButton(text="🚀 Старт", callback_data="start_work")]
-        ])
         await message.answer(
             "✨ Добро пожаловать в нашего умного бота! ✨\n\nНажмите кнопку <b>Старт</b>, чтобы начать регистрацию.",
             parse_mode="HTML",
-            reply_markup=keyboard
+            reply_markup=START_WORK
         )
     else:
         await message.answer(
@@ -49,7 +40,7 @@ async def cmd_start(message: types.Message, state: FSMContext):
         )
 
 
-@router.callback_query(lambda callback: callback.data == "start_work")
+@router.callback_query(F.data == "start_work")
 async def start_work_handler(callback: types.CallbackQuery, state: FSMContext):
     await callback.answer()
     await callback.message.edit_text(
@@ -105,7 +96,7 @@ async def reg_get_address(message: types.Message, state: FSMContext):
 
 
 @router.message(RegistrationStates.waiting_for_organization)
-async def reg_get_organization(message: types.Message, state: FSMContext):
+async def reg_get_organization(message: types.Message, state: FSMContext, uow: UnitOfWork):
     data = await state.get_data()
     name = data["name"]
     phone = data["phone"]
@@ -114,16 +105,24 @@ async def reg_get_organization(message: types.Message, state: FSMContext):
 
     tg_id = message.from_user.id
 
-    async with async_sessionmaker() as session:
-        new_user = User(
-            telegram_id=tg_id,
-            name=name,
-            phone=phone,
-            address=address,
-            organization="Нет" if organization.lower() == "нет" else organization
+    user_data = dict(
+        name=name,
+        phone=phone,
+        address=address,
+        organization="Нет" if organization.lower() == "нет" else organization
+    )
+    session = uow.session
+    session.add(User(telegram_id=tg_id, **user_data))
+    try:
+        await session.flush()
+    except IntegrityError:
+        # telegram_id уникален: повторная регистрация обновляет данные.
+        # Других изменений в этом обновлении нет, откатывать можно всю транзакцию
+        await session.rollback()
+        await session.execute(
+            update(User).where(User.telegram_id == tg_id).values(**user_data)
         )
-        session.add(new_user)
-        await session.commit()
+    uow.after_commit(invalidate_user, tg_id)
 
     await message.answer(
         f"✨ <b>Отлично, {name}!</b> Ваши данные успешно сохранены! ✨\n\n"
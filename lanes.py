@@ -0,0 +1,93 @@
+# lanes.py
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+from time import perf_counter
+from typing import AsyncGenerator
+
+from aiogram.fsm.storage.base import BaseEventIsolation, StorageKey
+from aiogram.types import ErrorEvent
+
+from config import LANE_MAX_QUEUE
+from metrics import (
+    UPDATE_LANES, UPDATE_LANE_DEPTH, UPDATE_LANE_QUEUED, UPDATE_LANE_REJECTED, UPDATE_LANE_WAIT
+)
+
+
+class LaneOverflow(Exception):
+    """
+    В очереди пользователя уже max_queue обновлений.
+    """
+
+    def __init__(self, key: StorageKey):
+        super().__init__(f"Очередь обновлений пользователя {key.user_id} переполнена")
+        self.key = key
+
+
+class _Lane:
+    __slots__ = ("lock", "depth")
+
+    def __init__(self):
+        self.lock = asyncio.Lock()
+        # Обновления в полосе: обрабатываемое и ожидающие
+        self.depth = 0
+
+
+class UserLanes(BaseEventIsolation):
+    """
+    Изоляция событий для Dispatcher(events_isolation=...): у каждого пользователя
+    своя полоса, его обновления обрабатываются строго по очереди, а разных
+    пользователей — параллельно.
+    Состояние FSM читается уже после того, как подошла очередь, поэтому
+    повторное нажатие кнопки видит результат первого.
+    В полосе не больше max_queue обновлений, лишние отклоняются LaneOverflow.
+    Полоса удаляется, как только опустеет. Порядок соблюдается в пределах процесса.
+    """
+
+    def __init__(self, max_queue: int = LANE_MAX_QUEUE):
+        self.max_queue = max_queue
+        self._lanes: dict[StorageKey, _Lane] = {}
+
+    @asynccontextmanager
+    async def lock(self, key: StorageKey) -> AsyncGenerator[None, None]:
+        lane = self._lanes.get(key)
+        if lane is None:
+            lane = self._lanes[key] = _Lane()
+            UPDATE_LANES.set(len(self._lanes))
+        elif lane.depth >= self.max_queue:
+            UPDATE_LANE_REJECTED.inc()
+            raise LaneOverflow(key)
+
+        UPDATE_LANE_DEPTH.observe(lane.depth)
+        lane.depth += 1
+        started = perf_counter()
+        try:
+            UPDATE_LANE_QUEUED.inc()
+            try:
+                # asyncio.Lock отдаёт блокировку ожидающим в порядке прихода
+                await lane.lock.acquire()
+            finally:
+                UPDATE_LANE_QUEUED.inc(amount=-1)
+            UPDATE_LANE_WAIT.observe(perf_counter() - started)
+            try:
+                yield
+            finally:
+                lane.lock.release()
+        finally:
+            lane.depth -= 1
+            if lane.depth == 0 and self._lanes.get(key) is lane:
+                del self._lanes[key]
+                UPDATE_LANES.set(len(self._lanes))
+
+    async def close(self) -> None:
+        self._lanes.clear()
+        UPDATE_LANES.set(0)
+
+
+async def on_lane_overflow(event: ErrorEvent) -> bool:
+    """
+    Обработчик ошибок диспетчера: переполнение очереди — не ошибка бота,
+    обновление просто отбрасывается.
+    """
+    logging.warning(f"{event.exception}, обновление {event.update.update_id} отброшено")
+    return True
@@ -1,28 +1,69 @@
 import logging
 
 from aiogram import Bot, Dispatcher
-from aiogram.fsm.storage.memory import MemoryStorage
+from aiogram.filters import ExceptionTypeFilter
+from aiogram.fsm.storage.base import BaseStorage
 from aiogram.client.bot import DefaultBotProperties
 
-from config import BOT_TOKEN, DEBUG
+from config import (
+    BOT_TOKEN, DEBUG, METRICS_HOST, METRICS_PORT, ANTISPAM_WINDOW, ANTISPAM_MAX_MESSAGES,
+    ANTISPAM_CALLBACK_WINDOW, ANTISPAM_CALLBACK_MAX, LANE_MAX_QUEUE, OUTBOUND_RATE, RECORD_UPDATES_PATH
+)
+from db import engine, read_engine
+from lanes import LaneOverflow, UserLanes, on_lane_overflow
+from metrics import BotApiMetricsMiddleware, MetricsServer, instrument_engine
+from outbound import OutboundLimiter
+from recorder import UpdateRecorder
+from storage import create_storage
 
 from handlers import user_registration, order, admin
 from handlers.fallback import fallback_router
 
-from middlewares.inactivity import InactivityMiddleware
+from middlewares.inactivity import InactivityMiddleware, create_activity_store
 from middlewares.anti_spam import AntiSpamMiddleware
+from middlewares.db_session import DbSessionMiddleware
+from middlewares.metrics import HandlerMetricsMiddleware
 
 
-def create_dispatcher() -> tuple[Dispatcher, Bot]:
+def create_dispatcher(storage: BaseStorage | None = None) -> tuple[Dispatcher, Bot]:
     """
     Создаёт диспетчер и бот для работы с Aiogram.
+    Хранилище FSM выбирается настройкой FSM_STORAGE, если не передано явно.
     Возвращает кортеж (dp, bot).
     """
     bot = Bot(token=BOT_TOKEN, default=DefaultBotProperties(parse_mode='HTML'))
-    dp = Dispatcher(storage=MemoryStorage())
+    if OUTBOUND_RATE:
+        # Все исходящие сообщения проходят через общий и початовый лимиты Telegram
+        bot.session.middleware(OutboundLimiter())
+    if storage is None:
+        storage = create_storage()
+    # Обновления одного пользователя — строго по очереди, разных — параллельно
+    dp = Dispatcher(storage=storage, events_isolation=UserLanes(LANE_MAX_QUEUE))
+    dp.errors.register(on_lane_overflow, ExceptionTypeFilter(LaneOverflow))
 
-    dp.update.middleware(InactivityMiddleware())
-    dp.update.middleware(AntiSpamMiddleware(time_window=5, max_messages=3))
+    if RECORD_UPDATES_PATH:
+        # Запись трафика для benchmarks.replay — на входе, до очереди пользователя
+        UpdateRecorder(RECORD_UPDATES_PATH).install(dp)
+
+    # Активность — рядом с состоянием FSM, чтобы её видели все процессы бота
+    inactivity = InactivityMiddleware(create_activity_store(storage))
+    dp.update.middleware(inactivity)
+    dp.startup.register(inactivity.on_startup)
+    dp.shutdown.register(inactivity.on_shutdown)
+
+    # У сообщений и нажатий кнопок отдельные лимиты и ключи
+    dp.message.outer_middleware(AntiSpamMiddleware(ANTISPAM_WINDOW, ANTISPAM_MAX_MESSAGES, prefix="antispam:msg"))
+    dp.callback_query.outer_middleware(
+        AntiSpamMiddleware(ANTISPAM_CALLBACK_WINDOW, ANTISPAM_CALLBACK_MAX, prefix="antispam:cb")
+    )
+
+    # Одна сессия БД на обновление — только для событий, дошедших до обработчика
+    db_session = DbSessionMiddleware()
+    dp.message.middleware(db_session)
+    dp.callback_query.middleware(db_session)
+
+    if METRICS_PORT:
+        setup_metrics(dp, bot)
 
     dp.include_router(user_registration.router)
     dp.include_router(order.router)
@@ -32,6 +73,23 @@ def create_dispatcher() -> tuple[Dispatcher, Bot]:
     return dp, bot
 
 
+def setup_metrics(dp: Dispatcher, bot: Bot) -> None:
+    """
+    Подключает сбор метрик (обработчики, SQL, Bot API) и сервер /metrics.
+    """
+    handler_metrics = HandlerMetricsMiddleware()
+    dp.message.middleware(handler_metrics)
+    dp.callback_query.middleware(handler_metrics)
+    bot.session.middleware(BotApiMetricsMiddleware())
+    instrument_engine(engine)
+    if read_engine is not engine:
+        instrument_engine(read_engine, "read")
+
+    server = MetricsServer(METRICS_HOST, METRICS_PORT)
+    dp.startup.register(server.on_startup)
+    dp.shutdown.register(server.on_shutdown)
+
+
 def setup_logger() -> None:
     """
     Настраивает логирование для приложения.
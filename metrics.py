@@ -0,0 +1,265 @@
+# metrics.py
+import logging
+from bisect import bisect_left
+from functools import lru_cache
+from time import perf_counter
+
+from aiohttp import web
+from aiogram import Bot
+from aiogram.client.session.middlewares.base import BaseRequestMiddleware
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+# Границы корзин гистограмм, секунды
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: tuple[str, ...], values: tuple, extra: str = "") -> str:
+    parts = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+class Counter:
+    """
+    Счётчик с метками. Значения меток передаются кортежем в порядке labelnames.
+    """
+
+    type = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self._values: dict[tuple, float] = {}
+        REGISTRY.append(self)
+
+    def inc(self, labels: tuple = (), amount: float = 1) -> None:
+        self._values[labels] = self._values.get(labels, 0) + amount
+
+    def value(self, labels: tuple = ()) -> float:
+        return self._values.get(labels, 0)
+
+    def collect(self) -> list[str]:
+        return [
+            f"{self.name}{_format_labels(self.labelnames, labels)} {value}"
+            for labels, value in self._values.items()
+        ]
+
+
+class Gauge(Counter):
+    """
+    Текущее значение с метками (глубина очереди, число объектов и т.п.).
+    """
+
+    type = "gauge"
+
+    def set(self, value: float, labels: tuple = ()) -> None:
+        self._values[labels] = value
+
+
+class Histogram:
+    """
+    Гистограмма с фиксированными корзинами. observe — поиск корзины делением
+    пополам и пара операций над списком, без выделения памяти.
+    """
+
+    type = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self.buckets = buckets
+        # labels -> [счётчики по корзинам (последняя — +Inf)..., сумма, количество]
+        self._series: dict[tuple, list] = {}
+        REGISTRY.append(self)
+
+    def observe(self, value: float, labels: tuple = ()) -> None:
+        series = self._series.get(labels)
+        if series is None:
+            series = self._series[labels] = [0] * (len(self.buckets) + 3)
+        series[bisect_left(self.buckets, value)] += 1
+        series[-2] += value
+        series[-1] += 1
+
+    def count(self, labels: tuple = ()) -> int:
+        series = self._series.get(labels)
+        return series[-1] if series else 0
+
+    def sum(self, labels: tuple = ()) -> float:
+        series = self._series.get(labels)
+        return series[-2] if series else 0.0
+
+    def collect(self) -> list[str]:
+        lines = []
+        for labels, series in self._series.items():
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), series):
+                cumulative += count
+                le = 'le="+Inf"' if bound == float("inf") else f'le="{bound}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, labels, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, labels)} {series[-2]}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, labels)} {series[-1]}")
+        return lines
+
+
+REGISTRY: list[Counter | Histogram] = []
+
+HANDLER_LATENCY = Histogram(
+    "bot_handler_duration_seconds", "Время работы обработчика", ("router", "handler")
+)
+HANDLER_ERRORS = Counter(
+    "bot_handler_errors_total", "Исключения в обработчиках", ("router", "handler", "error")
+)
+DB_QUERY_LATENCY = Histogram(
+    "bot_db_query_duration_seconds", "Время выполнения SQL-запросов", ("engine", "operation")
+)
+DB_QUERY_ERRORS = Counter(
+    "bot_db_query_errors_total", "Ошибки SQL-запросов", ("engine",)
+)
+BOT_API_LATENCY = Histogram(
+    "bot_api_request_duration_seconds", "Время запросов к Telegram Bot API", ("method",)
+)
+BOT_API_ERRORS = Counter(
+    "bot_api_request_errors_total", "Ошибки запросов к Telegram Bot API", ("method", "error")
+)
+UPDATE_LANES = Gauge(
+    "bot_update_lanes", "Пользователи, у которых есть обновления в обработке или в очереди"
+)
+UPDATE_LANE_QUEUED = Gauge(
+    "bot_update_lane_queued", "Обновления, ожидающие своей очереди"
+)
+UPDATE_LANE_DEPTH = Histogram(
+    "bot_update_lane_depth", "Обновлений пользователя впереди в момент прихода нового",
+    buckets=(0, 1, 2, 3, 5, 10, 20)
+)
+UPDATE_LANE_WAIT = Histogram(
+    "bot_update_lane_wait_seconds", "Ожидание своей очереди обновлением"
+)
+UPDATE_LANE_REJECTED = Counter(
+    "bot_update_lane_rejected_total", "Обновления, отклонённые из-за переполненной очереди пользователя"
+)
+OUTBOUND_QUEUED = Gauge(
+    "bot_outbound_queued", "Исходящие сообщения, ожидающие общего лимита Bot API", ("priority",)
+)
+OUTBOUND_WAIT = Histogram(
+    "bot_outbound_wait_seconds", "Ожидание лимитов перед отправкой сообщения", ("priority",)
+)
+OUTBOUND_RETRIES = Counter(
+    "bot_outbound_retries_total", "Повторы запросов после 429 RetryAfter", ("method",)
+)
+CACHE_REQUESTS = Counter(
+    "bot_cache_requests_total", "Обращения к кешу пользователей и заявок", ("cache", "result")
+)
+CACHE_EVICTIONS = Counter(
+    "bot_cache_evictions_total", "Записи, вытесненные из кеша по размеру", ("cache",)
+)
+CACHE_SIZE = Gauge(
+    "bot_cache_entries", "Записи в кеше", ("cache",)
+)
+
+
+def render() -> str:
+    """
+    Все метрики в текстовом формате Prometheus.
+    """
+    lines = []
+    for metric in REGISTRY:
+        lines.append(f"# HELP {metric.name} {metric.documentation}")
+        lines.append(f"# TYPE {metric.name} {metric.type}")
+        lines.extend(metric.collect())
+    return "\n".join(lines) + "\n"
+
+
+_instrumented_engines: set[int] = set()
+
+
+@lru_cache(maxsize=512)
+def _sql_operation(statement: str) -> str:
+    # Текст запроса обычно берётся из кеша компиляции SQLAlchemy, но raw SQL
+    # может быть любым — кеш ограничен, чтобы не расти без предела
+    return statement.lstrip().split(None, 1)[0].upper()
+
+
+def instrument_engine(engine: AsyncEngine, name: str = "main") -> None:
+    """
+    Подключает к движку подсчёт запросов и их длительности. Повторный вызов ничего не делает.
+    """
+    if id(engine) in _instrumented_engines:
+        return
+    _instrumented_engines.add(id(engine))
+    sync_engine = engine.sync_engine
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        context._metrics_started = perf_counter()
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        DB_QUERY_LATENCY.observe(
+            perf_counter() - context._metrics_started, (name, _sql_operation(statement))
+        )
+
+    @event.listens_for(sync_engine, "handle_error")
+    def _error(exception_context):
+        DB_QUERY_ERRORS.inc((name,))
+
+
+class BotApiMetricsMiddleware(BaseRequestMiddleware):
+    """
+    Время и ошибки исходящих запросов к Bot API по имени метода.
+    """
+
+    async def __call__(self, make_request, bot: Bot, method):
+        api_method = method.__api_method__
+        started = perf_counter()
+        try:
+            return await make_request(bot, method)
+        except Exception as e:
+            BOT_API_ERRORS.inc((api_method, type(e).__name__))
+            raise
+        finally:
+            BOT_API_LATENCY.observe(perf_counter() - started, (api_method,))
+
+
+async def handle_metrics(request: web.Request) -> web.Response:
+    response = web.Response(text=render(), content_type="text/plain", charset="utf-8")
+    response.headers["Content-Type"] = "text/plain; version=0.0.4; charset=utf-8"
+    return response
+
+
+class MetricsServer:
+    """
+    Небольшой отдельный HTTP-сервер с единственным маршрутом /metrics.
+    Запускается и останавливается вместе с диспетчером (startup/shutdown).
+    """
+
+    def __init__(self, host: str, port: int):
+        self.host = host
+        self.port = port
+        self._runner: web.AppRunner | None = None
+
+    async def on_startup(self) -> None:
+        app = web.Application()
+        app.router.add_get("/metrics", handle_metrics)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        await web.TCPSite(self._runner, self.host, self.port).start()
+        logging.info(f"Metrics server listening on http://{self.host}:{self.port}/metrics")
+
+    async def on_shutdown(self) -> None:
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
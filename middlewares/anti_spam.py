@@ -1,42 +1,45 @@
 # anti_spam.py
 import time
 from aiogram.dispatcher.middlewares.base import BaseMiddleware
-from aiogram.types import Message, TelegramObject
+from aiogram.types import CallbackQuery, Message, TelegramObject
+
+from ratelimit import RateLimiter, TokenBucketLimiter, create_limiter
+
+SPAM_WARNING = "❗️ Пожалуйста, не спамьте!"
+
 
 class AntiSpamMiddleware(BaseMiddleware):
-    def __init__(self, time_window: float = 5, max_messages: int = 3):
+    """
+    Ограничивает частоту сообщений и нажатий inline-кнопок от одного пользователя.
+    Регистрируется как outer-middleware на message и callback_query;
+    у каждого экземпляра свой prefix ключей, иначе в Redis лимиты окажутся общими.
+    """
+
+    def __init__(
+        self,
+        time_window: float = 5,
+        max_messages: int = 3,
+        limiter: RateLimiter | None = None,
+        prefix: str = "antispam",
+    ):
         self.time_window = time_window
         self.max_messages = max_messages
-        self.users = {}
+        self.limiter = limiter or create_limiter(max_messages, time_window, prefix=prefix)
+        # Предупреждаем не чаще одного раза за окно
+        self.warnings = TokenBucketLimiter(rate=1 / time_window, capacity=1)
 
     async def __call__(self, handler, event: TelegramObject, data: dict):
-        if isinstance(event, Message) and event.from_user:
-            user_id = event.from_user.id
-            now = time.time()
-            
-            # Обнуляем счетчик если временное окно истекло
-            if user_id in self.users and now - self.users[user_id]["last_time"] > self.time_window:
-                del self.users[user_id]
-
-            if user_id not in self.users:
-                self.users[user_id] = {
-                    "count": 1,
-                    "last_time": now,
-                    "last_warning": 0
-                }
-            else:
-                self.users[user_id]["count"] += 1
+        user = data.get("event_from_user")
+        if user is None or await self.limiter.hit(user.id):
+            return await handler(event, data)
 
-            # Блокируем если превышен лимит
-            if self.users[user_id]["count"] > self.max_messages:
-                if now - self.users[user_id]["last_warning"] > self.time_window:
-                    try:
-                        await event.answer("❗️ Пожалуйста, не спамьте!")
-                        self.users[user_id]["last_warning"] = now
-                    except Exception:
-                        pass
-                return
-            
-            self.users[user_id]["last_time"] = now
-            
-        return await handler(event, data)
\ No newline at end of file
+        # Блокируем: лимит превышен
+        warn = self.warnings.hit_nowait(user.id, time.monotonic())
+        try:
+            if isinstance(event, CallbackQuery):
+                # На callback нужно ответить в любом случае, иначе кнопка «зависнет»
+                await event.answer(SPAM_WARNING if warn else None)
+            elif isinstance(event, Message) and warn:
+                await event.answer(SPAM_WARNING)
+        except Exception:
+            pass
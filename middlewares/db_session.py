@@ -0,0 +1,84 @@
+# db_session.py
+import logging
+from typing import Any, Callable
+
+from aiogram.dispatcher.middlewares.base import BaseMiddleware
+from aiogram.types import TelegramObject
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import sessionmaker
+
+from db import async_sessionmaker
+
+
+class UnitOfWork:
+    """
+    Одна сессия БД на всё обновление.
+    Сессия создаётся при первом обращении к session, соединение из пула берётся
+    при первом запросе; фиксация — один раз, в конце обработки обновления.
+    Действия, которые должны видеть уже зафиксированные данные (сброс кешей,
+    уведомления), регистрируются через after_commit и выполняются после commit.
+    """
+
+    def __init__(self, session_factory: sessionmaker = async_sessionmaker):
+        self._session_factory = session_factory
+        self._session: AsyncSession | None = None
+        self._after_commit: list[tuple[Callable[..., Any], tuple]] = []
+
+    @property
+    def session(self) -> AsyncSession:
+        if self._session is None:
+            self._session = self._session_factory()
+        return self._session
+
+    def after_commit(self, callback: Callable[..., Any], *args) -> None:
+        self._after_commit.append((callback, args))
+
+    async def commit(self) -> None:
+        """
+        Фиксирует изменения и выполняет отложенные действия.
+        Обработчик может вызвать его раньше сам, если дальше читает данные
+        через другие сессии (кеш, читающий движок); повторный вызов без новых
+        изменений в БД не ходит.
+        """
+        if self._session is not None and self._session.in_transaction():
+            await self._session.commit()
+        callbacks, self._after_commit = self._after_commit, []
+        for callback, args in callbacks:
+            try:
+                callback(*args)
+            except Exception:
+                logging.exception("Ошибка в действии после commit")
+
+    async def rollback(self) -> None:
+        self._after_commit.clear()
+        if self._session is not None:
+            await self._session.rollback()
+
+    async def close(self) -> None:
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+
+class DbSessionMiddleware(BaseMiddleware):
+    """
+    Передаёт обработчикам UnitOfWork в аргументе uow: commit после успешной
+    обработки обновления, rollback при исключении.
+    """
+
+    def __init__(self, session_factory: sessionmaker = async_sessionmaker):
+        self.session_factory = session_factory
+
+    async def __call__(self, handler, event: TelegramObject, data: dict):
+        uow = UnitOfWork(self.session_factory)
+        data["uow"] = uow
+        try:
+            result = await handler(event, data)
+        except Exception:
+            await uow.rollback()
+            raise
+        else:
+            await uow.commit()
+            return result
+        finally:
+            await uow.close()
@@ -1,27 +1,218 @@
 # inactivity.py
+import asyncio
+import json
+import logging
+import time
+from collections import OrderedDict
+from typing import Protocol
+
+from aiogram import Bot
 from aiogram.dispatcher.middlewares.base import BaseMiddleware
-from aiogram.types import Message, TelegramObject
 from aiogram.fsm.context import FSMContext
-from datetime import datetime, timedelta
+from aiogram.fsm.storage.base import BaseEventIsolation, BaseStorage, StorageKey
+from aiogram.fsm.storage.redis import RedisStorage
+from aiogram.types import TelegramObject
+from redis.asyncio.client import Redis
+
+from config import FSM_KEY_PREFIX, INACTIVITY_TIMEOUT_MINUTES, INACTIVITY_SWEEP_INTERVAL
+from lanes import LaneOverflow
+from outbound import as_notification
+
+
+class ActivityStore(Protocol):
+    """
+    Время последней активности пользователей (unix-время, общее для процессов).
+    """
+
+    async def touch(self, key: StorageKey, now: float) -> None:
+        ...
+
+    async def expired(self, deadline: float, limit: int) -> list[StorageKey]:
+        """
+        До limit ключей, активных в последний раз не позже deadline, от самых старых.
+        """
+        ...
+
+    async def claim(self, key: StorageKey, deadline: float) -> bool:
+        """
+        Атомарно удаляет запись key, если с deadline пользователь так и не появился.
+        True — запись удалена этим вызовом и диалог можно сбрасывать.
+        """
+        ...
+
+
+class MemoryActivityStore:
+    """
+    Активность в памяти процесса — для MemoryStorage, которое тоже живёт только
+    в процессе: после перезапуска сбрасывать нечего.
+    """
+
+    def __init__(self):
+        # Порядок вставки = порядок последней активности: самые старые записи в начале
+        self._last_seen: OrderedDict[StorageKey, float] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._last_seen)
+
+    async def touch(self, key: StorageKey, now: float) -> None:
+        self._last_seen[key] = now
+        self._last_seen.move_to_end(key)
+
+    async def expired(self, deadline: float, limit: int) -> list[StorageKey]:
+        keys = []
+        for key, last_seen in self._last_seen.items():
+            if last_seen > deadline or len(keys) == limit:
+                break
+            keys.append(key)
+        return keys
+
+    async def claim(self, key: StorageKey, deadline: float) -> bool:
+        last_seen = self._last_seen.get(key)
+        if last_seen is None or last_seen > deadline:
+            return False
+        del self._last_seen[key]
+        return True
+
+
+_CLAIM_LUA = """
+local last_seen = redis.call('ZSCORE', KEYS[1], ARGV[1])
+if last_seen and tonumber(last_seen) <= tonumber(ARGV[2]) then
+    redis.call('ZREM', KEYS[1], ARGV[1])
+    return 1
+end
+return 0
+"""
+
+
+class RedisActivityStore:
+    """
+    Активность в sorted set Redis (ключ FSM -> время), рядом с состоянием FSM:
+    сброс видит активность, обработанную любым процессом бота, и переживает
+    перезапуск. Сбросить диалог может только процесс, который забрал запись
+    (claim — Lua-скрипт, один round-trip).
+    """
+
+    def __init__(self, redis: Redis, name: str = f"{FSM_KEY_PREFIX}:last_seen"):
+        self.redis = redis
+        self.name = name
+        self._claim = redis.register_script(_CLAIM_LUA)
+
+    @staticmethod
+    def _member(key: StorageKey) -> str:
+        return json.dumps(
+            [key.bot_id, key.chat_id, key.user_id, key.thread_id, key.business_connection_id, key.destiny]
+        )
+
+    @staticmethod
+    def _key(member: bytes | str) -> StorageKey:
+        bot_id, chat_id, user_id, thread_id, business_connection_id, destiny = json.loads(member)
+        return StorageKey(
+            bot_id=bot_id, chat_id=chat_id, user_id=user_id, thread_id=thread_id,
+            business_connection_id=business_connection_id, destiny=destiny,
+        )
+
+    async def touch(self, key: StorageKey, now: float) -> None:
+        await self.redis.zadd(self.name, {self._member(key): now})
+
+    async def expired(self, deadline: float, limit: int) -> list[StorageKey]:
+        members = await self.redis.zrangebyscore(self.name, "-inf", deadline, start=0, num=limit)
+        return [self._key(member) for member in members]
+
+    async def claim(self, key: StorageKey, deadline: float) -> bool:
+        return bool(await self._claim(keys=[self.name], args=[self._member(key), deadline]))
+
+
+def create_activity_store(storage: BaseStorage) -> ActivityStore:
+    """
+    Хранилище активности рядом с состоянием FSM: при Redis-хранилище — в том же Redis.
+    """
+    if isinstance(storage, RedisStorage):
+        return RedisActivityStore(storage.redis)
+    return MemoryActivityStore()
 
-INACTIVITY_TIMEOUT = timedelta(minutes=10)
 
 class InactivityMiddleware(BaseMiddleware):
+    """
+    Запоминает время последней активности пользователя в ActivityStore,
+    а фоновая задача периодически сбрасывает незавершённые диалоги тех,
+    кто молчит дольше timeout, и возвращает их в главное меню.
+    Регистрируется как middleware на update, то есть уже внутри очереди
+    пользователя (events_isolation); сброс берёт ту же блокировку.
+    """
+
+    # Сколько диалогов сбрасывается за один проход, остальные — в следующий
+    SWEEP_LIMIT = 1000
+
+    def __init__(
+        self,
+        activity: ActivityStore | None = None,
+        timeout: float = INACTIVITY_TIMEOUT_MINUTES * 60,
+        sweep_interval: float = INACTIVITY_SWEEP_INTERVAL,
+    ):
+        self.activity = activity or MemoryActivityStore()
+        self.timeout = timeout
+        self.sweep_interval = sweep_interval
+        self._task: asyncio.Task | None = None
+
     async def __call__(self, handler, event: TelegramObject, data: dict):
-        if isinstance(event, Message):
-            state: FSMContext = data.get("state")
-            if state:
-                user_data = await state.get_data()
-                last_activity = user_data.get("last_activity", datetime.min)
-                
-                if datetime.utcnow() - last_activity > INACTIVITY_TIMEOUT:
-                    await state.clear()
-                    from handlers.order import main_menu_keyboard
-                    await event.answer(
-                        "⏳ Вы долго не общались с ботом. Возвращаем вас в главное меню!",
-                        reply_markup=main_menu_keyboard()
-                    )
-                
-                await state.update_data(last_activity=datetime.utcnow())
-        
-        return await handler(event, data)
\ No newline at end of file
+        state: FSMContext | None = data.get("state")
+        if state is not None:
+            await self.activity.touch(state.key, time.time())
+        return await handler(event, data)
+
+    async def on_startup(self, bot: Bot, dispatcher) -> None:
+        self._task = asyncio.create_task(
+            as_notification(self._run(bot, dispatcher.storage, dispatcher.fsm.events_isolation))
+        )
+
+    async def on_shutdown(self) -> None:
+        if self._task:
+            self._task.cancel()
+            self._task = None
+
+    async def _run(self, bot: Bot, storage: BaseStorage, isolation: BaseEventIsolation) -> None:
+        while True:
+            await asyncio.sleep(self.sweep_interval)
+            try:
+                await self.sweep(bot, storage, isolation)
+            except Exception:
+                logging.exception("Ошибка при сбросе неактивных диалогов")
+
+    async def sweep(
+        self, bot: Bot, storage: BaseStorage, isolation: BaseEventIsolation, now: float | None = None
+    ) -> int:
+        """
+        Сбрасывает состояния пользователей, неактивных дольше timeout.
+        Каждый диалог сбрасывается под блокировкой очереди пользователя,
+        с повторной проверкой времени активности (claim): пользователь мог написать,
+        пока сброс ждал своей очереди или предыдущих пользователей.
+        Блокировка действует в пределах процесса; между процессами диалог сбрасывает
+        только тот, кто забрал запись активности.
+        Возвращает количество сброшенных диалогов.
+        """
+        deadline = (time.time() if now is None else now) - self.timeout
+        cleared = 0
+        for key in await self.activity.expired(deadline, self.SWEEP_LIMIT):
+            try:
+                async with isolation.lock(key):
+                    if not await self.activity.claim(key, deadline) or await storage.get_state(key) is None:
+                        continue
+                    await storage.set_state(key, None)
+                    await storage.set_data(key, {})
+            except LaneOverflow:
+                # Очередь пользователя полна — он явно активен
+                continue
+            cleared += 1
+            await self.notify(bot, key)
+        return cleared
+
+    async def notify(self, bot: Bot, key: StorageKey) -> None:
+        from handlers.order import main_menu_keyboard
+        try:
+            await bot.send_message(
+                key.chat_id,
+                "⏳ Вы долго не общались с ботом. Возвращаем вас в главное меню!",
+                reply_markup=await main_menu_keyboard(key.user_id)
+            )
+        except Exception as e:
+            logging.error(f"Не удалось уведомить {key.chat_id} о сбросе диалога: {e}")
@@ -0,0 +1,41 @@
+# metrics.py
+from time import perf_counter
+
+from aiogram.dispatcher.middlewares.base import BaseMiddleware
+from aiogram.types import TelegramObject
+
+from metrics import HANDLER_ERRORS, HANDLER_LATENCY
+
+
+class HandlerMetricsMiddleware(BaseMiddleware):
+    """
+    Время работы и исключения каждого обработчика.
+    Регистрируется как inner-middleware, поэтому вызывается только для
+    сработавшего обработчика; router — модуль обработчика, handler — имя функции.
+    """
+
+    def __init__(self):
+        self._labels: dict[object, tuple[str, str]] = {}
+
+    def labels(self, callback) -> tuple[str, str]:
+        labels = self._labels.get(callback)
+        if labels is None:
+            module = getattr(callback, "__module__", "") or ""
+            labels = self._labels[callback] = (
+                module.rsplit(".", 1)[-1],
+                getattr(callback, "__name__", type(callback).__name__),
+            )
+        return labels
+
+    async def __call__(self, handler, event: TelegramObject, data: dict):
+        # Для кнопок из ButtonIndex учитываем сам обработчик кнопки, а не общий dispatch
+        handler_object = data.get("button_handler") or data.get("handler")
+        labels = self.labels(handler_object.callback) if handler_object else ("", "")
+        started = perf_counter()
+        try:
+            return await handler(event, data)
+        except Exception as e:
+            HANDLER_ERRORS.inc(labels + (type(e).__name__,))
+            raise
+        finally:
+            HANDLER_LATENCY.observe(perf_counter() - started, labels)
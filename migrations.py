@@ -0,0 +1,199 @@
+# migrations.py
+import logging
+from typing import Awaitable, Callable
+
+from sqlalchemy import Integer, inspect, text
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from statuses import OrderStatus, STATUS_LABELS
+
+Step = str | Callable[[AsyncConnection], Awaitable[None]]
+
+
+def _has_column(sync_conn, table: str, column: str) -> bool:
+    return any(c["name"] == column for c in inspect(sync_conn).get_columns(table))
+
+
+async def add_active_orders_counter(conn: AsyncConnection) -> None:
+    # На новой базе колонку уже создал create_all
+    if await conn.run_sync(_has_column, "users", "active_orders"):
+        return
+    await conn.execute(text(
+        "ALTER TABLE users ADD COLUMN active_orders INTEGER NOT NULL DEFAULT 0"
+    ))
+    await conn.execute(text(
+        "UPDATE users SET active_orders = ("
+        "SELECT COUNT(*) FROM orders "
+        "WHERE orders.user_id = users.id AND orders.status != 'Исполнено')"
+    ))
+
+
+_USERS_FTS_TRIGGERS = [
+    "CREATE TRIGGER IF NOT EXISTS users_fts_ai AFTER INSERT ON users BEGIN "
+    "INSERT INTO users_fts (rowid, name, phone, address, organization) "
+    "VALUES (new.id, new.name, new.phone, new.address, new.organization); END",
+    "CREATE TRIGGER IF NOT EXISTS users_fts_ad AFTER DELETE ON users BEGIN "
+    "INSERT INTO users_fts (users_fts, rowid, name, phone, address, organization) "
+    "VALUES ('delete', old.id, old.name, old.phone, old.address, old.organization); END",
+    # Счётчик active_orders меняется часто — индекс обновляем только при изменении анкеты
+    "CREATE TRIGGER IF NOT EXISTS users_fts_au AFTER UPDATE OF name, phone, address, organization "
+    "ON users BEGIN "
+    "INSERT INTO users_fts (users_fts, rowid, name, phone, address, organization) "
+    "VALUES ('delete', old.id, old.name, old.phone, old.address, old.organization); "
+    "INSERT INTO users_fts (rowid, name, phone, address, organization) "
+    "VALUES (new.id, new.name, new.phone, new.address, new.organization); END",
+]
+
+
+async def create_users_fts(conn: AsyncConnection) -> None:
+    # Полнотекстовый индекс есть только в SQLite (FTS5)
+    if conn.dialect.name != "sqlite":
+        return
+    await conn.execute(text(
+        "CREATE VIRTUAL TABLE IF NOT EXISTS users_fts USING fts5("
+        "name, phone, address, organization, "
+        "content='users', content_rowid='id', tokenize='unicode61 remove_diacritics 2')"
+    ))
+    for trigger in _USERS_FTS_TRIGGERS:
+        await conn.execute(text(trigger))
+    await conn.execute(text("INSERT INTO users_fts (users_fts) VALUES ('rebuild')"))
+
+
+def _column_is_integer(sync_conn, table: str, column: str) -> bool:
+    return any(
+        c["name"] == column and isinstance(c["type"], Integer)
+        for c in inspect(sync_conn).get_columns(table)
+    )
+
+
+_ORDER_INDEXES = [
+    "CREATE INDEX ix_orders_user_status ON orders (user_id, status)",
+    f"CREATE INDEX ix_orders_active ON orders (id) WHERE status < {int(OrderStatus.DONE)}",
+    "CREATE INDEX ix_orders_status_completed ON orders (status, completed_at)",
+]
+
+
+async def convert_order_status_to_codes(conn: AsyncConnection) -> None:
+    # На новой базе create_all уже создал колонку SMALLINT
+    if await conn.run_sync(_column_is_integer, "orders", "status"):
+        return
+
+    # Неизвестные строки (в т.ч. старый default "Новая") считаем новой заявкой от пользователя
+    cases = " ".join(f"WHEN '{label}' THEN {int(code)}" for code, label in STATUS_LABELS.items())
+    to_code = f"CASE status {cases} ELSE {int(OrderStatus.NEW_FROM_USER)} END"
+
+    for index in ("ix_orders_user_status", "ix_orders_active", "ix_orders_status_completed"):
+        await conn.execute(text(f"DROP INDEX IF EXISTS {index}"))
+    if conn.dialect.name == "sqlite":
+        # У колонки String в SQLite аффинность TEXT — числа в ней сравнивались бы
+        # как строки, поэтому колонку пересоздаём (нужен SQLite 3.35+)
+        await conn.execute(text(
+            "ALTER TABLE orders ADD COLUMN status_code SMALLINT NOT NULL "
+            f"DEFAULT {int(OrderStatus.NEW_FROM_USER)}"
+        ))
+        await conn.execute(text(f"UPDATE orders SET status_code = {to_code}"))
+        await conn.execute(text("ALTER TABLE orders DROP COLUMN status"))
+        await conn.execute(text("ALTER TABLE orders RENAME COLUMN status_code TO status"))
+    else:
+        await conn.execute(text(
+            f"ALTER TABLE orders ALTER COLUMN status TYPE SMALLINT USING {to_code}"
+        ))
+        await conn.execute(text("ALTER TABLE orders ALTER COLUMN status SET NOT NULL"))
+    for index in _ORDER_INDEXES:
+        await conn.execute(text(index))
+
+
+# Удаление активной заявки уменьшает счётчик владельца в том же запросе,
+# что и сам DELETE; остальные изменения счётчика — change_active_orders
+_ACTIVE = f"old.status < {int(OrderStatus.DONE)}"
+_RELEASE_ACTIVE = "UPDATE users SET active_orders = active_orders - 1 WHERE id = old.user_id AND active_orders > 0"
+
+
+async def create_active_orders_delete_trigger(conn: AsyncConnection) -> None:
+    if conn.dialect.name == "sqlite":
+        await conn.execute(text(
+            f"CREATE TRIGGER IF NOT EXISTS orders_active_ad AFTER DELETE ON orders WHEN {_ACTIVE} "
+            f"BEGIN {_RELEASE_ACTIVE}; END"
+        ))
+    else:
+        await conn.execute(text(
+            "CREATE OR REPLACE FUNCTION orders_release_active() RETURNS trigger AS $$ "
+            f"BEGIN {_RELEASE_ACTIVE}; RETURN NULL; END $$ LANGUAGE plpgsql"
+        ))
+        await conn.execute(text("DROP TRIGGER IF EXISTS orders_active_ad ON orders"))
+        await conn.execute(text(
+            f"CREATE TRIGGER orders_active_ad AFTER DELETE ON orders FOR EACH ROW WHEN ({_ACTIVE.replace('old', 'OLD')}) "
+            "EXECUTE FUNCTION orders_release_active()"
+        ))
+    # Заодно выравниваем счётчик, если он успел разойтись с заявками
+    await conn.execute(text(
+        "UPDATE users SET active_orders = ("
+        "SELECT COUNT(*) FROM orders "
+        f"WHERE orders.user_id = users.id AND orders.status < {int(OrderStatus.DONE)})"
+    ))
+
+
+# Для каждого telegram_id остаётся самая ранняя запись пользователя
+_DUPLICATE_USERS = (
+    "SELECT id FROM users WHERE telegram_id IS NOT NULL AND id NOT IN "
+    "(SELECT MIN(id) FROM users WHERE telegram_id IS NOT NULL GROUP BY telegram_id)"
+)
+
+# (версия, название, шаги). Шаги — SQL или асинхронная функция; применённые версии
+# записываются в schema_migrations, поэтому новые миграции добавляются только в конец.
+MIGRATIONS: list[tuple[int, str, list[Step]]] = [
+    (1, "users.active_orders counter", [add_active_orders_counter]),
+    (2, "order indexes for hot queries", [
+        "CREATE INDEX IF NOT EXISTS ix_orders_user_status ON orders (user_id, status)",
+        "CREATE INDEX IF NOT EXISTS ix_orders_active ON orders (id) WHERE status != 'Исполнено'",
+        "CREATE INDEX IF NOT EXISTS ix_orders_status_completed ON orders (status, completed_at)",
+        # Покрывается префиксом ix_orders_status_completed
+        "DROP INDEX IF EXISTS ix_orders_status",
+    ]),
+    (3, "unique users.telegram_id", [
+        "UPDATE orders SET user_id = ("
+        "SELECT MIN(u2.id) FROM users u1 JOIN users u2 ON u2.telegram_id = u1.telegram_id "
+        f"WHERE u1.id = orders.user_id) WHERE user_id IN ({_DUPLICATE_USERS})",
+        f"DELETE FROM users WHERE id IN ({_DUPLICATE_USERS})",
+        "UPDATE users SET active_orders = ("
+        "SELECT COUNT(*) FROM orders "
+        "WHERE orders.user_id = users.id AND orders.status != 'Исполнено')",
+        "DROP INDEX IF EXISTS ix_users_telegram_id",
+        "CREATE UNIQUE INDEX ix_users_telegram_id ON users (telegram_id)",
+    ]),
+    (4, "users_fts full-text index", [create_users_fts]),
+    (5, "integer order status codes", [convert_order_status_to_codes]),
+    (6, "active_orders trigger on order delete", [create_active_orders_delete_trigger]),
+]
+
+
+async def run_migrations(conn: AsyncConnection) -> list[int]:
+    """
+    Применяет ещё не применённые миграции по порядку версий.
+    Возвращает список применённых версий.
+    """
+    await conn.execute(text(
+        "CREATE TABLE IF NOT EXISTS schema_migrations ("
+        "version INTEGER PRIMARY KEY, "
+        "name VARCHAR NOT NULL, "
+        "applied_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP)"
+    ))
+    result = await conn.execute(text("SELECT version FROM schema_migrations"))
+    applied = set(result.scalars().all())
+
+    newly_applied = []
+    for version, name, steps in MIGRATIONS:
+        if version in applied:
+            continue
+        for step in steps:
+            if isinstance(step, str):
+                await conn.execute(text(step))
+            else:
+                await step(conn)
+        await conn.execute(
+            text("INSERT INTO schema_migrations (version, name) VALUES (:version, :name)"),
+            {"version": version, "name": name}
+        )
+        logging.info(f"Applied migration {version}: {name}")
+        newly_applied.append(version)
+    return newly_applied
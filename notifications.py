@@ -0,0 +1,193 @@
+# notifications.py
+import asyncio
+import logging
+
+from aiogram import Bot
+from aiogram.exceptions import TelegramForbiddenError
+from aiogram.types import InlineKeyboardMarkup
+
+from outbound import as_notification
+from statuses import status_label
+from config import ADMIN_IDS, ADMIN_NOTIFY_WINDOW, STATUS_NOTIFY_WINDOW
+
+
+def admin_chat_ids() -> list[int]:
+    return [int(x) for x in ADMIN_IDS if x.strip().isdigit()]
+
+
+def format_order_ids(order_ids: list[int]) -> str:
+    """
+    Сжимает список номеров в диапазоны: [101, 102, 103, 107] -> "#101–#103, #107".
+    """
+    parts = []
+    ids = sorted(order_ids)
+    start = prev = ids[0]
+    for order_id in ids[1:] + [None]:
+        if order_id is not None and order_id == prev + 1:
+            prev = order_id
+            continue
+        parts.append(f"#{start}" if start == prev else f"#{start}–#{prev}")
+        if order_id is not None:
+            start = prev = order_id
+    return ", ".join(parts)
+
+
+class AdminNotifier:
+    """
+    Фоновая рассылка уведомлений администраторам.
+    Сообщения уходят всем админам параллельно и не задерживают ответ пользователю.
+    Первая заявка отправляется сразу, а заявки, пришедшие в течение окна
+    после неё, объединяются в одну сводку на каждого админа.
+    """
+
+    def __init__(self, window: float = ADMIN_NOTIFY_WINDOW):
+        self.window = window
+        self._pending: list[tuple[int, str]] = []
+        self._bot: Bot | None = None
+        self._reply_markup: InlineKeyboardMarkup | None = None
+        self._digest_task: asyncio.Task | None = None
+        self._tasks: set[asyncio.Task] = set()
+        self._closing = asyncio.Event()
+
+    def notify_new_order(
+        self,
+        bot: Bot,
+        order_id: int,
+        text: str,
+        reply_markup: InlineKeyboardMarkup | None = None,
+    ) -> None:
+        self._pending.append((order_id, text))
+        self._bot = bot
+        self._reply_markup = reply_markup
+        if self._digest_task is None or self._digest_task.done():
+            self._digest_task = self._spawn(self._run_digest())
+
+    def broadcast(self, bot: Bot, text: str, **kwargs) -> None:
+        """
+        Отправляет сообщение всем админам в фоне, без объединения.
+        """
+        self._spawn(self._send_to_admins(bot, text, **kwargs))
+
+    async def close(self) -> None:
+        """
+        Дожидается отправки всех поставленных в очередь уведомлений.
+        """
+        self._closing.set()
+        while self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    def _spawn(self, coro) -> asyncio.Task:
+        task = asyncio.create_task(as_notification(coro))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return task
+
+    async def _run_digest(self) -> None:
+        while self._pending:
+            batch, self._pending = self._pending, []
+            if len(batch) == 1:
+                text = batch[0][1]
+            else:
+                order_ids = [order_id for order_id, _ in batch]
+                text = f"📦 Новых заявок: {len(batch)} ({format_order_ids(order_ids)})"
+            await self._send_to_admins(self._bot, text, reply_markup=self._reply_markup)
+            # Всё, что придёт за время окна, уйдёт одной сводкой
+            try:
+                await asyncio.wait_for(self._closing.wait(), self.window)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _send_to_admins(self, bot: Bot, text: str, **kwargs) -> None:
+        admin_ids = admin_chat_ids()
+        results = await asyncio.gather(
+            *(bot.send_message(admin_id, text=text, **kwargs) for admin_id in admin_ids),
+            return_exceptions=True
+        )
+        for admin_id, result in zip(admin_ids, results):
+            if isinstance(result, Exception):
+                logging.error(f"Ошибка уведомления админа {admin_id}: {result}")
+
+
+class StatusNotifier:
+    """
+    Фоновая очередь уведомлений клиентам о смене статуса заявки.
+    Изменения копятся в течение окна; по каждой заявке остаётся только последний
+    статус, а если он вернулся к исходному — уведомление не нужно вовсе.
+    Каждый чат получает не больше одного сообщения за окно (все его заявки сразу).
+    Темп отправки и повторы после 429 — забота outbound.OutboundLimiter:
+    сообщения уходят с низким приоритетом и не обгоняют ответы пользователям.
+    """
+
+    def __init__(self, window: float = STATUS_NOTIFY_WINDOW):
+        self.window = window
+        # order_id -> [chat_id, статус до первого изменения в окне, последний статус]
+        self._pending: dict[int, list] = {}
+        self._bot: Bot | None = None
+        self._task: asyncio.Task | None = None
+        self._closing = asyncio.Event()
+
+    def notify_status(
+        self,
+        bot: Bot,
+        chat_id: int | None,
+        order_id: int,
+        old_status: int,
+        new_status: int,
+    ) -> None:
+        # Заявки, созданные админом без клиента в Telegram, уведомлять некому
+        if chat_id is None:
+            return
+        entry = self._pending.get(order_id)
+        if entry is None:
+            self._pending[order_id] = [chat_id, old_status, new_status]
+        else:
+            entry[2] = new_status
+        self._bot = bot
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(as_notification(self._run()))
+
+    async def close(self) -> None:
+        """
+        Отправляет накопленные уведомления, не дожидаясь конца окна.
+        """
+        self._closing.set()
+        if self._task is not None:
+            await asyncio.gather(self._task, return_exceptions=True)
+
+    async def _run(self) -> None:
+        while self._pending:
+            try:
+                await asyncio.wait_for(self._closing.wait(), self.window)
+            except asyncio.TimeoutError:
+                pass
+            batch, self._pending = self._pending, {}
+
+            by_chat: dict[int, list[tuple[int, int]]] = {}
+            for order_id, (chat_id, old_status, new_status) in batch.items():
+                if new_status != old_status:
+                    by_chat.setdefault(chat_id, []).append((order_id, new_status))
+
+            await asyncio.gather(
+                *(self._send(chat_id, self.format_changes(changes)) for chat_id, changes in by_chat.items())
+            )
+
+    @staticmethod
+    def format_changes(changes: list[tuple[int, int]]) -> str:
+        if len(changes) == 1:
+            order_id, status = changes[0]
+            return f"🔔 Статус вашей заявки #{order_id}: {status_label(status)}"
+        lines = "\n".join(f"▪ #{order_id}: {status_label(status)}" for order_id, status in sorted(changes))
+        return f"🔔 Изменились статусы ваших заявок:\n{lines}"
+
+    async def _send(self, chat_id: int, text: str) -> None:
+        try:
+            await self._bot.send_message(chat_id, text=text)
+        except TelegramForbiddenError:
+            # Клиент заблокировал бота
+            pass
+        except Exception as e:
+            logging.error(f"Ошибка уведомления клиента {chat_id}: {e}")
+
+
+admin_notifier = AdminNotifier()
+status_notifier = StatusNotifier()
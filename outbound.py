@@ -0,0 +1,135 @@
+# outbound.py
+import asyncio
+import heapq
+import itertools
+import logging
+from contextvars import ContextVar
+from time import monotonic, perf_counter
+from typing import Awaitable, TypeVar
+
+from aiogram import Bot
+from aiogram.client.session.middlewares.base import BaseRequestMiddleware
+from aiogram.exceptions import TelegramRetryAfter
+
+from config import (
+    OUTBOUND_RATE, OUTBOUND_BURST, OUTBOUND_CHAT_RATE, OUTBOUND_CHAT_BURST, OUTBOUND_MAX_RETRIES
+)
+from metrics import OUTBOUND_QUEUED, OUTBOUND_RETRIES, OUTBOUND_WAIT
+from ratelimit import TokenBucketLimiter
+
+# Приоритеты: меньше — раньше. Ответы пользователю идут впереди фоновых уведомлений
+PRIORITY_INTERACTIVE = 0
+PRIORITY_NOTIFICATION = 1
+PRIORITY_LABELS = {PRIORITY_INTERACTIVE: "interactive", PRIORITY_NOTIFICATION: "notification"}
+
+_priority: ContextVar[int] = ContextVar("outbound_priority", default=PRIORITY_INTERACTIVE)
+
+T = TypeVar("T")
+
+
+async def as_notification(coro: Awaitable[T]) -> T:
+    """
+    Выполняет coro с низким приоритетом отправки. Оборачивает корутину фоновой
+    задачи: у задачи своя копия контекста, так что приоритет не утекает наружу.
+    """
+    _priority.set(PRIORITY_NOTIFICATION)
+    return await coro
+
+
+class OutboundLimiter(BaseRequestMiddleware):
+    """
+    Ограничитель исходящих сообщений на сессии бота.
+    Запросы с chat_id (отправка, редактирование, файлы) сначала ждут общий токен,
+    затем — токен своего чата, непосредственно перед отправкой. Общие токены
+    раздаются по приоритету, а внутри приоритета — в порядке прихода.
+    Остальные методы (answerCallbackQuery, getMe) проходят без ограничений.
+    На 429 отправка в этот чат приостанавливается на retry_after, после чего
+    запрос повторяется (не больше max_retries раз).
+    """
+
+    _GLOBAL = "global"
+
+    def __init__(
+        self,
+        rate: float = OUTBOUND_RATE,
+        burst: int = OUTBOUND_BURST,
+        chat_rate: float = OUTBOUND_CHAT_RATE,
+        chat_burst: int = OUTBOUND_CHAT_BURST,
+        max_retries: int = OUTBOUND_MAX_RETRIES,
+    ):
+        self.global_bucket = TokenBucketLimiter(rate=rate, capacity=burst, max_keys=1)
+        self.chat_buckets = TokenBucketLimiter(rate=chat_rate, capacity=chat_burst)
+        self.max_retries = max_retries
+        # (приоритет, порядковый номер, future) — ожидающие общего токена
+        self._queue: list[tuple[int, int, asyncio.Future]] = []
+        self._queued = {priority: 0 for priority in PRIORITY_LABELS}
+        self._seq = itertools.count()
+        self._pump: asyncio.Task | None = None
+        # chat_id -> время, до которого Telegram просил не писать в чат
+        self._chat_paused: dict[int | str, float] = {}
+
+    async def __call__(self, make_request, bot: Bot, method):
+        chat_id = getattr(method, "chat_id", None)
+        if chat_id is None:
+            return await make_request(bot, method)
+
+        for attempt in range(self.max_retries + 1):
+            await self.acquire(chat_id)
+            try:
+                return await make_request(bot, method)
+            except TelegramRetryAfter as e:
+                if attempt == self.max_retries:
+                    raise
+                OUTBOUND_RETRIES.inc((method.__api_method__,))
+                logging.warning(f"Лимит Telegram ({method.__api_method__} в {chat_id}), пауза {e.retry_after} с")
+                self._chat_paused[chat_id] = monotonic() + e.retry_after
+
+    async def acquire(self, chat_id: int | str) -> None:
+        priority = _priority.get()
+        started = perf_counter()
+        await self._acquire_global(priority)
+        # Лимит чата проверяется последним: интервалы между сообщениями в чат
+        # не должны сжиматься, пока запрос стоит в общей очереди
+        while True:
+            delay = self._chat_paused.get(chat_id, 0.0) - monotonic()
+            if delay <= 0:
+                self._chat_paused.pop(chat_id, None)
+                delay = self.chat_buckets.wait_time(chat_id)
+                if not delay:
+                    break
+            await asyncio.sleep(delay)
+        OUTBOUND_WAIT.observe(perf_counter() - started, (PRIORITY_LABELS[priority],))
+
+    async def _acquire_global(self, priority: int) -> None:
+        # Без очереди токен берётся сразу, без создания future
+        if self._queue or self.global_bucket.wait_time(self._GLOBAL):
+            future = asyncio.get_running_loop().create_future()
+            heapq.heappush(self._queue, (priority, next(self._seq), future))
+            self._set_queued(priority, 1)
+            if self._pump is None or self._pump.done():
+                self._pump = asyncio.create_task(self._run_pump())
+            try:
+                await future
+            finally:
+                if not future.done():
+                    # Отменили, пока ждали: запись останется в куче и будет пропущена
+                    future.cancel()
+
+    def _set_queued(self, priority: int, delta: int) -> None:
+        self._queued[priority] += delta
+        OUTBOUND_QUEUED.set(self._queued[priority], (PRIORITY_LABELS[priority],))
+
+    async def _run_pump(self) -> None:
+        while self._queue:
+            priority, _, future = self._queue[0]
+            if future.done():
+                heapq.heappop(self._queue)
+                self._set_queued(priority, -1)
+                continue
+            delay = self.global_bucket.wait_time(self._GLOBAL)
+            if delay > 0:
+                await asyncio.sleep(delay)
+                continue
+            heapq.heappop(self._queue)
+            self._set_queued(priority, -1)
+            future.set_result(None)
@@ -0,0 +1,234 @@
+# ratelimit.py
+import time
+from collections import OrderedDict
+from typing import Hashable, Protocol
+
+from redis.asyncio.client import Redis
+
+from config import REDIS_URL, RATE_LIMIT_ALGORITHM, RATE_LIMIT_BACKEND, RATE_LIMIT_MAX_KEYS
+
+
+class RateLimiter(Protocol):
+    async def hit(self, key: Hashable) -> bool:
+        """
+        Учитывает одно событие для key. Возвращает False, если лимит превышен.
+        """
+        ...
+
+
+class _BoundedStore:
+    """
+    Хранилище состояний по ключам, упорядоченное по последнему обращению.
+    Ключи, к которым не обращались дольше ttl, вычищаются понемногу на каждом
+    обращении, а размер жёстко ограничен max_keys (вытесняются самые старые).
+    """
+
+    SWEEP_PER_HIT = 2
+
+    def __init__(self, ttl: float, max_keys: int):
+        self.ttl = ttl
+        self.max_keys = max_keys
+        self._items: OrderedDict[Hashable, list] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def get(self, key: Hashable, now: float) -> list | None:
+        self._sweep(now)
+        item = self._items.get(key)
+        if item is not None:
+            self._items.move_to_end(key)
+        return item
+
+    def put(self, key: Hashable, item: list) -> None:
+        self._items[key] = item
+        if len(self._items) > self.max_keys:
+            self._items.popitem(last=False)
+
+    def _sweep(self, now: float) -> None:
+        for _ in range(self.SWEEP_PER_HIT):
+            if not self._items:
+                return
+            key, item = next(iter(self._items.items()))
+            # item[-1] — время последнего обращения к ключу
+            if now - item[-1] <= self.ttl:
+                return
+            del self._items[key]
+
+
+class TokenBucketLimiter:
+    """
+    Token bucket: ведро на capacity событий, пополняется со скоростью rate в секунду.
+    """
+
+    def __init__(self, rate: float, capacity: int, max_keys: int = RATE_LIMIT_MAX_KEYS):
+        self.rate = rate
+        self.capacity = capacity
+        # Через capacity / rate секунд простоя ведро снова полное — состояние можно забыть
+        self._store = _BoundedStore(ttl=capacity / rate, max_keys=max_keys)
+
+    async def hit(self, key: Hashable) -> bool:
+        return self.hit_nowait(key)
+
+    def hit_nowait(self, key: Hashable, now: float | None = None) -> bool:
+        return self.wait_time(key, now) == 0
+
+    def wait_time(self, key: Hashable, now: float | None = None) -> float:
+        """
+        Как hit_nowait, но при превышении лимита возвращает, через сколько
+        секунд появится токен. 0 — токен был и событие учтено.
+        """
+        if now is None:
+            now = time.monotonic()
+        item = self._store.get(key, now)
+        if item is None:
+            self._store.put(key, [self.capacity - 1, now])
+            return 0.0
+
+        tokens = min(self.capacity, item[0] + (now - item[1]) * self.rate)
+        item[1] = now
+        if tokens < 1:
+            item[0] = tokens
+            return (1 - tokens) / self.rate
+        item[0] = tokens - 1
+        return 0.0
+
+
+class SlidingWindowLimiter:
+    """
+    Скользящее окно (sliding window counter): не более limit событий за window секунд.
+    Хранит два счётчика на ключ — текущего и предыдущего окна — и взвешивает
+    предыдущий по доле окна, которая ещё попадает в скользящий интервал.
+    """
+
+    def __init__(self, limit: int, window: float, max_keys: int = RATE_LIMIT_MAX_KEYS):
+        self.limit = limit
+        self.window = window
+        self._store = _BoundedStore(ttl=2 * window, max_keys=max_keys)
+
+    async def hit(self, key: Hashable) -> bool:
+        return self.hit_nowait(key)
+
+    def hit_nowait(self, key: Hashable, now: float | None = None) -> bool:
+        if now is None:
+            now = time.monotonic()
+        window_start = now - now % self.window
+        item = self._store.get(key, now)
+        if item is None:
+            # [начало текущего окна, счётчик предыдущего, счётчик текущего, последнее обращение]
+            self._store.put(key, [window_start, 0, 1, now])
+            return True
+
+        if item[0] != window_start:
+            previous = item[2] if window_start - item[0] == self.window else 0
+            item[0], item[1], item[2] = window_start, previous, 0
+        item[3] = now
+
+        weight = 1 - (now - window_start) / self.window
+        if item[1] * weight + item[2] >= self.limit:
+            return False
+        item[2] += 1
+        return True
+
+
+_TOKEN_BUCKET_LUA = """
+local rate = tonumber(ARGV[1])
+local capacity = tonumber(ARGV[2])
+local now = tonumber(ARGV[3])
+local state = redis.call('HMGET', KEYS[1], 't', 'ts')
+local tokens = tonumber(state[1])
+local ts = tonumber(state[2])
+if tokens == nil then
+    tokens = capacity
+    ts = now
+end
+tokens = math.min(capacity, tokens + (now - ts) * rate)
+local allowed = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+    allowed = 1
+end
+redis.call('HSET', KEYS[1], 't', tostring(tokens), 'ts', tostring(now))
+redis.call('PEXPIRE', KEYS[1], ARGV[4])
+return allowed
+"""
+
+_SLIDING_WINDOW_LUA = """
+local current = tonumber(redis.call('GET', KEYS[1]) or '0')
+local previous = tonumber(redis.call('GET', KEYS[2]) or '0')
+if previous * tonumber(ARGV[1]) + current >= tonumber(ARGV[2]) then
+    return 0
+end
+redis.call('INCR', KEYS[1])
+redis.call('PEXPIRE', KEYS[1], ARGV[3])
+return 1
+"""
+
+
+class RedisRateLimiter:
+    """
+    Те же алгоритмы на стороне Redis (Lua-скрипт, один round-trip на событие),
+    чтобы несколько процессов бота делили общие лимиты.
+    """
+
+    def __init__(
+        self,
+        redis: Redis,
+        limit: int,
+        window: float,
+        algorithm: str = "sliding_window",
+        prefix: str = "ratelimit",
+    ):
+        if algorithm not in ("sliding_window", "token_bucket"):
+            raise ValueError(f"Неизвестный алгоритм ограничения: {algorithm}")
+        self.redis = redis
+        self.limit = limit
+        self.window = window
+        self.algorithm = algorithm
+        self.prefix = prefix
+        lua = _TOKEN_BUCKET_LUA if algorithm == "token_bucket" else _SLIDING_WINDOW_LUA
+        self._script = redis.register_script(lua)
+
+    async def hit(self, key: Hashable) -> bool:
+        now_ms = int(time.time() * 1000)
+        window_ms = int(self.window * 1000)
+        if self.algorithm == "token_bucket":
+            allowed = await self._script(
+                keys=[f"{self.prefix}:{key}"],
+                args=[self.limit / window_ms, self.limit, now_ms, window_ms],
+            )
+        else:
+            window_start = now_ms - now_ms % window_ms
+            weight = 1 - (now_ms - window_start) / window_ms
+            allowed = await self._script(
+                keys=[
+                    f"{self.prefix}:{key}:{window_start}",
+                    f"{self.prefix}:{key}:{window_start - window_ms}",
+                ],
+                args=[weight, self.limit, 2 * window_ms],
+            )
+        return bool(allowed)
+
+
+def create_limiter(
+    limit: int,
+    window: float,
+    algorithm: str = RATE_LIMIT_ALGORITHM,
+    backend: str = RATE_LIMIT_BACKEND,
+    redis: Redis | None = None,
+    prefix: str = "ratelimit",
+) -> RateLimiter:
+    """
+    Создаёт ограничитель «не более limit событий за window секунд».
+    Если передан клиент Redis, используется Redis-бэкенд независимо от настроек.
+    """
+    if redis is not None or backend == "redis":
+        if redis is None:
+            redis = Redis.from_url(REDIS_URL)
+        return RedisRateLimiter(redis, limit, window, algorithm=algorithm, prefix=prefix)
+
+    if algorithm == "token_bucket":
+        return TokenBucketLimiter(rate=limit / window, capacity=limit)
+    if algorithm == "sliding_window":
+        return SlidingWindowLimiter(limit=limit, window=window)
+    raise ValueError(f"Неизвестный алгоритм ограничения: {algorithm}")
@@ -0,0 +1,119 @@
+# recorder.py
+import hashlib
+import json
+import logging
+import os
+import time
+
+from aiogram import Bot, Dispatcher
+from aiogram.types import Update
+
+from config import ADMIN_IDS, RECORD_SALT
+from render import REPLY_BUTTON_TEXTS
+
+# Тексты кнопок reply-клавиатуры сохраняются как есть — по ним идёт маршрутизация
+PUBLIC_TEXTS = REPLY_BUTTON_TEXTS
+
+# Команды, аргументы которых не содержат персональных данных
+PUBLIC_COMMAND_ARGS = {"/archive", "/export"}
+
+_MASK = str.maketrans(
+    "абвгдеёжзийклмнопрстуфхцчшщъыьэюя"
+    "АБВГДЕЁЖЗИЙКЛМНОПРСТУФХЦЧШЩЪЫЬЭЮЯ"
+    "abcdefghijklmnopqrstuvwxyz"
+    "ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+    "0123456789",
+    "а" * 33 + "А" * 33 + "a" * 26 + "A" * 26 + "5" * 10
+)
+
+
+def mask_text(text: str) -> str:
+    """
+    Обезличивает свободный текст, сохраняя его форму: буквы заменяются
+    на «а»/«a» того же регистра и алфавита, цифры — на 5. Так запись
+    проходит те же проверки (имя, телефон, адрес), что и оригинал.
+    """
+    if text in PUBLIC_TEXTS:
+        return text
+    if text.startswith("/"):
+        command, sep, args = text.partition(" ")
+        if command.split("@", 1)[0] in PUBLIC_COMMAND_ARGS:
+            return text
+        return command + sep + args.translate(_MASK)
+    return text.translate(_MASK)
+
+
+class UpdateRecorder:
+    """
+    Дописывает входящие обновления в файл JSON Lines, по строке на обновление:
+    {"t": время, "k": "m"|"c", "u": псевдоним пользователя, "a": 1 для админа,
+     "x": текст сообщения или callback_data}.
+    Сохраняются только эти поля, поэтому имена, username, контакты и т.п.
+    в запись не попадают. Подключается через install(dp) на входе в диспетчер,
+    раньше любых middleware: время — это время прихода, а не конца ожидания
+    в очереди пользователя, и отклонённые при переполнении очереди обновления
+    тоже попадают в запись.
+    """
+
+    def __init__(self, path: str, salt: str = RECORD_SALT):
+        self.path = path
+        self.salt = (salt or os.urandom(16).hex()).encode()
+        self._admin_ids = {int(x) for x in ADMIN_IDS if x.strip().isdigit()}
+        self._pseudonyms: dict[int, int] = {}
+        self._file = None
+
+    def pseudonym(self, user_id: int) -> int:
+        pseudonym = self._pseudonyms.get(user_id)
+        if pseudonym is None:
+            digest = hashlib.blake2b(str(user_id).encode(), key=self.salt, digest_size=5).digest()
+            pseudonym = self._pseudonyms[user_id] = int.from_bytes(digest, "big") + 1
+        return pseudonym
+
+    def record(self, update: Update) -> dict | None:
+        if update.message is not None:
+            kind, event = "m", update.message
+            text = mask_text(event.text) if event.text is not None else None
+        elif update.callback_query is not None:
+            kind, event = "c", update.callback_query
+            text = event.data
+        else:
+            return None
+        if event.from_user is None:
+            return None
+
+        record = {"t": round(time.time(), 3), "k": kind, "u": self.pseudonym(event.from_user.id), "x": text}
+        if event.from_user.id in self._admin_ids:
+            record["a"] = 1
+        return record
+
+    def write(self, update: Update) -> None:
+        try:
+            record = self.record(update)
+            if record is not None:
+                if self._file is None:
+                    # Построчная буферизация: после сбоя в файле остаются целые строки
+                    self._file = open(self.path, "a", encoding="utf-8", buffering=1)
+                self._file.write(json.dumps(record, ensure_ascii=False, separators=(",", ":")) + "\n")
+        except Exception:
+            logging.exception("Не удалось записать обновление")
+
+    def install(self, dp: Dispatcher) -> None:
+        """
+        Оборачивает dp.feed_update — через него проходят и polling, и webhook.
+        Middleware диспетчера для этого не годится: outer-middleware на update
+        выполняется уже после FSMContextMiddleware, то есть внутри очереди
+        пользователя (lanes.UserLanes).
+        """
+        feed_update = dp.feed_update
+
+        async def recorded_feed_update(bot: Bot, update: Update, **kwargs):
+            self.write(update)
+            return await feed_update(bot, update, **kwargs)
+
+        dp.feed_update = recorded_feed_update
+        dp.shutdown.register(self.on_shutdown)
+
+    async def on_shutdown(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
@@ -0,0 +1,128 @@
+# render.py
+from datetime import datetime, timezone
+from functools import lru_cache
+from zoneinfo import ZoneInfo
+
+from aiogram.types import (
+    InlineKeyboardButton as Button, InlineKeyboardMarkup, KeyboardButton, ReplyKeyboardMarkup
+)
+
+from statuses import OrderStatus, STATUS_LABELS
+
+# Часовые пояса создаются один раз; в БД время хранится в UTC без tzinfo
+UTC = timezone.utc
+MOSCOW_TZ = ZoneInfo("Europe/Moscow")
+
+# Тексты кнопок reply-клавиатуры (по ним же маршрутизирует buttons.ButtonIndex)
+BTN_NEW_ORDER = "🛒 Оформить заказ"
+BTN_DIRECT_MESSAGE = "✉️ Написать напрямую"
+BTN_EDIT_DATA = "✏️ Изменить данные"
+BTN_CANCEL_ORDER = "❌ Отменить заказ"
+BTN_EDIT_PHONE = "📞 Изменить телефон"
+BTN_EDIT_ADDRESS = "🏠 Изменить адрес"
+BTN_EDIT_NAME = "👤 Изменить имя"
+BTN_EDIT_ORGANIZATION = "🏢 Изменить организацию"
+BTN_EDIT_BACK = "↩️ Назад"
+
+REPLY_BUTTON_TEXTS = frozenset({
+    BTN_NEW_ORDER, BTN_DIRECT_MESSAGE, BTN_EDIT_DATA, BTN_CANCEL_ORDER,
+    BTN_EDIT_PHONE, BTN_EDIT_ADDRESS, BTN_EDIT_NAME, BTN_EDIT_ORGANIZATION, BTN_EDIT_BACK,
+})
+
+
+def to_moscow(value: datetime) -> datetime:
+    return value.replace(tzinfo=UTC).astimezone(MOSCOW_TZ)
+
+
+def format_ts(value: datetime | None, fmt: str = "%d.%m.%Y %H:%M", default: str = "—") -> str:
+    return to_moscow(value).strftime(fmt) if value else default
+
+
+def _reply_keyboard(*texts: str) -> ReplyKeyboardMarkup:
+    return ReplyKeyboardMarkup(
+        keyboard=[[KeyboardButton(text=text)] for text in texts],
+        resize_keyboard=True
+    )
+
+
+def _inline_keyboard(*rows: list[Button]) -> InlineKeyboardMarkup:
+    return InlineKeyboardMarkup(inline_keyboard=list(rows))
+
+
+# Клавиатуры ниже собираются один раз при импорте и разделяются между всеми
+# сообщениями — изменять их нельзя.
+
+# Главное меню: (можно оформить заказ, есть активные заявки) -> клавиатура
+_MAIN_MENUS = {
+    (can_order, has_active): _reply_keyboard(
+        *([BTN_NEW_ORDER] if can_order else []),
+        BTN_DIRECT_MESSAGE,
+        BTN_EDIT_DATA,
+        *([BTN_CANCEL_ORDER] if has_active else []),
+    )
+    for can_order in (True, False)
+    for has_active in (True, False)
+}
+
+EDIT_DATA_MENU = _reply_keyboard(
+    BTN_EDIT_PHONE, BTN_EDIT_ADDRESS, BTN_EDIT_NAME, BTN_EDIT_ORGANIZATION, BTN_EDIT_BACK
+)
+
+ORDER_CONFIRM = _inline_keyboard([
+    Button(text="✅ Подтвердить", callback_data="confirm_order"),
+    Button(text="❌ Отмена", callback_data="cancel_order"),
+])
+
+DIRECT_MESSAGE_CANCEL = _inline_keyboard([Button(text="Отмена", callback_data="cancel_direct_message")])
+
+EMPTY_INLINE = _inline_keyboard()
+
+START_WORK = _inline_keyboard([Button(text="🚀 Старт", callback_data="start_work")])
+
+ADMIN_MAIN = _inline_keyboard(
+    [Button(text="Добавить заявку", callback_data="admin_add_order")],
+    [Button(text="Активные заявки", callback_data="admin_orders_active")],
+    [Button(text="Исполненные заявки", callback_data="admin_orders_done")],
+    [Button(text="Помощь", callback_data="admin_help")],
+)
+
+# Общая кнопка: клавиатура «назад» и последняя строка страниц списков заявок
+BACK_TO_MENU_BUTTON = Button(text="↩ Назад в меню", callback_data="admin_back")
+
+ADMIN_BACK_TO_MAIN = _inline_keyboard([BACK_TO_MENU_BUTTON])
+
+ADMIN_ORDERS_LIST = _inline_keyboard([Button(text="Список заявок", callback_data="admin_orders_active")])
+
+ADMIN_BACK_TO_ACTIVE = _inline_keyboard([Button(text="↩ Назад к активным", callback_data="admin_orders_active")])
+
+
+def main_menu_markup(can_order: bool, has_active: bool) -> ReplyKeyboardMarkup:
+    return _MAIN_MENUS[can_order, has_active]
+
+
+# Для каждого статуса — статусы, на которые его можно сменить
+_STATUS_CHOICES = {
+    current: [(STATUS_LABELS[status], int(status)) for status in OrderStatus if status != current]
+    for current in OrderStatus
+}
+
+
+@lru_cache(maxsize=1024)
+def order_detail_markup(order_id: int, status: int) -> InlineKeyboardMarkup:
+    """
+    Кнопки смены статуса и управления заявкой (по две в ряд).
+    """
+    buttons = [
+        Button(text=label, callback_data=f"set_status_{order_id}_{code}")
+        for label, code in _STATUS_CHOICES.get(status, [])
+    ]
+    buttons.append(Button(text="🗑 Удалить", callback_data=f"confirm_delete_{order_id}"))
+    buttons.append(Button(text="↩ К списку", callback_data="admin_orders_active"))
+    return _inline_keyboard(*(buttons[i:i + 2] for i in range(0, len(buttons), 2)))
+
+
+def confirm_delete_markup(order_id: int) -> InlineKeyboardMarkup:
+    return _inline_keyboard([
+        Button(text="✅ Да, удалить", callback_data=f"delete_order_{order_id}"),
+        Button(text="❌ Отмена", callback_data=f"order_detail_{order_id}"),
+    ])
@@ -7,8 +7,10 @@ from main import create_dispatcher, setup_logger
 from db import init_db
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from handlers.admin import cleanup_old_orders
+from notifications import admin_notifier, status_notifier
+from webhook import run_webhook
 
-from config import CLEANUP_HOUR, CLEANUP_MINUTE, CLEANUP_TIMEZONE
+from config import CLEANUP_HOUR, CLEANUP_MINUTE, CLEANUP_TIMEZONE, BOT_MODE
 
 
 async def main() -> None:
@@ -17,13 +19,11 @@ async def main() -> None:
     1. Настраивает логирование.
     2. Инициализирует базу данных.
     3. Запускает планировщик задач (чистка старых заявок).
-    4. Запускает бота в режиме long polling.
+    4. Запускает бота в режиме long polling или webhook (BOT_MODE).
     """
     setup_logger()
     dp, bot = create_dispatcher()
 
-    await bot.delete_webhook(drop_pending_updates=True)
-
     try:
         await init_db()
         logging.info("Database initialized successfully.")
@@ -48,7 +48,11 @@ async def main() -> None:
             f"({CLEANUP_TIMEZONE}) daily."
         )
 
-        await dp.start_polling(bot)
+        if BOT_MODE == "webhook":
+            await run_webhook(dp, bot)
+        else:
+            await bot.delete_webhook(drop_pending_updates=True)
+            await dp.start_polling(bot)
 
     except Exception as e:
         logging.error(f"Error in bot polling or scheduler: {e}")
@@ -56,6 +60,10 @@ async def main() -> None:
     finally:
         scheduler.shutdown()
         logging.info("Scheduler shut down.")
+        await admin_notifier.close()
+        await status_notifier.close()
+        await dp.storage.close()
+        await bot.session.close()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,50 @@
+# search.py
+import re
+
+from sqlalchemy import text
+
+from db import async_read_sessionmaker
+
+SEARCH_PAGE_SIZE = 10
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+# users_fts — внешний FTS5-индекс по анкетам пользователей (см. migrations.create_users_fts)
+_SEARCH_SQL = text(
+    "SELECT o.id, o.status, u.name, u.phone "
+    "FROM users_fts "
+    "JOIN users u ON u.id = users_fts.rowid "
+    "JOIN orders o ON o.user_id = u.id "
+    "WHERE users_fts MATCH :match "
+    "ORDER BY bm25(users_fts), o.id DESC "
+    "LIMIT :limit OFFSET :offset"
+)
+
+
+def build_match_query(query: str) -> str | None:
+    """
+    Превращает пользовательский ввод в безопасное выражение FTS5:
+    каждое слово ищется по префиксу, все слова должны совпасть.
+    """
+    tokens = _TOKEN_RE.findall(query)
+    if not tokens:
+        return None
+    return " ".join(f'"{token}"*' for token in tokens)
+
+
+async def search_orders(query: str, page: int = 0, per_page: int = SEARCH_PAGE_SIZE):
+    """
+    Заявки пользователей, чьи имя, телефон, адрес или организация совпали с запросом,
+    по релевантности. Возвращает (строки страницы, есть ли следующая страница).
+    """
+    match = build_match_query(query)
+    if match is None:
+        return [], False
+
+    async with async_read_sessionmaker() as session:
+        result = await session.execute(
+            _SEARCH_SQL,
+            {"match": match, "limit": per_page + 1, "offset": page * per_page}
+        )
+        rows = result.all()
+    return rows[:per_page], len(rows) > per_page
@@ -0,0 +1,38 @@
+# statuses.py
+from enum import IntEnum
+
+
+class OrderStatus(IntEnum):
+    """
+    Коды статусов заявки (хранятся в orders.status как SMALLINT).
+    Все коды меньше DONE — активные заявки, от DONE и выше — завершённые,
+    поэтому активные заявки выбираются диапазоном status < DONE.
+    """
+
+    NEW_FROM_USER = 1
+    NEW_FROM_ADMIN = 2
+    IN_PROGRESS = 3
+    DONE = 10
+
+
+STATUS_LABELS = {
+    OrderStatus.NEW_FROM_USER: "Новая (От пользователя)",
+    OrderStatus.NEW_FROM_ADMIN: "Новая (От Админа)",
+    OrderStatus.IN_PROGRESS: "В работе",
+    OrderStatus.DONE: "Исполнено",
+}
+
+STATUS_ICONS = {
+    OrderStatus.NEW_FROM_USER: "🟡",
+    OrderStatus.NEW_FROM_ADMIN: "🟠",
+    OrderStatus.IN_PROGRESS: "🟢",
+    OrderStatus.DONE: "🔵",
+}
+
+
+def status_label(code: int) -> str:
+    return STATUS_LABELS.get(code, f"Статус {code}")
+
+
+def is_active(code: int) -> bool:
+    return code < OrderStatus.DONE
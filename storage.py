@@ -0,0 +1,89 @@
+# storage.py
+from typing import Any, Dict, Optional
+
+from aiogram.fsm.storage.base import BaseStorage, DefaultKeyBuilder, StorageKey
+from aiogram.fsm.storage.memory import MemoryStorage
+from aiogram.fsm.storage.redis import RedisStorage
+from redis.asyncio.client import Redis
+
+from config import (
+    FSM_STORAGE, REDIS_URL, FSM_KEY_PREFIX, FSM_STATE_TTL, FSM_DATA_TTL
+)
+
+
+class PipelinedRedisStorage(RedisStorage):
+    """
+    Redis-хранилище FSM, в котором данные лежат в hash (поле -> JSON).
+    Благодаря этому get/update/set данных выполняются одним pipeline,
+    то есть за один round-trip до Redis, а TTL продлевается в том же запросе.
+    """
+
+    def _dump(self, data: Dict[str, Any]) -> Dict[str, str]:
+        return {field: self.json_dumps(value) for field, value in data.items()}
+
+    def _load(self, raw: Dict[Any, Any]) -> Dict[str, Any]:
+        data = {}
+        for field, value in raw.items():
+            if isinstance(field, bytes):
+                field = field.decode("utf-8")
+            if isinstance(value, bytes):
+                value = value.decode("utf-8")
+            data[field] = self.json_loads(value)
+        return data
+
+    async def set_data(self, key: StorageKey, data: Dict[str, Any]) -> None:
+        redis_key = self.key_builder.build(key, "data")
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.delete(redis_key)
+            if data:
+                pipe.hset(redis_key, mapping=self._dump(data))
+                if self.data_ttl:
+                    pipe.expire(redis_key, self.data_ttl)
+            await pipe.execute()
+
+    async def get_data(self, key: StorageKey) -> Dict[str, Any]:
+        redis_key = self.key_builder.build(key, "data")
+        return self._load(await self.redis.hgetall(redis_key))
+
+    async def get_value(
+        self, storage_key: StorageKey, dict_key: str, default: Optional[Any] = None
+    ) -> Optional[Any]:
+        redis_key = self.key_builder.build(storage_key, "data")
+        value = await self.redis.hget(redis_key, dict_key)
+        if value is None:
+            return default
+        if isinstance(value, bytes):
+            value = value.decode("utf-8")
+        return self.json_loads(value)
+
+    async def update_data(self, key: StorageKey, data: Dict[str, Any]) -> Dict[str, Any]:
+        redis_key = self.key_builder.build(key, "data")
+        if not data:
+            return await self.get_data(key)
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.hset(redis_key, mapping=self._dump(data))
+            if self.data_ttl:
+                pipe.expire(redis_key, self.data_ttl)
+            pipe.hgetall(redis_key)
+            results = await pipe.execute()
+        return self._load(results[-1])
+
+
+def create_storage(redis: Optional[Redis] = None) -> BaseStorage:
+    """
+    Создаёт хранилище FSM согласно настройке FSM_STORAGE.
+    Можно передать готовый клиент Redis (например, fakeredis) —
+    тогда будет использовано Redis-хранилище независимо от настроек.
+    """
+    if redis is None and FSM_STORAGE != "redis":
+        return MemoryStorage()
+
+    if redis is None:
+        redis = Redis.from_url(REDIS_URL)
+
+    return PipelinedRedisStorage(
+        redis=redis,
+        key_builder=DefaultKeyBuilder(prefix=FSM_KEY_PREFIX, with_bot_id=True),
+        state_ttl=FSM_STATE_TTL or None,
+        data_ttl=FSM_DATA_TTL or None,
+    )
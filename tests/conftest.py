@@ -0,0 +1,90 @@
+# conftest.py
+"""
+Общие фикстуры тестов. Окружение (временная SQLite, тестовый токен, снятые
+лимиты) задаётся до импорта модулей бота, как в бенчмарках.
+Асинхронные тесты выполняются в одном цикле событий на всю сессию:
+движки БД, диспетчер и уведомители создаются один раз на процесс.
+
+Зависимости тестов (pytest, fakeredis): pip install -r requirements-dev.txt
+"""
+import asyncio
+import inspect
+
+import pytest
+
+from benchmarks import _env
+
+_tmp = _env.setup("tests", unthrottled=True)
+
+from sqlalchemy import delete  # noqa: E402
+
+from cache import order_cache, user_cache  # noqa: E402
+from db import engine, init_db, read_engine, Order, User  # noqa: E402
+
+_loop = asyncio.new_event_loop()
+
+
+def run(coro):
+    """
+    Выполняет корутину в общем цикле событий тестов.
+    """
+    return _loop.run_until_complete(coro)
+
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_pyfunc_call(pyfuncitem):
+    if not inspect.iscoroutinefunction(pyfuncitem.obj):
+        return None
+    funcargs = {name: pyfuncitem.funcargs[name] for name in pyfuncitem._fixtureinfo.argnames}
+    run(pyfuncitem.obj(**funcargs))
+    return True
+
+
+def pytest_sessionfinish(session, exitstatus):
+    run(engine.dispose())
+    if read_engine is not engine:
+        run(read_engine.dispose())
+    _loop.close()
+
+
+@pytest.fixture(scope="session")
+def schema():
+    run(init_db())
+
+
+@pytest.fixture
+def db(schema):
+    """
+    Пустая база с применёнными миграциями и пустые кеши. Строки удаляются
+    целиком, поэтому SQLite снова выдаёт id с 1.
+    """
+    async def clean():
+        async with engine.begin() as conn:
+            await conn.execute(delete(Order))
+            await conn.execute(delete(User))
+
+    run(clean())
+    user_cache.clear()
+    order_cache.clear()
+    return engine
+
+
+@pytest.fixture(scope="session")
+def dispatcher(schema):
+    """
+    Настоящий диспетчер (main.create_dispatcher) с фейковым Bot API.
+    Роутеры подключаются к диспетчеру один раз, поэтому он общий на сессию.
+    Последние запросы к Bot API лежат в bot.session.sent.
+    """
+    from benchmarks.fake_bot import FakeTelegramSession
+    from main import create_dispatcher
+    from notifications import admin_notifier, status_notifier
+
+    dp, bot = create_dispatcher()
+    session = FakeTelegramSession(keep_sent=50)
+    session.middleware = bot.session.middleware
+    bot.session = session
+    yield dp, bot
+    run(admin_notifier.close())
+    run(status_notifier.close())
+    run(dp.storage.close())
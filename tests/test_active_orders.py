@@ -0,0 +1,150 @@
+# test_active_orders.py
+"""
+Лимит активных заявок держится на счётчике users.active_orders: оформление
+занимает слот условным UPDATE … WHERE active_orders < 3 RETURNING, а отмена,
+удаление и перевод в «Исполнено» его освобождают (удаление — триггером).
+После каждого сценария счётчик сверяется с фактическим числом заявок.
+"""
+import asyncio
+
+from sqlalchemy import func, insert, select
+
+from benchmarks.fake_bot import UpdateFactory
+from db import Order, User
+from handlers.order import MAX_ACTIVE_ORDERS
+from states import OrderStates
+from statuses import OrderStatus
+
+ADMIN_ID = 1
+
+updates = UpdateFactory()
+
+
+async def add_user(db, telegram_id: int) -> int:
+    async with db.begin() as conn:
+        return await conn.scalar(
+            insert(User)
+            .values(telegram_id=telegram_id, name="Тест", phone="+70000000000", address="ул. Тестовая")
+            .returning(User.id)
+        )
+
+
+async def counters(db, telegram_id: int) -> tuple[int, int]:
+    """
+    (значение счётчика, фактическое число активных заявок) пользователя.
+    """
+    async with db.connect() as conn:
+        stored = await conn.scalar(select(User.active_orders).where(User.telegram_id == telegram_id))
+        actual = await conn.scalar(
+            select(func.count())
+            .select_from(Order)
+            .join(User)
+            .where(User.telegram_id == telegram_id, Order.status < OrderStatus.DONE)
+        )
+    return stored, actual
+
+
+async def order_ids(db, telegram_id: int) -> list[int]:
+    async with db.connect() as conn:
+        result = await conn.scalars(
+            select(Order.id).join(User).where(User.telegram_id == telegram_id).order_by(Order.id)
+        )
+        return list(result)
+
+
+async def place_order(dp, bot, telegram_id: int) -> None:
+    await dp.feed_update(bot, updates.message(telegram_id, "🛒 Оформить заказ"))
+    await dp.feed_update(bot, updates.callback(telegram_id, "confirm_order"))
+
+
+def last_texts(bot, count: int) -> list[str]:
+    return [getattr(method, "text", None) for method in bot.session.sent[-count:]]
+
+
+async def test_double_confirm_creates_one_order(db, dispatcher):
+    dp, bot = dispatcher
+    user_id = 20_001
+    await add_user(db, user_id)
+
+    await dp.feed_update(bot, updates.message(user_id, "🛒 Оформить заказ"))
+    await asyncio.gather(*(
+        dp.feed_update(bot, updates.callback(user_id, "confirm_order")) for _ in range(2)
+    ))
+
+    assert len(await order_ids(db, user_id)) == 1
+    assert await counters(db, user_id) == (1, 1)
+
+
+async def test_fourth_order_is_refused(db, dispatcher):
+    dp, bot = dispatcher
+    user_id = 20_002
+    await add_user(db, user_id)
+    for _ in range(MAX_ACTIVE_ORDERS):
+        await place_order(dp, bot, user_id)
+    assert await counters(db, user_id) == (MAX_ACTIVE_ORDERS, MAX_ACTIVE_ORDERS)
+
+    await place_order(dp, bot, user_id)
+    assert len(await order_ids(db, user_id)) == MAX_ACTIVE_ORDERS
+    assert await counters(db, user_id) == (MAX_ACTIVE_ORDERS, MAX_ACTIVE_ORDERS)
+    assert last_texts(bot, 2)[0].startswith("❌ У вас уже 3 активные заявки")
+
+    # После исполнения одной заявки слот снова свободен
+    first = (await order_ids(db, user_id))[0]
+    await dp.feed_update(bot, updates.callback(ADMIN_ID, f"set_status_{first}_{int(OrderStatus.DONE)}"))
+    await place_order(dp, bot, user_id)
+    assert len(await order_ids(db, user_id)) == MAX_ACTIVE_ORDERS + 1
+    assert await counters(db, user_id) == (MAX_ACTIVE_ORDERS, MAX_ACTIVE_ORDERS)
+
+
+async def test_stale_confirm_from_another_worker_is_refused_by_counter(db, dispatcher):
+    dp, bot = dispatcher
+    user_id = 20_003
+    await add_user(db, user_id)
+    for _ in range(MAX_ACTIVE_ORDERS - 1):
+        await place_order(dp, bot, user_id)
+
+    # Два подтверждения из одного состояния — как если бы два процесса бота
+    # прочитали состояние до того, как первый его сбросил
+    state = dp.fsm.get_context(bot, chat_id=user_id, user_id=user_id)
+    await dp.feed_update(bot, updates.message(user_id, "🛒 Оформить заказ"))
+    await dp.feed_update(bot, updates.callback(user_id, "confirm_order"))
+    await state.set_state(OrderStates.confirm_order)
+    await dp.feed_update(bot, updates.callback(user_id, "confirm_order"))
+
+    assert len(await order_ids(db, user_id)) == MAX_ACTIVE_ORDERS
+    assert await counters(db, user_id) == (MAX_ACTIVE_ORDERS, MAX_ACTIVE_ORDERS)
+    assert await state.get_state() is None
+
+
+async def test_counter_follows_cancel_delete_and_status_changes(db, dispatcher):
+    dp, bot = dispatcher
+    user_id = 20_004
+    await add_user(db, user_id)
+    for _ in range(MAX_ACTIVE_ORDERS):
+        await place_order(dp, bot, user_id)
+    first, second, third = await order_ids(db, user_id)
+
+    # Отмена пользователем конкретной заявки
+    await dp.feed_update(bot, updates.callback(user_id, f"cancel_specific_{first}"))
+    assert await counters(db, user_id) == (2, 2)
+
+    # Исполнено -> снова активна -> исполнено
+    done, active = int(OrderStatus.DONE), int(OrderStatus.IN_PROGRESS)
+    await dp.feed_update(bot, updates.callback(ADMIN_ID, f"set_status_{second}_{done}"))
+    assert await counters(db, user_id) == (1, 1)
+    await dp.feed_update(bot, updates.callback(ADMIN_ID, f"set_status_{second}_{active}"))
+    assert await counters(db, user_id) == (2, 2)
+    await dp.feed_update(bot, updates.callback(ADMIN_ID, f"set_status_{second}_{done}"))
+    assert await counters(db, user_id) == (1, 1)
+
+    # Удаление исполненной заявки счётчик не трогает, активной — уменьшает
+    await dp.feed_update(bot, updates.callback(ADMIN_ID, f"delete_order_{second}"))
+    assert await counters(db, user_id) == (1, 1)
+    await dp.feed_update(bot, updates.callback(ADMIN_ID, f"delete_order_{third}"))
+    assert await counters(db, user_id) == (0, 0)
+
+    # Отмена без id при единственной активной заявке
+    await place_order(dp, bot, user_id)
+    await dp.feed_update(bot, updates.message(user_id, "❌ Отменить заказ"))
+    assert await order_ids(db, user_id) == []
+    assert await counters(db, user_id) == (0, 0)
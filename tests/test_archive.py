@@ -0,0 +1,86 @@
+# test_archive.py
+"""
+Архив исполненных заявок: запись в gzip-сегменты по месяцам и поиск
+find_order по сортированному индексу, в том числе когда id приходят
+не по порядку и когда индекс остался в прежнем текстовом формате.
+"""
+import gzip
+import json
+import os
+from datetime import datetime
+
+import pytest
+
+from archive import _INDEX_RECORD, find_order, write_orders
+from db import Order, User
+from statuses import OrderStatus
+
+
+def make_order(order_id: int, completed_at: datetime) -> Order:
+    user = User(id=order_id % 7 + 1, telegram_id=1000 + order_id, name=f"Клиент {order_id}",
+                phone="+70000000000", address="ул. Тестовая")
+    return Order(
+        id=order_id, user_id=user.id, user=user, status=OrderStatus.DONE,
+        created_at=completed_at, completed_at=completed_at, preferred_time="Сегодня",
+    )
+
+
+def read_index(path: str) -> list[int]:
+    with open(path, "rb") as f:
+        return [order_id for order_id, _ in _INDEX_RECORD.iter_unpack(f.read())]
+
+
+@pytest.fixture
+def archive_dir(tmp_path):
+    return str(tmp_path / "archive")
+
+
+def test_round_trip_over_gzip_members(archive_dir):
+    january, february = datetime(2024, 1, 15), datetime(2024, 2, 3)
+    # Несколько порций = несколько gzip-member в одном сегменте
+    assert write_orders([make_order(i, january) for i in range(1, 51)], archive_dir) == 50
+    assert write_orders([make_order(i, january) for i in range(51, 101)], archive_dir) == 50
+    assert write_orders([make_order(i, february) for i in range(101, 111)], archive_dir) == 10
+
+    for order_id in (1, 50, 51, 77, 100, 101, 110):
+        record = find_order(order_id, archive_dir)
+        assert record["id"] == order_id
+        assert record["user"]["name"] == f"Клиент {order_id}"
+        assert record["status"] == "Исполнено"
+    assert find_order(0, archive_dir) is None
+    assert find_order(111, archive_dir) is None
+
+    # Сегмент остаётся обычным gzip-файлом со всеми записями по порядку
+    with gzip.open(os.path.join(archive_dir, "orders-2024-01.jsonl.gz"), "rt", encoding="utf-8") as f:
+        assert [json.loads(line)["id"] for line in f] == list(range(1, 101))
+
+
+def test_index_stays_sorted_when_ids_arrive_out_of_order(archive_dir):
+    month = datetime(2024, 3, 1)
+    write_orders([make_order(i, month) for i in (10, 20, 30)], archive_dir)
+    # Заявка с меньшим id, исполненная позже, и повторная архивация 20
+    write_orders([make_order(i, month) for i in (25, 5, 20)], archive_dir)
+
+    assert read_index(os.path.join(archive_dir, "orders-2024-03.index")) == [5, 10, 20, 20, 25, 30]
+    for order_id in (5, 10, 20, 25, 30):
+        assert find_order(order_id, archive_dir)["id"] == order_id
+    assert find_order(15, archive_dir) is None
+
+
+def test_missing_directory(tmp_path):
+    assert find_order(1, str(tmp_path / "absent")) is None
+
+
+def test_legacy_text_index_is_converted(archive_dir):
+    month = datetime(2024, 4, 1)
+    write_orders([make_order(i, month) for i in (3, 1, 2)], archive_dir)
+    index_path = os.path.join(archive_dir, "orders-2024-04.index")
+    with open(index_path, "rb") as f:
+        entries = list(_INDEX_RECORD.iter_unpack(f.read()))
+    os.remove(index_path)
+    with open(os.path.join(archive_dir, "orders-2024-04.idx"), "w", encoding="utf-8") as f:
+        f.writelines(f"{order_id}\t{offset}\n" for order_id, offset in entries)
+
+    assert find_order(2, archive_dir)["id"] == 2
+    assert not os.path.exists(os.path.join(archive_dir, "orders-2024-04.idx"))
+    assert read_index(index_path) == [1, 2, 3]
@@ -0,0 +1,96 @@
+# test_cache.py
+"""
+AsyncTTLCache: объединение одновременных промахов в одну загрузку,
+проброс ошибок и отмена загрузки, на которую ждут другие вызовы.
+"""
+import asyncio
+
+import pytest
+
+from cache import AsyncTTLCache
+
+
+async def test_concurrent_misses_share_one_load():
+    cache = AsyncTTLCache("test")
+    calls = 0
+    release = asyncio.Event()
+
+    async def loader():
+        nonlocal calls
+        calls += 1
+        await release.wait()
+        return "value"
+
+    first = asyncio.create_task(cache.get_or_load(1, loader))
+    second = asyncio.create_task(cache.get_or_load(1, loader))
+    await asyncio.sleep(0)
+    release.set()
+    assert await asyncio.gather(first, second) == ["value", "value"]
+    assert calls == 1
+    assert await cache.get_or_load(1, loader) == "value"
+    assert calls == 1
+
+
+async def test_loader_error_reaches_waiters_and_is_not_cached():
+    cache = AsyncTTLCache("test")
+    release = asyncio.Event()
+
+    async def failing():
+        await release.wait()
+        raise RuntimeError("db down")
+
+    first = asyncio.create_task(cache.get_or_load(1, failing))
+    second = asyncio.create_task(cache.get_or_load(1, failing))
+    await asyncio.sleep(0)
+    release.set()
+    results = await asyncio.gather(first, second, return_exceptions=True)
+    assert all(isinstance(r, RuntimeError) for r in results)
+
+    async def ok():
+        return "value"
+
+    assert await cache.get_or_load(1, ok) == "value"
+
+
+async def test_cancelled_loader_does_not_hang_waiters():
+    cache = AsyncTTLCache("test")
+    started = asyncio.Event()
+
+    async def stuck():
+        started.set()
+        await asyncio.Event().wait()
+
+    async def ok():
+        return "value"
+
+    loader_task = asyncio.create_task(cache.get_or_load(1, stuck))
+    await started.wait()
+    waiter = asyncio.create_task(cache.get_or_load(1, ok))
+    await asyncio.sleep(0)
+
+    loader_task.cancel()
+    # Ожидающий не отменён: он сам повторяет загрузку, а не висит
+    assert await asyncio.wait_for(waiter, timeout=1) == "value"
+    with pytest.raises(asyncio.CancelledError):
+        await loader_task
+    assert not cache._loading
+
+
+async def test_cancelled_waiter_does_not_cancel_shared_load():
+    cache = AsyncTTLCache("test")
+    release = asyncio.Event()
+
+    async def loader():
+        await release.wait()
+        return "value"
+
+    first = asyncio.create_task(cache.get_or_load(1, loader))
+    await asyncio.sleep(0)
+    waiter = asyncio.create_task(cache.get_or_load(1, loader))
+    await asyncio.sleep(0)
+
+    waiter.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await waiter
+    release.set()
+    assert await first == "value"
@@ -0,0 +1,149 @@
+# test_cleanup.py
+"""
+Очистка исполненных заявок старше суток (cleanup_old_orders): порции по
+batch_size, ограничение по времени, dry run и порядок «сначала архив, потом
+удаление» — при сбое записи архива ничего не удаляется.
+"""
+import functools
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import insert, select
+
+import archive
+import handlers.admin
+from db import Order, User
+from handlers.admin import cleanup_old_orders
+from statuses import OrderStatus
+
+EXPIRED = 25
+
+
+async def seed(db) -> None:
+    """
+    EXPIRED исполненных заявок старше суток, а также свежая исполненная
+    и активная — их очистка не трогает.
+    """
+    old = datetime.utcnow() - timedelta(days=2)
+    async with db.begin() as conn:
+        user_id = await conn.scalar(
+            insert(User)
+            .values(telegram_id=50_000, name="Иван", phone="+70000000000", address="ул. Тестовая")
+            .returning(User.id)
+        )
+        await conn.execute(insert(Order), [
+            {"user_id": user_id, "status": OrderStatus.DONE, "completed_at": old} for _ in range(EXPIRED)
+        ] + [
+            {"user_id": user_id, "status": OrderStatus.DONE, "completed_at": datetime.utcnow()},
+            {"user_id": user_id, "status": OrderStatus.IN_PROGRESS, "completed_at": None},
+        ])
+
+
+async def remaining(db) -> int:
+    async with db.connect() as conn:
+        return len((await conn.scalars(select(Order.id))).all())
+
+
+@pytest.fixture
+def archived(monkeypatch, tmp_path):
+    """
+    Архив во временном каталоге; в списке — id заявок каждой записанной порции.
+    """
+    batches: list[list[int]] = []
+    write = functools.partial(archive.archive_orders, directory=str(tmp_path))
+
+    async def archive_orders(orders):
+        batches.append([o.id for o in orders])
+        return await write(orders)
+
+    monkeypatch.setattr(handlers.admin, "archive_orders", archive_orders)
+    monkeypatch.setattr(handlers.admin, "ARCHIVE_ENABLED", True)
+    monkeypatch.setattr(handlers.admin, "CLEANUP_BATCH_PAUSE", 0)
+    return SimpleNamespace(batches=batches, directory=str(tmp_path))
+
+
+async def test_expired_orders_are_archived_and_deleted_in_batches(db, archived):
+    await seed(db)
+    report = await cleanup_old_orders(batch_size=10)
+
+    assert (report.removed, report.batches, report.finished) == (EXPIRED, 3, True)
+    assert [len(batch) for batch in archived.batches] == [10, 10, 5]
+    assert await remaining(db) == 2
+    for order_id in sum(archived.batches, []):
+        assert archive.find_order(order_id, archived.directory)["id"] == order_id
+
+
+async def test_dry_run_deletes_nothing(db, archived):
+    await seed(db)
+    report = await cleanup_old_orders(dry_run=True)
+
+    assert (report.removed, report.dry_run) == (EXPIRED, True)
+    assert archived.batches == []
+    assert await remaining(db) == EXPIRED + 2
+
+
+async def test_failed_archive_write_deletes_nothing(db, archived, monkeypatch):
+    await seed(db)
+    calls = 0
+
+    async def failing(orders):
+        nonlocal calls
+        calls += 1
+        if calls == 2:
+            raise OSError("disk full")
+        archived.batches.append([o.id for o in orders])
+
+    monkeypatch.setattr(handlers.admin, "archive_orders", failing)
+    assert await cleanup_old_orders(batch_size=10) is None
+
+    # Первая порция в архиве и удалена, вторая не записана — осталась в базе
+    assert [len(batch) for batch in archived.batches] == [10]
+    assert await remaining(db) == EXPIRED + 2 - 10
+
+
+async def test_archive_is_written_before_delete(db, archived, monkeypatch):
+    await seed(db)
+    present_while_archiving = []
+
+    async def archive_orders(orders):
+        async with db.connect() as conn:
+            ids = set((await conn.scalars(select(Order.id))).all())
+        present_while_archiving.append(all(o.id in ids for o in orders))
+
+    monkeypatch.setattr(handlers.admin, "archive_orders", archive_orders)
+    await cleanup_old_orders(batch_size=10)
+    assert present_while_archiving == [True, True, True]
+
+
+async def test_time_budget_stops_between_batches(db, archived, monkeypatch):
+    await seed(db)
+    # Каждая порция «длится» секунду
+    clock = SimpleNamespace(now=0.0)
+    monkeypatch.setattr(handlers.admin, "monotonic", lambda: clock.now)
+    delete_batch = handlers.admin.delete_expired_batch
+
+    async def slow_batch(expired, batch_size):
+        clock.now += 1
+        return await delete_batch(expired, batch_size)
+
+    monkeypatch.setattr(handlers.admin, "delete_expired_batch", slow_batch)
+    report = await cleanup_old_orders(batch_size=5, time_budget=2.5)
+
+    assert (report.removed, report.batches, report.finished) == (15, 3, False)
+    assert await remaining(db) == EXPIRED + 2 - 15
+
+    # Следующий запуск дочищает остаток
+    report = await cleanup_old_orders(batch_size=5, time_budget=100)
+    assert (report.removed, report.finished) == (EXPIRED - 15, True)
+    assert await remaining(db) == 2
+
+
+async def test_without_archive(db, archived, monkeypatch):
+    await seed(db)
+    monkeypatch.setattr(handlers.admin, "ARCHIVE_ENABLED", False)
+    report = await cleanup_old_orders(batch_size=10)
+
+    assert (report.removed, report.batches) == (EXPIRED, 3)
+    assert archived.batches == []
+    assert await remaining(db) == 2
@@ -0,0 +1,74 @@
+# test_db_roundtrips.py
+"""
+Число соединений из пула и SQL-запросов на одно обновление не должно превышать
+бюджет. Через настоящий диспетчер проходят регистрация, оформление, изменение
+данных, отмена заявок и действия администратора; Bot API заменён benchmarks.fake_bot.
+"""
+from sqlalchemy import select
+
+from benchmarks.fake_bot import QueryCounter, UpdateFactory
+from db import read_engine, Order, User
+from statuses import OrderStatus
+
+ADMIN_ID = 1
+USER_ID = 10_000
+OTHER_USER_ID = 10_001
+
+
+def scenario(updates: UpdateFactory) -> list[tuple[str, object, int, int]]:
+    """
+    Шаги в порядке выполнения: (название, обновление, макс. соединений, макс. запросов).
+    id заявок — как их выдаст SQLite: rowid удалённой последней строки используется снова.
+    """
+    user = USER_ID
+    return [
+        ("/start", updates.message(user, "/start"), 1, 1),
+        ("start_work", updates.callback(user, "start_work"), 0, 0),
+        ("reg: name", updates.message(user, "Иван Тестов"), 0, 0),
+        ("reg: phone", updates.message(user, "+79990000000"), 0, 0),
+        ("reg: address", updates.message(user, "ул. Тестовая, д. 1"), 0, 0),
+        ("reg: organization", updates.message(user, "Нет"), 1, 1),
+        ("order menu", updates.message(user, "🛒 Оформить заказ"), 1, 1),
+        ("confirm order", updates.callback(user, "confirm_order"), 1, 2),
+        ("edit data menu", updates.message(user, "✏️ Изменить данные"), 0, 0),
+        ("edit phone", updates.message(user, "📞 Изменить телефон"), 0, 0),
+        ("new phone", updates.message(user, "+79991111111"), 1, 1),
+        ("cancel single", updates.message(user, "❌ Отменить заказ"), 1, 1),
+        ("order menu", updates.message(user, "🛒 Оформить заказ"), 1, 1),
+        ("confirm order", updates.callback(user, "confirm_order"), 1, 2),
+        ("order menu", updates.message(user, "🛒 Оформить заказ"), 1, 1),
+        ("confirm order", updates.callback(user, "confirm_order"), 1, 2),
+        ("cancel: choose", updates.message(user, "❌ Отменить заказ"), 1, 2),
+        # Чужая заявка: DELETE не находит строку, счётчик не трогается
+        ("cancel foreign #2", updates.callback(OTHER_USER_ID, "cancel_specific_2"), 1, 1),
+        ("cancel #2", updates.callback(user, "cancel_specific_2"), 1, 1),
+        ("admin: status #1", updates.callback(ADMIN_ID, "set_status_1_10"), 1, 4),
+        ("order menu", updates.message(user, "🛒 Оформить заказ"), 1, 1),
+        ("confirm order", updates.callback(user, "confirm_order"), 1, 2),
+        # После удаления список заявок перечитывается отдельной (читающей) сессией
+        ("admin: delete #2", updates.callback(ADMIN_ID, "delete_order_2"), 2, 2),
+    ]
+
+
+async def test_updates_stay_within_db_budget(db, dispatcher):
+    dp, bot = dispatcher
+    counter = QueryCounter(db, read_engine)
+
+    over_budget = []
+    for name, update, max_connections, max_queries in scenario(UpdateFactory()):
+        connections, queries = counter.connections, counter.count
+        await dp.feed_update(bot, update)
+        connections = counter.connections - connections
+        queries = counter.count - queries
+        if connections > max_connections or queries > max_queries:
+            over_budget.append(
+                f"{name}: {connections} connections (max {max_connections}), {queries} queries (max {max_queries})"
+            )
+    assert not over_budget, "\n".join(over_budget)
+
+    # Сценарий действительно прошёл: #2 удалена админом, #1 исполнена, активных нет
+    async with db.connect() as conn:
+        rows = (await conn.execute(
+            select(Order.id, Order.status, User.active_orders).join(User).where(User.telegram_id == USER_ID)
+        )).all()
+    assert rows == [(1, OrderStatus.DONE, 0)]
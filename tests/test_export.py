@@ -0,0 +1,105 @@
+# test_export.py
+"""
+/export: разбиение выгрузки на zip-части по part_rows, подписи частей
+и отказ отправлять файл больше лимита Bot API на загрузку.
+"""
+import csv
+import functools
+import io
+import os
+import zipfile
+
+import pytest
+from sqlalchemy import insert
+
+import handlers.admin
+from benchmarks.fake_bot import UpdateFactory
+from db import Order, User
+from export import EXPORT_COLUMNS, write_orders_zip
+from statuses import OrderStatus
+
+ADMIN_ID = 1
+
+updates = UpdateFactory()
+
+
+async def add_orders(db, count: int) -> None:
+    async with db.begin() as conn:
+        user_id = await conn.scalar(
+            insert(User)
+            .values(telegram_id=30_000, name="Иван", phone="+70000000000", address="ул. Тестовая")
+            .returning(User.id)
+        )
+        if count:
+            await conn.execute(insert(Order), [
+                {"user_id": user_id, "status": OrderStatus.DONE if i % 2 else OrderStatus.NEW_FROM_USER}
+                for i in range(count)
+            ])
+
+
+def read_csv(path: str) -> list[list[str]]:
+    with zipfile.ZipFile(path) as archive:
+        (member,) = archive.namelist()
+        with archive.open(member) as f:
+            return list(csv.reader(io.TextIOWrapper(f, encoding="utf-8-sig", newline="")))
+
+
+@pytest.mark.parametrize("count, part_rows, parts", [
+    (25, 10, [10, 10, 5]),
+    (20, 10, [10, 10]),
+    (7, 10, [7]),
+    (0, 10, [0]),
+])
+async def test_parts_split_by_row_count(db, tmp_path, count, part_rows, parts):
+    await add_orders(db, count)
+    paths, rows = await write_orders_zip(str(tmp_path), "orders", part_rows=part_rows, chunk_size=4)
+
+    assert rows == count
+    if len(parts) == 1:
+        assert [os.path.basename(p) for p in paths] == ["orders.zip"]
+    else:
+        assert [os.path.basename(p) for p in paths] == [f"orders_part{i}.zip" for i in range(1, len(parts) + 1)]
+
+    ids = []
+    for path, expected in zip(paths, parts):
+        header, *lines = read_csv(path)
+        assert header == EXPORT_COLUMNS
+        assert len(lines) == expected
+        ids += [int(line[0]) for line in lines]
+    assert ids == sorted(ids) and len(set(ids)) == count
+
+
+async def test_status_filter(db, tmp_path):
+    await add_orders(db, 6)
+    (path,), rows = await write_orders_zip(str(tmp_path), "orders", status="active")
+    assert rows == 3
+    assert {line[1] for line in read_csv(path)[1:]} == {"Новая (От пользователя)"}
+
+
+def sent_documents(bot) -> list:
+    return [m for m in bot.session.sent if m.__api_method__ == "sendDocument"]
+
+
+async def test_export_sends_every_part_with_caption(db, dispatcher, monkeypatch):
+    dp, bot = dispatcher
+    await add_orders(db, 25)
+    monkeypatch.setattr(handlers.admin, "write_orders_zip", functools.partial(write_orders_zip, part_rows=10))
+    bot.session.sent.clear()
+
+    await dp.feed_update(bot, updates.message(ADMIN_ID, "/export"))
+
+    assert [m.caption for m in sent_documents(bot)] == [
+        f"📤 Выгружено заявок: 25 (часть {i} из 3)" for i in range(1, 4)
+    ]
+
+
+async def test_export_over_upload_limit_is_refused(db, dispatcher, monkeypatch):
+    dp, bot = dispatcher
+    await add_orders(db, 25)
+    monkeypatch.setattr(handlers.admin, "BOT_API_UPLOAD_LIMIT", 100)
+    bot.session.sent.clear()
+
+    await dp.feed_update(bot, updates.message(ADMIN_ID, "/export"))
+
+    assert sent_documents(bot) == []
+    assert bot.session.sent[-1].text.startswith("❌ Файл выгрузки orders_all_")
@@ -0,0 +1,143 @@
+# test_inactivity.py
+"""
+Сброс неактивных диалогов (InactivityMiddleware.sweep): порог timeout,
+повторная проверка активности под блокировкой очереди пользователя и общее
+хранилище активности в Redis для нескольких процессов и после перезапуска.
+"""
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from aiogram import Bot
+from aiogram.fsm.context import FSMContext
+from aiogram.fsm.storage.base import StorageKey
+from aiogram.fsm.storage.memory import MemoryStorage
+
+from benchmarks.fake_bot import FakeTelegramSession
+from lanes import UserLanes
+from middlewares import inactivity
+from middlewares.inactivity import (
+    InactivityMiddleware, MemoryActivityStore, RedisActivityStore, create_activity_store
+)
+from storage import create_storage
+
+TIMEOUT = 600
+NOW = 1_700_000_000.0
+
+KEY = StorageKey(bot_id=123456, chat_id=42, user_id=42)
+OTHER = StorageKey(bot_id=123456, chat_id=43, user_id=43)
+
+
+@pytest.fixture
+def bot():
+    return Bot(token="123456:test", session=FakeTelegramSession(keep_sent=10))
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """
+    Часы middlewares.inactivity: время обновлений задаётся через clock.now.
+    """
+    clock = SimpleNamespace(now=NOW)
+    monkeypatch.setattr(inactivity, "time", SimpleNamespace(time=lambda: clock.now))
+    return clock
+
+
+async def seen(middleware: InactivityMiddleware, storage, key: StorageKey) -> None:
+    """
+    Обновление от пользователя key: обработчик ставит состояние.
+    """
+    async def handler(event, data):
+        await data["state"].set_state("Form:name")
+
+    await middleware(handler, None, {"state": FSMContext(storage, key)})
+
+
+async def test_idle_dialog_is_reset_and_user_notified(db, bot, clock):
+    storage = MemoryStorage()
+    middleware = InactivityMiddleware(MemoryActivityStore(), timeout=TIMEOUT)
+    await seen(middleware, storage, KEY)
+    clock.now = NOW + 300
+    await seen(middleware, storage, OTHER)
+
+    # Ещё не истёк timeout
+    assert await middleware.sweep(bot, storage, UserLanes(), now=NOW + TIMEOUT - 1) == 0
+
+    assert await middleware.sweep(bot, storage, UserLanes(), now=NOW + TIMEOUT) == 1
+    assert await storage.get_state(KEY) is None
+    assert await storage.get_state(OTHER) == "Form:name"
+    assert [m.chat_id for m in bot.session.sent] == [KEY.chat_id]
+    assert len(middleware.activity) == 1
+
+    # Без состояния уведомлять не о чем, но запись активности удаляется
+    await storage.set_state(OTHER, None)
+    assert await middleware.sweep(bot, storage, UserLanes(), now=NOW + 2 * TIMEOUT) == 0
+    assert len(middleware.activity) == 0
+
+
+async def test_activity_while_waiting_for_lane_keeps_dialog(db, bot, clock):
+    storage = MemoryStorage()
+    lanes = UserLanes()
+    middleware = InactivityMiddleware(MemoryActivityStore(), timeout=TIMEOUT)
+    await seen(middleware, storage, KEY)
+
+    # Сброс ждёт, пока обработается обновление пользователя, которое продлевает активность
+    async with lanes.lock(KEY):
+        sweep = asyncio.create_task(middleware.sweep(bot, storage, lanes, now=NOW + TIMEOUT))
+        await asyncio.sleep(0)
+        clock.now = NOW + TIMEOUT
+        await seen(middleware, storage, KEY)
+    assert await sweep == 0
+    assert await storage.get_state(KEY) == "Form:name"
+    assert bot.session.sent == []
+
+    assert await middleware.sweep(bot, storage, lanes, now=NOW + 2 * TIMEOUT) == 1
+
+
+def test_store_follows_fsm_storage():
+    assert isinstance(create_activity_store(MemoryStorage()), MemoryActivityStore)
+
+
+class TestRedis:
+    @pytest.fixture
+    def redis(self):
+        fakeredis = pytest.importorskip("fakeredis")
+        pytest.importorskip("lupa")
+        return fakeredis.FakeAsyncRedis()
+
+    @pytest.fixture
+    def storage(self, redis):
+        return create_storage(redis)
+
+    def worker(self, storage) -> InactivityMiddleware:
+        return InactivityMiddleware(create_activity_store(storage), timeout=TIMEOUT)
+
+    async def test_store_is_redis(self, storage):
+        assert isinstance(self.worker(storage).activity, RedisActivityStore)
+
+    async def test_activity_is_shared_between_workers(self, db, bot, clock, storage):
+        first, second = self.worker(storage), self.worker(storage)
+        await seen(first, storage, KEY)
+        # Пользователь продолжил диалог, обновление обработал другой процесс
+        clock.now = NOW + TIMEOUT - 1
+        await seen(second, storage, KEY)
+
+        assert await first.sweep(bot, storage, UserLanes(), now=NOW + TIMEOUT) == 0
+        assert await storage.get_state(KEY) == "Form:name"
+
+        # Простой истёк: сбрасывает только один процесс
+        later = NOW + 2 * TIMEOUT
+        results = await asyncio.gather(
+            first.sweep(bot, storage, UserLanes(), now=later),
+            second.sweep(bot, storage, UserLanes(), now=later),
+        )
+        assert sorted(results) == [0, 1]
+        assert await storage.get_state(KEY) is None
+        assert len(bot.session.sent) == 1
+
+    async def test_idle_dialogs_are_swept_after_restart(self, db, bot, clock, storage):
+        await seen(self.worker(storage), storage, KEY)
+
+        restarted = self.worker(storage)
+        assert await restarted.sweep(bot, storage, UserLanes(), now=NOW + TIMEOUT) == 1
+        assert await storage.get_state(KEY) is None
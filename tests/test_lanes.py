@@ -0,0 +1,131 @@
+# test_lanes.py
+"""
+Очереди обновлений пользователей (lanes.UserLanes): порядок внутри очереди,
+параллельность разных пользователей, LaneOverflow сверх max_queue и удаление
+опустевших очередей.
+"""
+import asyncio
+
+import pytest
+from aiogram.fsm.storage.base import StorageKey
+
+from benchmarks.fake_bot import UpdateFactory
+from lanes import LaneOverflow, UserLanes
+from metrics import UPDATE_LANE_REJECTED
+
+
+def key(user_id: int) -> StorageKey:
+    return StorageKey(bot_id=1, chat_id=user_id, user_id=user_id)
+
+
+async def test_updates_of_one_user_run_in_arrival_order():
+    lanes = UserLanes(max_queue=100)
+    log: list[tuple[str, int]] = []
+
+    async def update(number: int) -> None:
+        async with lanes.lock(key(1)):
+            log.append(("start", number))
+            # Переключение внутри обработчика не даёт следующему обгнать текущий
+            await asyncio.sleep(0.001 * (10 - number))
+            log.append(("end", number))
+
+    await asyncio.gather(*(update(number) for number in range(10)))
+    assert log == [(event, number) for number in range(10) for event in ("start", "end")]
+
+
+async def test_different_users_run_in_parallel():
+    lanes = UserLanes()
+    inside = 0
+    most_inside = 0
+
+    async def update(user_id: int) -> None:
+        nonlocal inside, most_inside
+        async with lanes.lock(key(user_id)):
+            inside += 1
+            most_inside = max(most_inside, inside)
+            await asyncio.sleep(0.01)
+            inside -= 1
+
+    await asyncio.wait_for(asyncio.gather(*(update(user_id) for user_id in range(20))), timeout=0.1)
+    assert most_inside == 20
+
+
+async def test_overflow_beyond_max_queue():
+    lanes = UserLanes(max_queue=3)
+    release = asyncio.Event()
+
+    async def update() -> None:
+        async with lanes.lock(key(1)):
+            await release.wait()
+
+    # Одно обрабатывается, два ждут — очередь полна
+    tasks = [asyncio.create_task(update()) for _ in range(3)]
+    await asyncio.sleep(0)
+    with pytest.raises(LaneOverflow) as overflow:
+        async with lanes.lock(key(1)):
+            pass
+    assert overflow.value.key == key(1)
+
+    # Очередь другого пользователя от этого не зависит
+    async with lanes.lock(key(2)):
+        pass
+
+    release.set()
+    await asyncio.gather(*tasks)
+    async with lanes.lock(key(1)):
+        pass
+
+
+async def test_empty_lanes_are_removed():
+    lanes = UserLanes()
+    release = asyncio.Event()
+
+    async def update(user_id: int) -> None:
+        async with lanes.lock(key(user_id)):
+            await release.wait()
+
+    tasks = [asyncio.create_task(update(user_id)) for user_id in (1, 1, 2)]
+    await asyncio.sleep(0)
+    assert set(lanes._lanes) == {key(1), key(2)}
+    assert lanes._lanes[key(1)].depth == 2
+
+    release.set()
+    await asyncio.gather(*tasks)
+    assert lanes._lanes == {}
+
+
+async def test_cancelled_waiter_leaves_the_lane():
+    lanes = UserLanes(max_queue=2)
+    release = asyncio.Event()
+
+    async def update() -> None:
+        async with lanes.lock(key(1)):
+            await release.wait()
+
+    running = asyncio.create_task(update())
+    waiting = asyncio.create_task(update())
+    await asyncio.sleep(0)
+    waiting.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await waiting
+    assert lanes._lanes[key(1)].depth == 1
+
+    release.set()
+    await running
+    assert lanes._lanes == {}
+
+
+async def test_overflow_through_dispatcher_is_dropped(dispatcher, db, monkeypatch):
+    dp, bot = dispatcher
+    isolation = dp.fsm.events_isolation
+    monkeypatch.setattr(isolation, "max_queue", 1)
+    updates = UpdateFactory()
+    user_id = 60_001
+    lane_key = StorageKey(bot_id=bot.id, chat_id=user_id, user_id=user_id)
+
+    rejected = UPDATE_LANE_REJECTED.value()
+    async with isolation.lock(lane_key):
+        # Очередь занята: обновление отклоняется, ошибку гасит on_lane_overflow
+        await dp.feed_update(bot, updates.message(user_id, "/start"))
+    assert UPDATE_LANE_REJECTED.value() == rejected + 1
+    assert isolation._lanes == {}
@@ -0,0 +1,189 @@
+# test_migrations.py
+"""
+Миграции на базе со схемой исходной версии бота: статусы строками на русском,
+дубли пользователей по telegram_id, неуникальный индекс. Проверяются перенос
+заявок дублей (миграция 3), перевод статусов в коды (миграция 5), индексы,
+счётчик active_orders и повторный запуск без изменений.
+"""
+from datetime import datetime
+
+import pytest
+from sqlalchemy import (
+    Column, DateTime, ForeignKey, Index, Integer, MetaData, String, Table, inspect, insert, text
+)
+
+from db import Base, create_engine
+from migrations import MIGRATIONS, run_migrations
+from statuses import OrderStatus
+
+# Схема исходной версии (до миграций), как её создавал create_all
+baseline = MetaData()
+Table(
+    "users", baseline,
+    Column("id", Integer, primary_key=True, autoincrement=True),
+    Column("telegram_id", Integer, nullable=True, index=True),
+    Column("username", String, nullable=True),
+    Column("name", String, nullable=False),
+    Column("phone", String, nullable=False),
+    Column("address", String, nullable=False),
+    Column("organization", String, nullable=True),
+)
+Table(
+    "orders", baseline,
+    Column("id", Integer, primary_key=True, autoincrement=True),
+    Column("user_id", ForeignKey("users.id")),
+    Column("status", String, default="Новая"),
+    Column("created_at", DateTime, default=datetime.utcnow),
+    Column("preferred_time", String, nullable=True),
+    Column("completed_at", DateTime, nullable=True),
+    Index("ix_orders_status", "status"),
+)
+
+USERS = [
+    # (id, telegram_id, name) — 2 дублирует 1, у 4 telegram_id нет
+    (1, 100, "Иван"),
+    (2, 100, "Иван (повтор)"),
+    (3, 200, "Пётр"),
+    (4, None, "Без телеграма"),
+]
+
+ORDERS = [
+    # (id, user_id, статус строкой, ожидаемый код)
+    (1, 1, "Новая (От пользователя)", OrderStatus.NEW_FROM_USER),
+    (2, 2, "В работе", OrderStatus.IN_PROGRESS),
+    (3, 2, "Исполнено", OrderStatus.DONE),
+    (4, 3, "Новая", OrderStatus.NEW_FROM_USER),
+    (5, 3, "Новая (От Админа)", OrderStatus.NEW_FROM_ADMIN),
+    (6, 4, "Исполнено", OrderStatus.DONE),
+]
+
+
+@pytest.fixture
+def baseline_url(tmp_path):
+    return f"sqlite+aiosqlite:///{tmp_path / 'baseline.db'}"
+
+
+async def create_baseline(url: str) -> None:
+    engine = create_engine(url)
+    async with engine.begin() as conn:
+        await conn.run_sync(baseline.create_all)
+        await conn.execute(insert(baseline.tables["users"]), [
+            {"id": id_, "telegram_id": tg_id, "name": name, "phone": "+7", "address": "адрес"}
+            for id_, tg_id, name in USERS
+        ])
+        await conn.execute(insert(baseline.tables["orders"]), [
+            {"id": id_, "user_id": user_id, "status": status}
+            for id_, user_id, status, _ in ORDERS
+        ])
+    await engine.dispose()
+
+
+async def migrate(url: str) -> list[int]:
+    """
+    То же, что init_db: create_all по текущим моделям, затем миграции.
+    """
+    engine = create_engine(url)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        applied = await run_migrations(conn)
+    await engine.dispose()
+    return applied
+
+
+async def snapshot(url: str) -> dict:
+    engine = create_engine(url)
+    async with engine.connect() as conn:
+        users = (await conn.execute(text(
+            "SELECT id, telegram_id, active_orders FROM users ORDER BY id"
+        ))).all()
+        orders = (await conn.execute(text(
+            "SELECT id, user_id, status, typeof(status) FROM orders ORDER BY id"
+        ))).all()
+        indexes = await conn.run_sync(
+            lambda sync_conn: {
+                table: {
+                    ix["name"]: (ix["column_names"], bool(ix["unique"]))
+                    for ix in inspect(sync_conn).get_indexes(table)
+                }
+                for table in ("users", "orders")
+            }
+        )
+        partial = await conn.scalar(text(
+            "SELECT sql FROM sqlite_master WHERE type = 'index' AND name = 'ix_orders_active'"
+        ))
+        versions = (await conn.scalars(text("SELECT version FROM schema_migrations ORDER BY version"))).all()
+        fts = (await conn.scalars(text(
+            "SELECT rowid FROM users_fts WHERE users_fts MATCH 'Пётр'"
+        ))).all()
+    await engine.dispose()
+    return {
+        "users": users, "orders": orders, "indexes": indexes, "partial": partial,
+        "versions": versions, "fts": fts,
+    }
+
+
+async def test_baseline_database_is_migrated(baseline_url):
+    await create_baseline(baseline_url)
+    assert await migrate(baseline_url) == [version for version, _, _ in MIGRATIONS]
+    state = await snapshot(baseline_url)
+
+    # Дубль 2 удалён, его заявки перешли к самой ранней записи с тем же telegram_id
+    assert [(id_, tg_id) for id_, tg_id, _ in state["users"]] == [(1, 100), (3, 200), (4, None)]
+    assert [(id_, user_id) for id_, user_id, _, _ in state["orders"]] == [
+        (1, 1), (2, 1), (3, 1), (4, 3), (5, 3), (6, 4)
+    ]
+
+    # Статусы — целые коды (не строки с аффинностью TEXT)
+    assert [(id_, status, kind) for id_, _, status, kind in state["orders"]] == [
+        (id_, int(code), "integer") for id_, _, _, code in ORDERS
+    ]
+    # Счётчик: у 1 — своя активная заявка и активная заявка дубля
+    assert {id_: active for id_, _, active in state["users"]} == {1: 2, 3: 2, 4: 0}
+
+    users_ix, orders_ix = state["indexes"]["users"], state["indexes"]["orders"]
+    assert users_ix["ix_users_telegram_id"] == (["telegram_id"], True)
+    assert orders_ix == {
+        "ix_orders_user_status": (["user_id", "status"], False),
+        "ix_orders_active": (["id"], False),
+        "ix_orders_status_completed": (["status", "completed_at"], False),
+    }
+    assert f"WHERE status < {int(OrderStatus.DONE)}" in state["partial"]
+
+    assert state["versions"] == [version for version, _, _ in MIGRATIONS]
+    assert state["fts"] == [3]
+
+
+async def test_migrations_are_idempotent(baseline_url):
+    await create_baseline(baseline_url)
+    await migrate(baseline_url)
+    before = await snapshot(baseline_url)
+
+    assert await migrate(baseline_url) == []
+    assert await snapshot(baseline_url) == before
+
+
+async def test_status_codes_work_after_migration(baseline_url):
+    await create_baseline(baseline_url)
+    await migrate(baseline_url)
+
+    engine = create_engine(baseline_url)
+    async with engine.begin() as conn:
+        # Удаление активной заявки уменьшает счётчик (триггер миграции 6)
+        await conn.execute(text("DELETE FROM orders WHERE id = 4"))
+        active = (await conn.execute(text(
+            f"SELECT id FROM orders WHERE status < {int(OrderStatus.DONE)} ORDER BY id"
+        ))).scalars().all()
+        counter = await conn.scalar(text("SELECT active_orders FROM users WHERE id = 3"))
+    await engine.dispose()
+    assert active == [1, 2, 5]
+    assert counter == 1
+
+
+async def test_fresh_database_skips_data_migrations(tmp_path):
+    url = f"sqlite+aiosqlite:///{tmp_path / 'fresh.db'}"
+    assert await migrate(url) == [version for version, _, _ in MIGRATIONS]
+    engine = create_engine(url)
+    async with engine.connect() as conn:
+        columns = await conn.run_sync(lambda sync_conn: inspect(sync_conn).get_columns("orders"))
+    await engine.dispose()
+    assert isinstance(next(c["type"] for c in columns if c["name"] == "status"), Integer)
@@ -0,0 +1,105 @@
+# test_notifications.py
+"""
+Уведомления клиентам о смене статуса: StatusNotifier оставляет по заявке только
+последний статус, пропускает вернувшиеся к исходному и объединяет заявки одного
+чата в одно сообщение за окно. Сменить статус или удалить заявку может только админ.
+"""
+import asyncio
+
+import pytest
+from aiogram import Bot
+from sqlalchemy import insert, select
+
+from benchmarks.fake_bot import FakeTelegramSession, UpdateFactory
+from db import Order, User
+from notifications import StatusNotifier, status_notifier
+from statuses import OrderStatus
+
+NEW, IN_PROGRESS, DONE = OrderStatus.NEW_FROM_USER, OrderStatus.IN_PROGRESS, OrderStatus.DONE
+WINDOW = 0.1
+
+updates = UpdateFactory()
+
+
+@pytest.fixture
+def bot():
+    return Bot(token="123456:test", session=FakeTelegramSession(keep_sent=50))
+
+
+def messages(bot) -> list[tuple[int, str]]:
+    return [(m.chat_id, m.text) for m in bot.session.sent if m.__api_method__ == "sendMessage"]
+
+
+async def test_only_last_status_is_sent(bot):
+    notifier = StatusNotifier(window=WINDOW)
+    notifier.notify_status(bot, 7, 1, NEW, IN_PROGRESS)
+    notifier.notify_status(bot, 7, 1, IN_PROGRESS, DONE)
+    await notifier.close()
+    assert messages(bot) == [(7, "🔔 Статус вашей заявки #1: Исполнено")]
+
+
+async def test_status_returned_to_original_is_not_sent(bot):
+    notifier = StatusNotifier(window=WINDOW)
+    notifier.notify_status(bot, 7, 1, NEW, DONE)
+    notifier.notify_status(bot, 7, 1, DONE, NEW)
+    notifier.notify_status(bot, None, 2, NEW, DONE)
+    await notifier.close()
+    assert messages(bot) == []
+
+
+async def test_orders_of_one_chat_are_combined(bot):
+    notifier = StatusNotifier(window=WINDOW)
+    notifier.notify_status(bot, 7, 2, NEW, DONE)
+    notifier.notify_status(bot, 7, 1, NEW, IN_PROGRESS)
+    notifier.notify_status(bot, 8, 3, NEW, DONE)
+    await notifier.close()
+    assert sorted(messages(bot)) == [
+        (7, "🔔 Изменились статусы ваших заявок:\n▪ #1: В работе\n▪ #2: Исполнено"),
+        (8, "🔔 Статус вашей заявки #3: Исполнено"),
+    ]
+
+
+async def test_one_message_per_chat_per_window(bot):
+    notifier = StatusNotifier(window=WINDOW)
+    notifier.notify_status(bot, 7, 1, NEW, IN_PROGRESS)
+    await asyncio.sleep(WINDOW / 2)
+    notifier.notify_status(bot, 7, 2, NEW, IN_PROGRESS)
+    assert messages(bot) == []
+
+    await asyncio.sleep(WINDOW)
+    assert len(messages(bot)) == 1
+    # Изменение после отправки ждёт следующего окна
+    notifier.notify_status(bot, 7, 1, IN_PROGRESS, DONE)
+    await asyncio.sleep(0)
+    assert len(messages(bot)) == 1
+    await notifier.close()
+    assert messages(bot)[-1] == (7, "🔔 Статус вашей заявки #1: Исполнено")
+
+
+async def add_order(db, telegram_id: int) -> int:
+    async with db.begin() as conn:
+        user_id = await conn.scalar(
+            insert(User)
+            .values(telegram_id=telegram_id, name="Иван", phone="+70000000000", address="ул. Тестовая",
+                    active_orders=1)
+            .returning(User.id)
+        )
+        return await conn.scalar(insert(Order).values(user_id=user_id, status=NEW).returning(Order.id))
+
+
+@pytest.mark.parametrize("data", ["set_status_{id}_10", "delete_order_{id}"])
+async def test_forged_admin_callbacks_are_refused(db, dispatcher, data):
+    dp, bot = dispatcher
+    customer, intruder = 40_001, 40_002
+    order_id = await add_order(db, customer)
+    bot.session.sent.clear()
+
+    await dp.feed_update(bot, updates.callback(intruder, data.format(id=order_id)))
+
+    async with db.connect() as conn:
+        statuses = (await conn.scalars(select(Order.status).where(Order.id == order_id))).all()
+    assert statuses == [NEW]
+    assert customer not in {chat_id for chat_id, _, _ in status_notifier._pending.values()}
+    (answer,) = bot.session.sent
+    assert answer.__api_method__ == "answerCallbackQuery"
+    assert answer.text == "У вас нет прав администратора."
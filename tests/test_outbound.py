@@ -0,0 +1,86 @@
+# test_outbound.py
+"""
+Ограничитель исходящих сообщений (outbound.OutboundLimiter) против фейкового
+Bot API, который отвечает 429 RetryAfter сверх лимитов Telegram.
+"""
+import asyncio
+
+import pytest
+from aiogram import Bot
+from aiogram.exceptions import TelegramRetryAfter
+
+from benchmarks.fake_bot import FakeTelegramSession
+from metrics import OUTBOUND_RETRIES
+from outbound import OutboundLimiter, as_notification
+
+
+def limited_bot(limiter: OutboundLimiter, **flood) -> tuple[Bot, FakeTelegramSession]:
+    session = FakeTelegramSession(**flood)
+    session.middleware(limiter)
+    return Bot(token="123456:test", session=session), session
+
+
+async def test_burst_is_delivered_without_429():
+    limits = dict(flood_rate=50, flood_burst=10, chat_flood_rate=5, chat_flood_burst=1)
+    bot, session = limited_bot(
+        OutboundLimiter(rate=50, burst=10, chat_rate=5, chat_burst=1), **limits
+    )
+    # 30 разных чатов и пачка из 4 сообщений в один чат
+    chats = [1000 + i for i in range(30)] + [7] * 4
+    await asyncio.gather(*(bot.send_message(chat_id, text="…") for chat_id in chats))
+
+    assert session.calls["sendMessage"] == len(chats)
+    assert session.flood_errors == 0
+
+
+async def test_replies_overtake_queued_notifications():
+    burst = 5
+    bot, _ = limited_bot(OutboundLimiter(rate=40, burst=burst, chat_rate=1000, chat_burst=10))
+    finished: list[str] = []
+
+    async def send(kind: str, chat_id: int) -> None:
+        await bot.send_message(chat_id, text="…")
+        finished.append(kind)
+
+    # Уведомления встают в очередь первыми
+    notifications = [asyncio.create_task(as_notification(send("notification", 2000 + i))) for i in range(20)]
+    await asyncio.sleep(0)
+    await asyncio.gather(*notifications, *(send("reply", 1000 + i) for i in range(10)))
+
+    # Раньше ответов успевают только уведомления, взявшие токены из запаса
+    last_reply = max(i for i, kind in enumerate(finished) if kind == "reply")
+    assert finished[:last_reply + 1].count("notification") <= burst
+
+
+async def test_retry_after_pauses_chat_and_retries():
+    # Ограничитель не знает про лимит чата — о нём сообщает только 429 от API
+    bot, session = limited_bot(
+        OutboundLimiter(rate=1000, burst=100, chat_rate=1000, chat_burst=100),
+        chat_flood_rate=5, chat_flood_burst=1,
+    )
+    retries = OUTBOUND_RETRIES.value(("sendMessage",))
+
+    await asyncio.gather(bot.send_message(7, text="1"), bot.send_message(7, text="2"))
+
+    assert session.flood_errors == 1
+    assert session.calls["sendMessage"] == 3
+    assert OUTBOUND_RETRIES.value(("sendMessage",)) == retries + 1
+
+
+async def test_gives_up_after_max_retries():
+    bot, session = limited_bot(
+        OutboundLimiter(rate=1000, burst=100, chat_rate=1000, chat_burst=100, max_retries=0),
+        chat_flood_rate=1, chat_flood_burst=1,
+    )
+    await bot.send_message(7, text="1")
+    with pytest.raises(TelegramRetryAfter):
+        await bot.send_message(7, text="2")
+    assert session.flood_errors == 1
+
+
+async def test_methods_without_chat_are_not_limited():
+    bot, session = limited_bot(OutboundLimiter(rate=1, burst=1, chat_rate=1, chat_burst=1))
+    await bot.send_message(7, text="1")
+    # Общий лимит исчерпан, но ответ на callback не ждёт его
+    await asyncio.wait_for(bot.answer_callback_query("query"), timeout=0.1)
+    assert session.calls["answerCallbackQuery"] == 1
@@ -0,0 +1,85 @@
+# test_query_plans.py
+"""
+Горячие запросы должны использовать индексы (EXPLAIN QUERY PLAN).
+База создаётся init_db (create_all + миграции), как в проде.
+"""
+from datetime import datetime
+
+import pytest
+from sqlalchemy import delete, func, insert, select, text
+
+from db import cancel_active_order, delete_order, engine, Order, User
+from handlers.admin import orders_filter
+from statuses import OrderStatus
+
+from conftest import run
+
+# Название -> (запрос, фрагмент плана, который должен в нём быть)
+HOT_QUERIES = {
+    "main menu counter": (
+        select(User.active_orders).where(User.telegram_id == 42).limit(1),
+        "ix_users_telegram_id",
+    ),
+    "user's active orders": (
+        select(Order).join(User).where(User.telegram_id == 42, Order.status < OrderStatus.DONE),
+        "ix_orders_user_status",
+    ),
+    "user cancels chosen order": (
+        cancel_active_order(42, order_id=123),
+        "INTEGER PRIMARY KEY",
+    ),
+    "user cancels the only order": (
+        cancel_active_order(42),
+        "ix_orders_user_status",
+    ),
+    "admin deletes order": (
+        delete_order(123),
+        "INTEGER PRIMARY KEY",
+    ),
+    "admin active list page": (
+        select(Order.id, Order.status, Order.created_at)
+        .where(orders_filter(False), Order.id < 500)
+        .order_by(Order.id.desc()).limit(11),
+        "ix_orders_active",
+    ),
+    # Диапазон status < DONE считается по префиксу покрывающего индекса, без чтения таблицы
+    "admin active count": (
+        select(func.count(Order.id)).where(orders_filter(False)),
+        "COVERING INDEX ix_orders_status_completed",
+    ),
+    "cleanup of completed orders": (
+        delete(Order).where(Order.status == OrderStatus.DONE, Order.completed_at < datetime(2025, 1, 1)),
+        "ix_orders_status_completed",
+    ),
+}
+
+
+@pytest.fixture(scope="module")
+def seeded(schema):
+    # Без данных и ANALYZE планировщик SQLite может предпочесть полный просмотр
+    async def seed():
+        async with engine.begin() as conn:
+            await conn.execute(delete(Order))
+            await conn.execute(delete(User))
+            await conn.execute(insert(User), [
+                {"telegram_id": i, "name": "N", "phone": "1", "address": "A"} for i in range(1, 2001)
+            ])
+            await conn.execute(insert(Order), [
+                {"user_id": i % 2000 + 1, "status": OrderStatus.DONE if i % 10 else OrderStatus.IN_PROGRESS,
+                 "completed_at": datetime(2024, 1, 1) if i % 10 else None}
+                for i in range(20_000)
+            ])
+            await conn.execute(text("ANALYZE"))
+
+    run(seed())
+    return engine
+
+
+@pytest.mark.parametrize("name", HOT_QUERIES)
+async def test_hot_query_uses_index(seeded, name):
+    stmt, index = HOT_QUERIES[name]
+    compiled = stmt.compile(seeded.sync_engine, compile_kwargs={"literal_binds": True})
+    async with seeded.connect() as conn:
+        rows = await conn.execute(text(f"EXPLAIN QUERY PLAN {compiled}"))
+        plan = " | ".join(row[-1] for row in rows)
+    assert index in plan, plan
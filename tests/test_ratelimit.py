@@ -0,0 +1,110 @@
+# test_ratelimit.py
+"""
+Локальные ограничители ratelimit.py с подменёнными часами: пополнение token
+bucket, сдвиг скользящего окна, вытеснение ключей в _BoundedStore и max_keys.
+"""
+import time
+from types import SimpleNamespace
+
+import pytest
+
+import ratelimit
+from ratelimit import SlidingWindowLimiter, TokenBucketLimiter, _BoundedStore
+
+
+class Clock:
+    def __init__(self, now: float = 1000.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    # Подменяем модуль time только внутри ratelimit: цикл событий живёт по настоящим часам
+    monkeypatch.setattr(ratelimit, "time", SimpleNamespace(monotonic=clock, time=time.time))
+    return clock
+
+
+async def test_token_bucket_refills_at_rate(clock):
+    limiter = TokenBucketLimiter(rate=0.5, capacity=3)
+    assert [await limiter.hit(1) for _ in range(4)] == [True, True, True, False]
+    assert limiter.wait_time(1) == pytest.approx(2.0)
+
+    # Неудачная попытка не сбрасывает накопленную долю токена
+    clock.now += 1.0
+    assert not await limiter.hit(1)
+    clock.now += 1.0
+    assert await limiter.hit(1)
+    assert not await limiter.hit(1)
+
+    # За capacity / rate секунд простоя ведро наполняется целиком, но не больше
+    clock.now += 60
+    assert [await limiter.hit(1) for _ in range(4)] == [True, True, True, False]
+
+
+async def test_token_bucket_keys_are_independent(clock):
+    limiter = TokenBucketLimiter(rate=1, capacity=1)
+    assert await limiter.hit(1)
+    assert not await limiter.hit(1)
+    assert await limiter.hit(2)
+
+
+async def test_sliding_window_weighs_previous_window(clock):
+    limiter = SlidingWindowLimiter(limit=3, window=5)
+    assert [await limiter.hit(1) for _ in range(4)] == [True, True, True, False]
+
+    # Начало следующего окна: предыдущее учитывается целиком
+    clock.now += 5
+    assert not await limiter.hit(1)
+
+    # Середина окна: от предыдущего остаётся половина (1.5 события)
+    clock.now += 2.5
+    assert [await limiter.hit(1) for _ in range(3)] == [True, True, False]
+
+    # Через окно без событий предыдущее окно пустое
+    clock.now += 10
+    assert [await limiter.hit(1) for _ in range(4)] == [True, True, True, False]
+
+
+def test_bounded_store_evicts_least_recently_used():
+    store = _BoundedStore(ttl=60, max_keys=2)
+    store.put("a", [0.0])
+    store.put("b", [0.0])
+    assert store.get("a", 1.0) is not None
+    store.put("c", [1.0])
+    assert len(store) == 2
+    assert store.get("b", 1.0) is None
+    assert store.get("a", 1.0) is not None
+    assert store.get("c", 1.0) is not None
+
+
+def test_bounded_store_sweeps_expired_keys_gradually():
+    store = _BoundedStore(ttl=10, max_keys=100)
+    for key in range(5):
+        store.put(key, [0.0])
+    store.put("fresh", [50.0])
+
+    # За одно обращение вычищается не больше SWEEP_PER_HIT устаревших ключей
+    store.get("fresh", 50.0)
+    assert len(store) == 6 - _BoundedStore.SWEEP_PER_HIT
+    for _ in range(3):
+        store.get("fresh", 50.0)
+    assert len(store) == 1
+
+    # Свежий ключ не вычищается, даже если он первый в очереди
+    store.get("fresh", 55.0)
+    assert len(store) == 1
+
+
+@pytest.mark.parametrize("make", [
+    lambda: TokenBucketLimiter(rate=1, capacity=1, max_keys=100),
+    lambda: SlidingWindowLimiter(limit=1, window=5, max_keys=100),
+])
+async def test_limiters_keep_at_most_max_keys(clock, make):
+    limiter = make()
+    for user_id in range(1000):
+        assert await limiter.hit(user_id)
+    assert len(limiter._store) == 100
@@ -0,0 +1,102 @@
+# test_search.py
+"""
+Поиск /find по FTS5-индексу users_fts: экранирование пользовательского ввода,
+поиск по префиксу и синхронизация индекса триггерами при изменении анкет.
+"""
+import pytest
+from sqlalchemy import delete, insert, update
+
+from db import Order, User
+from search import build_match_query, search_orders
+from statuses import OrderStatus
+
+
+@pytest.mark.parametrize("query, expected", [
+    ("Иван", '"Иван"*'),
+    ("  Иван   Петров ", '"Иван"* "Петров"*'),
+    ("+7 999", '"7"* "999"*'),
+    ('Иван" OR "x', '"Иван"* "OR"* "x"*'),
+    ("NEAR(Иван Петров)", '"NEAR"* "Иван"* "Петров"*'),
+    ("name:Иван -Петров ^x", '"name"* "Иван"* "Петров"* "x"*'),
+    ("", None),
+    ('"', None),
+    ("*", None),
+    ("() : - ^ \"\" *", None),
+])
+def test_build_match_query_quotes_every_token(query, expected):
+    assert build_match_query(query) == expected
+
+
+async def add_client(db, telegram_id: int, name: str, phone: str, address: str, organization: str | None = None) -> int:
+    async with db.begin() as conn:
+        user_id = await conn.scalar(
+            insert(User)
+            .values(telegram_id=telegram_id, name=name, phone=phone, address=address, organization=organization)
+            .returning(User.id)
+        )
+        await conn.execute(insert(Order).values(user_id=user_id, status=OrderStatus.NEW_FROM_USER))
+    return user_id
+
+
+async def found_names(query: str) -> list[str]:
+    rows, _ = await search_orders(query)
+    return sorted(row.name for row in rows)
+
+
+async def test_prefix_search_over_all_fields(db):
+    await add_client(db, 1, "Иван Петров", "+79990000001", "ул. Ленина, 1", "ООО Ромашка")
+    await add_client(db, 2, "Пётр Иванов", "+79990000002", "пр. Мира, 5")
+
+    assert await found_names("Ива") == ["Иван Петров", "Пётр Иванов"]
+    assert await found_names("иван петр") == ["Иван Петров"]
+    assert await found_names("7999000000") == ["Иван Петров", "Пётр Иванов"]
+    assert await found_names("ромаш") == ["Иван Петров"]
+    assert await found_names("Мира") == ["Пётр Иванов"]
+    # Регистр не важен; «ё» и «е» unicode61 различает
+    assert await found_names("ПЁТР") == ["Пётр Иванов"]
+    assert await found_names("Петр Иванов") == []
+    assert await found_names("Сидоров") == []
+
+
+@pytest.mark.parametrize("query", ['"', "*", "NEAR(", 'Иван"', "Иван OR", "-", "AND", ""])
+async def test_hostile_input_does_not_break_query(db, query):
+    await add_client(db, 1, "Иван Петров", "+79990000001", "ул. Ленина, 1")
+    rows, has_more = await search_orders(query)
+    assert has_more is False
+    assert all(row.name == "Иван Петров" for row in rows)
+
+
+async def test_pagination(db):
+    for telegram_id in range(1, 4):
+        await add_client(db, telegram_id, f"Иван {telegram_id}", f"+7999000000{telegram_id}", "ул. Ленина")
+
+    rows, has_more = await search_orders("Иван", page=0, per_page=2)
+    assert len(rows) == 2 and has_more
+    rows, has_more = await search_orders("Иван", page=1, per_page=2)
+    assert len(rows) == 1 and not has_more
+
+
+async def test_index_follows_user_insert_update_delete(db):
+    user_id = await add_client(db, 1, "Иван Петров", "+79990000001", "ул. Ленина, 1")
+    assert await found_names("Петров") == ["Иван Петров"]
+
+    async with db.begin() as conn:
+        await conn.execute(update(User).where(User.id == user_id).values(name="Иван Сидоров"))
+    assert await found_names("Петров") == []
+    assert await found_names("Сидоров") == ["Иван Сидоров"]
+
+    # Счётчик заявок меняется без переиндексации (триггер только на поля анкеты)
+    async with db.begin() as conn:
+        await conn.execute(update(User).where(User.id == user_id).values(active_orders=User.active_orders + 1))
+    assert await found_names("Сидоров") == ["Иван Сидоров"]
+
+    async with db.begin() as conn:
+        await conn.execute(delete(Order).where(Order.user_id == user_id))
+        await conn.execute(delete(User).where(User.id == user_id))
+        # Строка с тем же rowid не должна находиться по старым словам
+        await conn.execute(insert(User).values(
+            id=user_id, telegram_id=2, name="Анна", phone="+70000000000", address="пр. Мира"
+        ))
+        await conn.execute(insert(Order).values(user_id=user_id, status=OrderStatus.NEW_FROM_USER))
+    assert await found_names("Сидоров") == []
+    assert await found_names("Анна") == ["Анна"]
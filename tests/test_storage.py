@@ -0,0 +1,107 @@
+# test_storage.py
+"""
+Redis-хранилище FSM (storage.PipelinedRedisStorage) на fakeredis:
+префикс ключей, TTL и один round-trip на чтение-изменение данных.
+"""
+import pytest
+from aiogram.fsm.storage.base import StorageKey
+from aiogram.fsm.storage.memory import MemoryStorage
+
+from config import FSM_DATA_TTL, FSM_KEY_PREFIX, FSM_STATE_TTL
+from storage import PipelinedRedisStorage, create_storage
+
+fakeredis = pytest.importorskip("fakeredis")
+
+KEY = StorageKey(bot_id=1, chat_id=42, user_id=42)
+
+
+class RoundTrips:
+    """
+    Считает обращения к Redis: отдельные команды и выполненные pipeline.
+    """
+
+    def __init__(self, redis):
+        self.commands = 0
+        self.pipelines = 0
+        execute_command, pipeline = redis.execute_command, redis.pipeline
+
+        async def counted_command(*args, **kwargs):
+            self.commands += 1
+            return await execute_command(*args, **kwargs)
+
+        def counted_pipeline(*args, **kwargs):
+            pipe = pipeline(*args, **kwargs)
+            execute = pipe.execute
+
+            async def counted_execute(*a, **kw):
+                self.pipelines += 1
+                return await execute(*a, **kw)
+
+            pipe.execute = counted_execute
+            return pipe
+
+        redis.execute_command = counted_command
+        redis.pipeline = counted_pipeline
+
+    @property
+    def total(self) -> int:
+        return self.commands + self.pipelines
+
+
+@pytest.fixture
+def redis():
+    return fakeredis.FakeAsyncRedis()
+
+
+@pytest.fixture
+def storage(redis):
+    return create_storage(redis)
+
+
+def test_memory_storage_is_default():
+    assert isinstance(create_storage(), MemoryStorage)
+
+
+async def test_keys_are_prefixed_and_expire(storage, redis):
+    assert isinstance(storage, PipelinedRedisStorage)
+    await storage.set_state(KEY, "Form:name")
+    await storage.set_data(KEY, {"name": "Иван"})
+
+    keys = sorted(key.decode() for key in await redis.keys("*"))
+    assert keys == [f"{FSM_KEY_PREFIX}:1:42:42:data", f"{FSM_KEY_PREFIX}:1:42:42:state"]
+    assert 0 < await redis.ttl(f"{FSM_KEY_PREFIX}:1:42:42:state") <= FSM_STATE_TTL
+    assert 0 < await redis.ttl(f"{FSM_KEY_PREFIX}:1:42:42:data") <= FSM_DATA_TTL
+
+
+async def test_data_round_trip(storage):
+    await storage.set_data(KEY, {"name": "Иван", "items": [1, 2]})
+    assert await storage.get_data(KEY) == {"name": "Иван", "items": [1, 2]}
+    assert await storage.update_data(KEY, {"phone": "+7999"}) == {
+        "name": "Иван", "items": [1, 2], "phone": "+7999"
+    }
+    assert await storage.get_value(KEY, "phone") == "+7999"
+    assert await storage.get_value(KEY, "missing", "default") == "default"
+
+    await storage.set_data(KEY, {})
+    assert await storage.get_data(KEY) == {}
+
+
+async def test_data_calls_take_one_round_trip(storage, redis):
+    await storage.set_data(KEY, {"name": "Иван"})
+    calls = RoundTrips(redis)
+
+    await storage.update_data(KEY, {"phone": "+7999"})
+    assert (calls.commands, calls.pipelines) == (0, 1)
+
+    await storage.set_data(KEY, {"name": "Пётр"})
+    await storage.get_data(KEY)
+    assert calls.total == 3
+
+
+async def test_update_data_refreshes_ttl(storage, redis):
+    await storage.set_data(KEY, {"name": "Иван"})
+    data_key = f"{FSM_KEY_PREFIX}:1:42:42:data"
+    await redis.expire(data_key, 5)
+
+    await storage.update_data(KEY, {"phone": "+7999"})
+    assert await redis.ttl(data_key) > 5
@@ -0,0 +1,66 @@
+# test_webhook.py
+"""
+Режим вебхука (webhook.create_webhook_app): обновления POST-ом на localhost,
+как их присылает Telegram.
+"""
+import time
+
+import pytest
+from aiohttp.test_utils import TestClient, TestServer
+
+from benchmarks.fake_bot import UpdateFactory
+from config import WEBHOOK_PATH
+from webhook import create_webhook_app
+
+SECRET = "test-secret"
+API_LATENCY = 0.3
+
+
+def payload(update) -> dict:
+    return update.model_dump(mode="json", exclude_none=True)
+
+
+def replies_to(session, *chat_ids: int) -> list[int]:
+    return [m.chat_id for m in session.sent if m.__api_method__ == "sendMessage" and m.chat_id in chat_ids]
+
+
+@pytest.fixture
+def webhook(db, dispatcher):
+    dp, bot = dispatcher
+    bot.session.latency = API_LATENCY
+    bot.session.sent.clear()
+    yield bot.session, create_webhook_app(dp, bot, secret_token=SECRET)
+    bot.session.latency = 0
+
+
+async def test_wrong_secret_is_rejected(webhook):
+    session, app = webhook
+    async with TestClient(TestServer(app)) as client:
+        response = await client.post(
+            WEBHOOK_PATH,
+            json=payload(UpdateFactory().message(30_001, "/start")),
+            headers={"X-Telegram-Bot-Api-Secret-Token": "wrong"},
+        )
+        assert response.status == 401
+    assert replies_to(session, 30_001) == []
+
+
+async def test_replies_at_once_and_drains_on_shutdown(webhook):
+    session, app = webhook
+    updates = UpdateFactory()
+    async with TestClient(TestServer(app)) as client:
+        started = time.perf_counter()
+        for user_id in (30_002, 30_003):
+            response = await client.post(
+                WEBHOOK_PATH,
+                json=payload(updates.message(user_id, "/start")),
+                headers={"X-Telegram-Bot-Api-Secret-Token": SECRET},
+            )
+            assert response.status == 200
+        # Telegram получает 200 раньше, чем бот успевает ответить пользователям
+        assert time.perf_counter() - started < API_LATENCY
+    # Выход из клиента останавливает приложение: остановка ждёт ответов
+    # на уже принятые обновления
+    assert time.perf_counter() - started >= API_LATENCY
+    # Фоновые уведомления других тестов тоже идут через эту сессию — считаем только свои чаты
+    assert sorted(replies_to(session, 30_002, 30_003)) == [30_002, 30_003]
@@ -0,0 +1,79 @@
+# webhook.py
+import asyncio
+import logging
+import signal
+
+from aiohttp import web
+from aiogram import Bot, Dispatcher
+from aiogram.webhook.aiohttp_server import SimpleRequestHandler, setup_application
+
+from config import (
+    WEBHOOK_URL, WEBHOOK_PATH, WEBHOOK_HOST, WEBHOOK_PORT, WEBHOOK_SECRET, WEBHOOK_DRAIN_TIMEOUT
+)
+
+
+class DrainingRequestHandler(SimpleRequestHandler):
+    """
+    Обработчик вебхука: проверяет секретный токен, сразу отвечает Telegram 200
+    и обрабатывает обновление в фоне. При остановке дожидается уже принятых
+    обновлений (не дольше drain_timeout), и только потом закрывает сессию бота.
+    """
+
+    def __init__(self, dispatcher: Dispatcher, bot: Bot, drain_timeout: float = WEBHOOK_DRAIN_TIMEOUT, **kwargs):
+        super().__init__(dispatcher, bot, handle_in_background=True, **kwargs)
+        self.drain_timeout = drain_timeout
+
+    @property
+    def pending(self) -> int:
+        return len(self._background_feed_update_tasks)
+
+    async def close(self) -> None:
+        tasks = set(self._background_feed_update_tasks)
+        if tasks:
+            logging.info(f"Waiting for {len(tasks)} webhook updates to finish...")
+            _, pending = await asyncio.wait(tasks, timeout=self.drain_timeout)
+            if pending:
+                logging.warning(f"{len(pending)} webhook updates did not finish in time.")
+        await super().close()
+
+
+def create_webhook_app(dp: Dispatcher, bot: Bot, secret_token: str | None = WEBHOOK_SECRET) -> web.Application:
+    """
+    Создаёт aiohttp-приложение, принимающее обновления на WEBHOOK_PATH.
+    """
+    app = web.Application()
+    handler = DrainingRequestHandler(dp, bot, secret_token=secret_token)
+    handler.register(app, path=WEBHOOK_PATH)
+    setup_application(app, dp, bot=bot)
+    return app
+
+
+async def run_webhook(dp: Dispatcher, bot: Bot) -> None:
+    """
+    Запускает HTTP-сервер вебхука и работает до SIGINT/SIGTERM.
+    """
+    if WEBHOOK_URL:
+        await bot.set_webhook(
+            f"{WEBHOOK_URL.rstrip('/')}{WEBHOOK_PATH}",
+            secret_token=WEBHOOK_SECRET,
+            allowed_updates=dp.resolve_used_update_types(),
+            drop_pending_updates=True
+        )
+
+    runner = web.AppRunner(create_webhook_app(dp, bot))
+    await runner.setup()
+    site = web.TCPSite(runner, host=WEBHOOK_HOST, port=WEBHOOK_PORT)
+    await site.start()
+    logging.info(f"Webhook server listening on {WEBHOOK_HOST}:{WEBHOOK_PORT}{WEBHOOK_PATH}")
+
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop.set)
+    try:
+        await stop.wait()
+    finally:
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            loop.remove_signal_handler(sig)
+        # Перестаём принимать запросы и дожидаемся обработки принятых
+        await runner.cleanup()